@@ -1,19 +1,36 @@
-from collections.abc import Generator
-from typing import Annotated
+import math
+from collections.abc import AsyncGenerator, Callable, Generator
+from typing import Annotated, Any
 
 import jwt
-from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
+from fastapi import Depends, Header, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.security import APIKeyHeader, OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
-from pydantic import ValidationError
+from pydantic import BaseModel, ValidationError
 from sqlalchemy.orm import Session
 
 from app.core import security
+from app.core.admission import admission
+from app.core.api_keys import api_keys
+from app.core.clock import utcnow
 from app.core.config import settings
-from app.crud.user import get_user_by_email
+from app.core.denylist import token_denylist
+from app.core.idempotency import idempotency
+from app.core.on_sale import on_sale
+from app.core.token_cache import verified_tokens
+from app.core.token_versions import token_versions
+from app.core.user_cache import user_cache
 from app.database.session import engine
-from app.models.enums import UserRole
-from app.schemas.token import TokenData
+from app.exceptions.event import NotOnSaleYetException
+from app.exceptions.idempotency import (
+    IdempotencyKeyInProgressException,
+    IdempotencyKeyReuseException,
+)
+from app.exceptions.ticket import NoTicketsAvailableException
+from app.exceptions.user import MissingUserException
+from app.models.enums import ApiKeyScope, UserRole
+from app.schemas.token import Principal, TokenData
 from app.schemas.user import User
 
 
@@ -35,66 +52,170 @@ def get_db() -> Generator[Session, None, None]:
 SessionDep = Annotated[Session, Depends(get_db)]
 
 # Security
-reusable_oauth2 = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/login")
+# Either may be missing as long as the other one is there
+reusable_oauth2 = OAuth2PasswordBearer(
+    tokenUrl=f"{settings.API_V1_STR}/login", auto_error=False
+)
+api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
-TokenDep = Annotated[str, Depends(reusable_oauth2)]
+TokenDep = Annotated[str | None, Depends(reusable_oauth2)]
+ApiKeyDep = Annotated[str | None, Depends(api_key_header)]
 
 
-def get_token_data(token: TokenDep) -> TokenData:
+def get_token_data(
+    session: SessionDep, token: TokenDep, api_key: ApiKeyDep
+) -> TokenData:
     """
-    Retrieve the current user based on the provided session and token.
+    Verify the JWT, or the API key, and return the caller's claims.
+
+    Tokens issued before the user's last role or password change carry an
+    older version and are refused, as are tokens revoked by logout. Verified
+    claims are memoized until the token expires, so a token seen before
+    skips the signature check.
+
+    An API key is looked up in the in-memory key index; its claims are those
+    of its service account plus the key's scopes. Only routes that accept
+    one of these scopes let API keys in.
 
     Args:
         session (SessionDep): The database session dependency.
         token (TokenDep): The JWT token dependency.
+        api_key (ApiKeyDep): The X-API-Key header dependency.
 
     Returns:
-        User: The authenticated user.
+        TokenData: The verified claims.
 
     Raises:
-        HTTPException: If the token is invalid, credentials cannot be validated,
-                       the user is not found, or the user is inactive.
+        HTTPException: If the token or key is missing, invalid or revoked, or
+                       the token lacks the user id, version, id or expiry
+                       claims.
     """
-    try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+    )
+    if api_key is not None:
+        indexed = api_keys.get(api_key)
+        if indexed is None:
+            raise credentials_exception
+        return TokenData(
+            username=indexed.principal.email,
+            role=indexed.principal.role,
+            user_id=indexed.principal.id,
+            scopes=sorted(indexed.scopes),
         )
-        username = payload.get("sub")
-        role = payload.get("role")
-        if username is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials",
-            )
-        return TokenData(username=username, role=role)
-    except (InvalidTokenError, ValidationError):
+    if token is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
         )
 
+    token_data = verified_tokens.get(token)
+    if token_data is None:
+        try:
+            payload = jwt.decode(
+                token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
+            )
+            token_data = TokenData(
+                username=payload.get("sub"),
+                role=payload.get("role"),
+                user_id=payload.get("uid"),
+                version=payload.get("ver"),
+                jti=payload.get("jti"),
+                exp=payload.get("exp"),
+            )
+        except (InvalidTokenError, ValidationError):
+            raise credentials_exception
+
+        if None in (
+            token_data.username,
+            token_data.user_id,
+            token_data.version,
+            token_data.jti,
+            token_data.exp,
+        ):
+            raise credentials_exception
+        verified_tokens.put(token, token_data, exp=token_data.exp)
 
-def get_current_user(session: SessionDep, token_data: TokenData = Depends(get_token_data)) -> User:
+    if token_denylist.is_revoked(token_data.jti):
+        verified_tokens.forget(token)
+        raise credentials_exception
+    version = token_versions.get(db=session, user_id=token_data.user_id)
+    if version != token_data.version:
+        verified_tokens.forget(token)
+        raise credentials_exception
+    return token_data
+
+
+def check_scope(token_data: TokenData, scope: ApiKeyScope | None) -> None:
     """
-    Retrieve the current user from the database using valid token data.
+    Refuse API keys, unless the route accepts `scope` and the key has it.
     """
-    assert token_data.username is not None
-    user = get_user_by_email(db=session, email=token_data.username)
-    if not user:
+    if token_data.scopes is None:
+        return
+    if scope is None or scope.value not in token_data.scopes:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="The API key doesn't have the scope for this route",
         )
-    return user
+
+
+def get_principal(token_data: TokenData = Depends(get_token_data)) -> Principal:
+    """
+    Return the caller as described by their verified token, without a query.
+    """
+    check_scope(token_data, None)
+    return Principal(
+        id=token_data.user_id, email=token_data.username, role=token_data.role
+    )
+
+
+CurrentPrincipal = Annotated[Principal, Depends(get_principal)]
+
+
+def scoped_principal(scope: ApiKeyScope):
+    """
+    Like `get_principal`, but also accepting API keys that have `scope`.
+    """
+
+    def principal_checker(
+        token_data: TokenData = Depends(get_token_data),
+    ) -> Principal:
+        check_scope(token_data, scope)
+        return Principal(
+            id=token_data.user_id, email=token_data.username, role=token_data.role
+        )
+
+    return principal_checker
+
+
+def get_current_user(session: SessionDep, principal: CurrentPrincipal) -> User:
+    """
+    Return a cached snapshot of the current user, for routes that need more
+    than the principal.
+    """
+    db_user = user_cache.get(db=session, user_id=principal.id)
+    if db_user is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(MissingUserException()),
+        )
+    return db_user
 
 
 CurrentUser = Annotated[User, Depends(get_current_user)]
 
 
-def roles_required(allowed_roles: list[UserRole]):
+def roles_required(allowed_roles: list[UserRole], scope: ApiKeyScope | None = None):
     """
     Checks if the current user is authorized based on the JWT token role.
+
+    API keys are accepted if they have `scope` and their service account
+    one of the roles.
     """
     def role_checker(token_data: TokenData = Depends(get_token_data)):
+        check_scope(token_data, scope)
         if token_data.role is None:
              raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -109,3 +230,124 @@ def roles_required(allowed_roles: list[UserRole]):
         return token_data
 
     return role_checker
+
+
+# Idempotency
+class IdempotentRequest:
+    """
+    Runs a route's handler at most once per client Idempotency-Key.
+
+    Keys are scoped to the route and to the `owner` passed by the route.
+    """
+
+    def __init__(self, db: Session, key: str | None, route: str):
+        self.db = db
+        self.key = key
+        self.route = route
+
+    def has_response(self, *, owner: Any) -> bool:
+        """Return whether a first request with the key finished already."""
+        if self.key is None:
+            return False
+        stored = idempotency.lookup(
+            db=self.db, key=self.key, scope=f"{owner}:{self.route}"
+        )
+        return stored is not None
+
+    def run(
+        self,
+        *,
+        owner: Any,
+        handler: Callable[[], Any],
+        response_model: Any,
+        body: BaseModel | None = None,
+    ) -> Any:
+        try:
+            return idempotency.run(
+                db=self.db,
+                key=self.key,
+                scope=f"{owner}:{self.route}",
+                handler=handler,
+                response_model=response_model,
+                request=body,
+            )
+        except IdempotencyKeyReuseException as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        except IdempotencyKeyInProgressException as e:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+
+def get_idempotent_request(
+    request: Request,
+    db: SessionDep,
+    idempotency_key: Annotated[
+        str | None, Header(alias="Idempotency-Key", min_length=1, max_length=255)
+    ] = None,
+) -> IdempotentRequest:
+    return IdempotentRequest(
+        db=db, key=idempotency_key, route=f"{request.method} {request.url.path}"
+    )
+
+
+IdempotencyDep = Annotated[IdempotentRequest, Depends(get_idempotent_request)]
+
+
+# Booking admission
+def admit_booking(scope: ApiKeyScope | None = None):
+    """
+    Hold one of the event's booking slots while the request runs.
+
+    The caller is authenticated first, accepting API keys with `scope`, so
+    anonymous requests never take a slot or a place in the line. Retries of
+    requests that already succeeded skip admission, so `IdempotentRequest`
+    replays them even once the event sold out. Sold-out events and events
+    not on sale yet are rejected from memory. Callers over the event's limit
+    get a 429 with a queue token to poll and to send back as `X-Queue-Token`;
+    the token is only valid for them.
+
+    Raises:
+        HTTPException: If the event is sold out or not on sale yet, or the
+                       caller has to wait.
+    """
+    principal_dep = get_principal if scope is None else scoped_principal(scope)
+
+    async def admitter(
+        event_id: int,
+        idempotent: IdempotencyDep,
+        principal: Principal = Depends(principal_dep),
+        queue_token: Annotated[str | None, Header(alias="X-Queue-Token")] = None,
+    ) -> AsyncGenerator[None, None]:
+        if idempotent.key is not None and await run_in_threadpool(
+            idempotent.has_response, owner=principal.id
+        ):
+            yield
+            return
+
+        on_sale_at = on_sale.pending(event_id)
+        if on_sale_at is not None:
+            opens_in = (on_sale_at - utcnow()).total_seconds()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(NotOnSaleYetException(on_sale_at=on_sale_at)),
+                headers={"Retry-After": str(max(math.ceil(opens_in), 1))},
+            )
+
+        if admission.is_sold_out(event_id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(NoTicketsAvailableException()),
+            )
+
+        result = admission.try_admit(event_id, principal.id, queue_token)
+        if not result.admitted:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail={"token": result.ticket.token, "position": result.position},
+                headers={"Retry-After": "1"},
+            )
+        try:
+            yield
+        finally:
+            admission.release(event_id)
+
+    return admitter
@@ -1,6 +1,17 @@
 from fastapi import APIRouter
 
-from app.api.routes import booking, cmd, event, location, login, ticket, users
+from app.api.routes import (
+    api_key,
+    booking,
+    cmd,
+    event,
+    location,
+    login,
+    metrics,
+    ticket,
+    users,
+    waitlist,
+)
 
 api_router = APIRouter()
 api_router.include_router(cmd.router)
@@ -10,3 +21,6 @@ api_router.include_router(booking.router)
 api_router.include_router(event.router)
 api_router.include_router(location.router)
 api_router.include_router(ticket.router)
+api_router.include_router(waitlist.router)
+api_router.include_router(metrics.router)
+api_router.include_router(api_key.router)
@@ -0,0 +1,49 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.api.deps import SessionDep, roles_required
+from app.core.api_keys import api_keys
+from app.crud import api_key as crud
+from app.exceptions.api_key import MissingApiKeyException
+from app.exceptions.user import MissingUserException
+from app.models.enums import UserRole
+from app.schemas import api_key as schemas
+
+router = APIRouter(
+    prefix="/api-keys",
+    tags=["api-keys"],
+    dependencies=[Depends(roles_required([UserRole.ADMIN]))],
+)
+
+
+@router.post("/", response_model=schemas.ApiKeyCreated)
+def create_api_key(db: SessionDep, api_key: schemas.ApiKeyCreate):
+    """
+    Create an API key acting as a service account (Admin only).
+
+    The key is shown in this response only; send it as `X-API-Key`.
+    """
+    try:
+        db_key, key = crud.create_api_key(db=db, api_key=api_key)
+    except MissingUserException as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    api_keys.reload(db=db)
+    return schemas.ApiKeyCreated(
+        **schemas.ApiKey.model_validate(db_key).model_dump(), key=key
+    )
+
+
+@router.get("/", response_model=list[schemas.ApiKey])
+def get_api_keys(db: SessionDep):
+    """Get all API keys, without the keys themselves (Admin only)."""
+    return crud.get_api_keys(db=db)
+
+
+@router.delete("/{key_id}", response_model=schemas.ApiKey)
+def revoke_api_key(db: SessionDep, key_id: str):
+    """Revoke an API key (Admin only); other workers refuse it shortly after."""
+    try:
+        db_key = crud.revoke_api_key(db=db, key_id=key_id)
+    except MissingApiKeyException as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    api_keys.reload(db=db)
+    return db_key
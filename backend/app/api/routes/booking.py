@@ -1,16 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from collections import Counter
 
-from app.api.deps import SessionDep, get_current_user, roles_required
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
+
+from app.api.deps import (
+    IdempotencyDep,
+    SessionDep,
+    admit_booking,
+    get_principal,
+    roles_required,
+    scoped_principal,
+)
+from app.core.admission import admission
+from app.core.config import settings
+from app.core.group_commit import booking_batcher
+from app.core.on_sale import on_sale
+from app.core.waitlist import offer_freed_tickets
 from app.crud import booking as crud
 from app.crud import event as crud_event
-from app.crud import ticket as ticket_crud
-from app.exceptions.booking import MissingBookingException
+from app.crud import hold as crud_hold
+from app.exceptions.booking import CartItemSoldOutException, MissingBookingException
 from app.exceptions.db import DatabaseException
-from app.exceptions.event import MissingEventException
-from app.models.enums import UserRole
-from app.models.user import User
+from app.exceptions.event import MissingEventException, NotOnSaleYetException
+from app.exceptions.hold import ExpiredSeatHoldException, MissingSeatHoldException
+from app.exceptions.ticket import NoTicketsAvailableException
+from app.models.enums import ApiKeyScope, UserRole
 from app.schemas import booking as schemas
-from app.schemas import ticket as ticket_schemas
+from app.schemas import hold as hold_schemas
+from app.schemas.token import Principal
 
 router = APIRouter(prefix="/bookings", tags=["bookings"])
 
@@ -26,45 +42,276 @@ def get_bookings(db: SessionDep):
 
 
 @router.get("/me", response_model=list[schemas.Booking])
-def get_bookings_me(db: SessionDep, current_user: User = Depends(get_current_user)):
+def get_bookings_me(
+    db: SessionDep,
+    current_user: Principal = Depends(scoped_principal(ApiKeyScope.BOOKINGS_READ)),
+):
     """Get current user's bookings."""
     return crud.get_bookings_by_user(db=db, user_id=current_user.id)
 
 
-@router.post("/event/{event_id}", response_model=schemas.Booking)
+@router.post(
+    "/event/{event_id}",
+    dependencies=[Depends(admit_booking(ApiKeyScope.BOOKINGS_WRITE))],
+    response_model=schemas.Booking,
+)
 def book_event(
-    db: SessionDep, event_id: int, current_user: User = Depends(get_current_user)
+    db: SessionDep,
+    event_id: int,
+    idempotent: IdempotencyDep,
+    current_user: Principal = Depends(scoped_principal(ApiKeyScope.BOOKINGS_WRITE)),
 ):
-    try:
-        available = ticket_crud.get_available_ticket_count_by_event(
-            db=db, event_id=event_id
-        )
-    except MissingEventException as e:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    """Book a ticket for an event. Retries with the same Idempotency-Key replay."""
+
+    def book():
+        try:
+            if settings.BOOKING_GROUP_COMMIT:
+                db_booking = booking_batcher.book(
+                    db=db, event_id=event_id, user_id=current_user.id
+                )
+            else:
+                db_booking = crud.book_ticket(
+                    db=db, event_id=event_id, user_id=current_user.id
+                )
+            on_sale.availability.pop(event_id)
+            return db_booking
+        except MissingEventException as e:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+        except NotOnSaleYetException as e:
+            on_sale.schedule(event_id, e.on_sale_at)
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        except NoTicketsAvailableException as e:
+            admission.mark_sold_out(event_id)
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        except DatabaseException as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e),
+            )
+
+    return idempotent.run(
+        owner=current_user.id, handler=book, response_model=schemas.Booking
+    )
 
-    if available <= 0:
-        raise HTTPException(status_code=400, detail="No tickets available")
 
-    event = crud_event.get_event(db=db, event_id=event_id)
+@router.post(
+    "/event/{event_id}/batch",
+    dependencies=[Depends(admit_booking(ApiKeyScope.BOOKINGS_WRITE))],
+    response_model=list[schemas.Booking],
+)
+def book_event_batch(
+    db: SessionDep,
+    event_id: int,
+    batch: schemas.BookingBatchCreate,
+    idempotent: IdempotencyDep,
+    current_user: Principal = Depends(scoped_principal(ApiKeyScope.BOOKINGS_WRITE)),
+):
+    """Book several tickets for an event at once: all of them or none."""
+
+    def book():
+        try:
+            db_bookings = crud.book_tickets(
+                db=db,
+                event_id=event_id,
+                user_id=current_user.id,
+                quantity=batch.quantity,
+            )
+            on_sale.availability.pop(event_id)
+            return db_bookings
+        except MissingEventException as e:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+        except NotOnSaleYetException as e:
+            on_sale.schedule(event_id, e.on_sale_at)
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        except NoTicketsAvailableException as e:
+            admission.mark_sold_out(event_id)
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        except DatabaseException as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e),
+            )
+
+    return idempotent.run(
+        owner=current_user.id,
+        handler=book,
+        response_model=list[schemas.Booking],
+        body=batch,
+    )
+
+
+@router.post(
+    "/event/{event_id}/hold",
+    dependencies=[Depends(admit_booking())],
+    response_model=hold_schemas.SeatHold,
+)
+def hold_event(
+    db: SessionDep,
+    event_id: int,
+    hold: hold_schemas.SeatHoldCreate,
+    idempotent: IdempotencyDep,
+    current_user: Principal = Depends(get_principal),
+):
+    """Hold tickets for an event; confirm the hold before it expires to book them."""
+
+    def create():
+        try:
+            db_hold = crud_hold.create_hold(
+                db=db,
+                event_id=event_id,
+                user_id=current_user.id,
+                quantity=hold.quantity,
+                ttl_seconds=settings.SEAT_HOLD_TTL_SECONDS,
+            )
+            on_sale.availability.pop(event_id)
+            return db_hold
+        except MissingEventException as e:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+        except NotOnSaleYetException as e:
+            on_sale.schedule(event_id, e.on_sale_at)
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        except NoTicketsAvailableException as e:
+            admission.mark_sold_out(event_id)
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-    ticket_in = ticket_schemas.TicketCreate(
-        event_id=event_id, seat_num="temp", price=25
+    return idempotent.run(
+        owner=current_user.id,
+        handler=create,
+        response_model=hold_schemas.SeatHold,
+        body=hold,
     )
-    ticket = ticket_crud.create_ticket(db=db, ticket=ticket_in)
 
-    final_seat_num = f"{event.title}-{ticket.id}"
-    ticket_update_in = ticket_schemas.TicketUpdate(seat_num=final_seat_num)
-    ticket = ticket_crud.update_ticket(
-        db=db, ticket_id=ticket.id, ticket=ticket_update_in
+
+@router.post("/cart", response_model=list[schemas.Booking])
+def checkout_cart(
+    db: SessionDep,
+    cart: schemas.CartCheckout,
+    idempotent: IdempotencyDep,
+    current_user: Principal = Depends(get_principal),
+):
+    """
+    Book tickets of several events in one transaction: all of them or none.
+
+    Carts skip the per-event waiting room: a queue token admits to one
+    event's line, and holding slots in several lines while waiting in one
+    would block the others. Sold-out events and events not on sale yet are
+    still refused from memory.
+    """
+    items = Counter()
+    for item in cart.items:
+        items[item.event_id] += item.quantity
+
+    def checkout():
+        for event_id in items:
+            on_sale_at = on_sale.pending(event_id)
+            if on_sale_at is not None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=str(NotOnSaleYetException(on_sale_at=on_sale_at)),
+                )
+            if admission.is_sold_out(event_id):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=str(CartItemSoldOutException(event_id=event_id)),
+                )
+        try:
+            db_bookings = crud.checkout_cart(
+                db=db, user_id=current_user.id, items=items
+            )
+            for event_id in items:
+                on_sale.availability.pop(event_id)
+            return db_bookings
+        except MissingEventException as e:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+        except CartItemSoldOutException as e:
+            admission.mark_sold_out(e.event_id)
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        except (NotOnSaleYetException, DatabaseException) as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return idempotent.run(
+        owner=current_user.id,
+        handler=checkout,
+        response_model=list[schemas.Booking],
+        body=cart,
     )
 
-    booking_in = schemas.BookingCreate(user_id=current_user.id, ticket_id=ticket.id)
-    return crud.create_booking(db=db, booking_data=booking_in)
+
+@router.post("/holds/{hold_id}/confirm", response_model=list[schemas.Booking])
+def confirm_hold(
+    db: SessionDep, hold_id: int, current_user: Principal = Depends(get_principal)
+):
+    """Book the tickets of an own, unexpired hold."""
+    try:
+        return crud_hold.confirm_hold(db=db, hold_id=hold_id, user_id=current_user.id)
+    except (MissingSeatHoldException, MissingEventException) as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except (
+        ExpiredSeatHoldException,
+        NoTicketsAvailableException,
+        DatabaseException,
+    ) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.delete("/holds/{hold_id}", response_model=hold_schemas.SeatHold)
+def release_hold(
+    db: SessionDep,
+    hold_id: int,
+    background_tasks: BackgroundTasks,
+    current_user: Principal = Depends(get_principal),
+):
+    """Release an own hold before it expires."""
+    try:
+        released = crud_hold.release_hold(
+            db=db, hold_id=hold_id, user_id=current_user.id
+        )
+        background_tasks.add_task(
+            offer_freed_tickets, db.get_bind(), released.event_id
+        )
+        return released
+    except MissingSeatHoldException as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ExpiredSeatHoldException as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/queue/{token}", response_model=schemas.BookingQueueStatus)
+async def get_queue_status(
+    token: str,
+    wait: float = Query(0, ge=0, le=30),
+    current_user: Principal = Depends(scoped_principal(ApiKeyScope.BOOKINGS_WRITE)),
+):
+    """Report an own queue token's position, long-polling up to `wait` seconds."""
+    ticket = admission.get_ticket(token, current_user.id)
+    found = None
+    if ticket is not None:
+        if wait:
+            found = await admission.wait(ticket, wait)
+        else:
+            found = admission.status(ticket)
+    if found is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Queue token not found or expired",
+        )
+
+    position, ready = found
+    return schemas.BookingQueueStatus(
+        token=token,
+        event_id=ticket.event_id,
+        position=position,
+        ready=ready,
+        sold_out=admission.is_sold_out(ticket.event_id),
+    )
 
 
 @router.delete("/me/{booking_number}", response_model=schemas.BookingDeleted)
 def delete_own_booking(
-    db: SessionDep, booking_number: int, current_user: User = Depends(get_current_user)
+    db: SessionDep,
+    booking_number: int,
+    background_tasks: BackgroundTasks,
+    current_user: Principal = Depends(get_principal),
 ):
     """Delete own booking (and associated ticket)."""
     try:
@@ -74,7 +321,10 @@ def delete_own_booking(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You can only delete your own bookings",
             )
-        return crud.delete_booking(db=db, booking_number=booking_number)
+        event_id = booking.ticket.event_id
+        deleted = crud.delete_booking(db=db, booking_number=booking_number)
+        background_tasks.add_task(offer_freed_tickets, db.get_bind(), event_id)
+        return deleted
     except MissingBookingException as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except DatabaseException as e:
@@ -88,7 +338,7 @@ def delete_own_booking(
 def get_bookings_by_event(
     db: SessionDep,
     event_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(scoped_principal(ApiKeyScope.BOOKINGS_READ)),
 ):
     """Get all bookings for an event (Organizer of event or Admin only)."""
     try:
@@ -111,7 +361,9 @@ def get_bookings_by_event(
 
 @router.get(
     "/{booking_number}",
-    dependencies=[Depends(roles_required([UserRole.ADMIN]))],
+    dependencies=[
+        Depends(roles_required([UserRole.ADMIN], scope=ApiKeyScope.BOOKINGS_READ))
+    ],
     response_model=schemas.Booking,
 )
 def get_booking(db: SessionDep, booking_number: int):
@@ -147,10 +399,16 @@ def update_booking(db: SessionDep, booking_number: int, booking: schemas.Booking
     dependencies=[Depends(roles_required([UserRole.ADMIN]))],
     response_model=schemas.BookingDeleted,
 )
-def delete_booking(db: SessionDep, booking_number: int):
+def delete_booking(
+    db: SessionDep, booking_number: int, background_tasks: BackgroundTasks
+):
     """Delete a booking and its ticket (Admin only)."""
     try:
-        return crud.delete_booking(db=db, booking_number=booking_number)
+        booking = crud.get_booking(db=db, booking_number=booking_number)
+        event_id = booking.ticket.event_id
+        deleted = crud.delete_booking(db=db, booking_number=booking_number)
+        background_tasks.add_task(offer_freed_tickets, db.get_bind(), event_id)
+        return deleted
     except MissingBookingException as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except DatabaseException as e:
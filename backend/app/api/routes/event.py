@@ -1,12 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-
-from app.api.deps import SessionDep, get_current_user, roles_required
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi.responses import JSONResponse
+
+from app.api.deps import (
+    IdempotencyDep,
+    SessionDep,
+    get_principal,
+    roles_required,
+)
+from app.core.on_sale import on_sale
+from app.core.waitlist import offer_freed_tickets
 from app.crud import event as crud
 from app.exceptions.db import DatabaseException
 from app.exceptions.event import MissingEventException, WrongRoleException
 from app.models.enums import UserRole
-from app.models.user import User
 from app.schemas import event as schemas
+from app.schemas.token import Principal
 
 router = APIRouter(prefix="/events", tags=["events"])
 
@@ -21,7 +29,7 @@ def get_events(
 
 
 @router.get("/me", response_model=list[schemas.Event])
-def get_events_me(db: SessionDep, current_user: User = Depends(get_current_user)):
+def get_events_me(db: SessionDep, current_user: Principal = Depends(get_principal)):
     return crud.get_event_by_organizer(db=db, organizer_id=current_user.id)
 
 
@@ -33,29 +41,44 @@ def get_events_me(db: SessionDep, current_user: User = Depends(get_current_user)
 def create_event(
     db: SessionDep,
     event: schemas.EventCreate,
-    current_user: User = Depends(get_current_user),
+    idempotent: IdempotencyDep,
+    current_user: Principal = Depends(get_principal),
 ):
-    try:
-        if current_user.role != UserRole.ADMIN.value:
-            event.organizer_id = current_user.id
-        elif event.organizer_id is None:
-            event.organizer_id = current_user.id
+    def create():
+        try:
+            if current_user.role != UserRole.ADMIN.value:
+                event.organizer_id = current_user.id
+            elif event.organizer_id is None:
+                event.organizer_id = current_user.id
+
+            db_event = crud.create_event(db=db, event=event)
+            on_sale.schedule(db_event.id, db_event.on_sale_at)
+            return db_event
+        except WrongRoleException as e:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=str(e),
+            )
+        except DatabaseException as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e),
+            )
 
-        return crud.create_event(db=db, event=event)
-    except WrongRoleException as e:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail=str(e),
-        )
-    except DatabaseException as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e),
-        )
+    return idempotent.run(
+        owner=current_user.id,
+        handler=create,
+        response_model=schemas.Event,
+        body=event,
+    )
 
 
 @router.get("/{event_id}", response_model=schemas.Event)
 def get_event(db: SessionDep, event_id: int):
+    # Pre-serialized by the on-sale scheduler for events about to go on sale
+    payload = on_sale.events.get(event_id)
+    if payload is not None:
+        return JSONResponse(payload)
     try:
         return crud.get_event(db=db, event_id=event_id)
     except MissingEventException as e:
@@ -71,7 +94,8 @@ def update_event(
     db: SessionDep,
     event_id: int,
     event: schemas.EventUpdate,
-    current_user: User = Depends(get_current_user),
+    background_tasks: BackgroundTasks,
+    current_user: Principal = Depends(get_principal),
 ):
     try:
         db_event = crud.get_event(db=db, event_id=event_id)
@@ -83,7 +107,13 @@ def update_event(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You can only update your own events",
             )
-        return crud.update_event(db=db, event_id=event_id, event=event)
+        old_capacity = db_event.ticket_capacity
+        updated = crud.update_event(db=db, event_id=event_id, event=event)
+        on_sale.forget(event_id)
+        on_sale.schedule(event_id, updated.on_sale_at)
+        if updated.ticket_capacity > old_capacity:
+            background_tasks.add_task(offer_freed_tickets, db.get_bind(), event_id)
+        return updated
     except MissingEventException as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except WrongRoleException as e:
@@ -101,12 +131,12 @@ def update_event(
 @router.delete(
     "/{event_id}",
     dependencies=[Depends(roles_required([UserRole.ADMIN, UserRole.ORGANIZER]))],
-    response_model=schemas.Event,
+    response_model=schemas.EventDeleted,
 )
 def delete_event(
     db: SessionDep,
     event_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_principal),
 ):
     try:
         db_event = crud.get_event(db=db, event_id=event_id)
@@ -118,7 +148,9 @@ def delete_event(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You can only delete your own events",
             )
-        return crud.delete_event(db=db, event_id=event_id)
+        deleted = crud.delete_event(db=db, event_id=event_id)
+        on_sale.forget(event_id)
+        return deleted
     except MissingEventException as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except DatabaseException as e:
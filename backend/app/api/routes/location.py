@@ -66,7 +66,7 @@ def update_location(db: SessionDep, location_id: int, location: schemas.Location
 @router.delete(
     "/{location_id}",
     dependencies=[Depends(roles_required([UserRole.ADMIN]))],
-    response_model=schemas.Location,
+    response_model=schemas.LocationDeleted,
 )
 def delete_location(db: SessionDep, location_id: int):
     try:
@@ -1,13 +1,17 @@
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 
-from app.api.deps import CurrentUser, SessionDep
+from app.api.deps import CurrentUser, SessionDep, check_scope, get_token_data
 from app.core import security
 from app.core.config import settings
+from app.core.denylist import token_denylist
+from app.core.login_throttle import login_throttle
 from app.crud import user as crud
+from app.crud.revoked_token import revoke_token
+from app.exceptions.security import LoginThrottledException
 from app.schemas import token as schemas
 from app.schemas.user import User
 
@@ -16,8 +20,23 @@ router = APIRouter(tags=["login"])
 
 @router.post("/login", response_model=schemas.Token)
 def login_access_token(
-    session: SessionDep, form_data: Annotated[OAuth2PasswordRequestForm, Depends()]
+    request: Request,
+    session: SessionDep,
+    form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
 ) -> schemas.Token:
+    # Before any query or hash, so a credential stuffing burst costs no CPU
+    try:
+        login_throttle.hit(
+            email=form_data.username,
+            address=request.client.host if request.client else None,
+        )
+    except LoginThrottledException as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
     user = crud.authenticate_user(
         db=session, email=form_data.username, password=form_data.password
     )
@@ -33,7 +52,11 @@ def login_access_token(
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     return schemas.Token(
         access_token=security.create_access_token(
-            user.email, expires_delta=access_token_expires, role=user.role.value
+            user.email,
+            expires_delta=access_token_expires,
+            role=user.role.value,
+            user_id=user.id,
+            token_version=user.token_version,
         ),
         token_type="bearer",
     )
@@ -42,3 +65,16 @@ def login_access_token(
 @router.post("/me", response_model=User)
 def test_access_token(current_user: CurrentUser) -> Any:
     return current_user
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(
+    session: SessionDep, token_data: schemas.TokenData = Depends(get_token_data)
+) -> None:
+    """Revoke the access token the request was made with."""
+    check_scope(token_data, None)
+    expires_at = datetime.fromtimestamp(token_data.exp, timezone.utc).replace(
+        tzinfo=None
+    )
+    revoke_token(db=session, jti=token_data.jti, expires_at=expires_at)
+    token_denylist.add(token_data.jti, expires_at)
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends
+
+from app.api.deps import roles_required
+from app.core.denylist import token_denylist
+from app.core.hashing import password_hasher
+from app.core.idempotency import idempotency
+from app.core.login_throttle import login_throttle
+from app.core.on_sale import on_sale
+from app.core.retry import retrier
+from app.core.token_cache import verified_tokens
+from app.core.token_versions import token_versions
+from app.core.user_cache import user_cache
+from app.models.enums import UserRole
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["metrics"],
+    dependencies=[Depends(roles_required([UserRole.ADMIN]))],
+)
+
+
+@router.get("/")
+def get_metrics():
+    """Process-local counters of this worker (Admin only)."""
+    return {
+        "db_retries": retrier.stats(),
+        "password_hashing": password_hasher.stats(),
+        "login_throttle": login_throttle.stats(),
+        "revoked_tokens": len(token_denylist),
+        "caches": {
+            "idempotency": idempotency.cache.stats(),
+            "event_detail": on_sale.events.stats(),
+            "event_availability": on_sale.availability.stats(),
+            "token_versions": token_versions.cache.stats(),
+            "verified_tokens": verified_tokens.cache.stats(),
+            "users": user_cache.stats(),
+        },
+    }
@@ -1,12 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 
-from app.api.deps import SessionDep, roles_required
+from app.api.deps import IdempotencyDep, SessionDep, roles_required
+from app.core.on_sale import on_sale
+from app.core.waitlist import offer_freed_tickets
 from app.crud import ticket as crud
 from app.exceptions.db import DatabaseException
 from app.exceptions.event import MissingEventException
-from app.exceptions.ticket import MissingTicketException
+from app.exceptions.ticket import (
+    MissingTicketException,
+    PreallocatedSeatMoveException,
+)
 from app.models.enums import UserRole
 from app.schemas import ticket as schemas
+from app.schemas.token import TokenData
 
 router = APIRouter(prefix="/tickets", tags=["tickets"])
 
@@ -20,24 +26,37 @@ def get_tickets(db: SessionDep):
     return crud.get_tickets(db=db)
 
 
-@router.post(
-    "/",
-    dependencies=[Depends(roles_required([UserRole.ORGANIZER, UserRole.ADMIN]))],
-    response_model=schemas.Ticket,
-)
-def create_ticket(db: SessionDep, ticket: schemas.TicketCreate):
-    try:
-        return crud.create_ticket(db=db, ticket=ticket)
-    except MissingEventException as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e),
-        )
-    except DatabaseException as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e),
-        )
+@router.post("/", response_model=schemas.Ticket)
+def create_ticket(
+    db: SessionDep,
+    ticket: schemas.TicketCreate,
+    idempotent: IdempotencyDep,
+    token_data: TokenData = Depends(
+        roles_required([UserRole.ORGANIZER, UserRole.ADMIN])
+    ),
+):
+    def create():
+        try:
+            db_ticket = crud.create_ticket(db=db, ticket=ticket)
+            on_sale.availability.pop(ticket.event_id)
+            return db_ticket
+        except MissingEventException as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e),
+            )
+        except DatabaseException as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e),
+            )
+
+    return idempotent.run(
+        owner=token_data.user_id,
+        handler=create,
+        response_model=schemas.Ticket,
+        body=ticket,
+    )
 
 
 @router.get("/{ticket_id}", response_model=schemas.Ticket)
@@ -53,12 +72,21 @@ def get_ticket(db: SessionDep, ticket_id: int):
     dependencies=[Depends(roles_required([UserRole.ORGANIZER, UserRole.ADMIN]))],
     response_model=schemas.Ticket,
 )
-def update_ticket(db: SessionDep, ticket_id: int, ticket: schemas.TicketUpdate):
+def update_ticket(
+    db: SessionDep,
+    ticket_id: int,
+    ticket: schemas.TicketUpdate,
+    background_tasks: BackgroundTasks,
+):
     try:
-        return crud.update_ticket(db=db, ticket_id=ticket_id, ticket=ticket)
+        event_id = crud.get_ticket(db=db, ticket_id=ticket_id).event_id
+        updated = crud.update_ticket(db=db, ticket_id=ticket_id, ticket=ticket)
+        if updated.event_id != event_id:
+            background_tasks.add_task(offer_freed_tickets, db.get_bind(), event_id)
+        return updated
     except MissingTicketException as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
-    except DatabaseException as e:
+    except (PreallocatedSeatMoveException, DatabaseException) as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e),
@@ -70,10 +98,14 @@ def update_ticket(db: SessionDep, ticket_id: int, ticket: schemas.TicketUpdate):
     dependencies=[Depends(roles_required([UserRole.ADMIN]))],
     response_model=schemas.TicketDeleted,
 )
-def delete_ticket(db: SessionDep, ticket_id: int):
+def delete_ticket(db: SessionDep, ticket_id: int, background_tasks: BackgroundTasks):
     """Delete a ticket (Admin only). Note: Prefer deleting via bookings."""
     try:
-        return crud.delete_ticket(db=db, ticket_id=ticket_id)
+        deleted = crud.delete_ticket(db=db, ticket_id=ticket_id)
+        background_tasks.add_task(
+            offer_freed_tickets, db.get_bind(), deleted.event_id
+        )
+        return deleted
     except MissingTicketException as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except DatabaseException as e:
@@ -95,4 +127,7 @@ def get_available_tickets_by_event(db: SessionDep, event_id: int):
 
 @router.get("/event/{event_id}/available/count", response_model=int)
 def get_available_ticket_count_by_event(db: SessionDep, event_id: int):
+    available = on_sale.availability.get(event_id)
+    if available is not None:
+        return available
     return crud.get_available_ticket_count_by_event(db=db, event_id=event_id)
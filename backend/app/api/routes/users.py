@@ -1,12 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import io
 
-from app.api.deps import SessionDep, get_current_user, roles_required
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, status
+
+from app.api.deps import SessionDep, get_current_user, get_principal, roles_required
+from app.core.config import settings
+from app.core.token_versions import token_versions
+from app.core.user_import import ImportFormat, guess_format, parse_users
 from app.crud import user as crud
 from app.exceptions.db import DatabaseException
-from app.exceptions.user import DuplicateEmailException, MissingUserException
+from app.exceptions.user import (
+    DuplicateEmailException,
+    MissingUserException,
+    TooManyUsersToImportException,
+)
 from app.models.enums import UserRole
 from app.models.user import User
 from app.schemas import user as schemas
+from app.schemas.token import Principal
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -36,6 +46,44 @@ def register_user(db: SessionDep, user: schemas.UserCreate):
         )
 
 
+@router.post(
+    "/import",
+    dependencies=[Depends(roles_required([UserRole.ADMIN]))],
+    response_model=schemas.UserImportResult,
+)
+def import_users(db: SessionDep, file: UploadFile, format: ImportFormat | None = None):
+    """
+    Create the users in a CSV or NDJSON file (Admin only).
+
+    Rows that can't be imported are reported and skipped; the others are
+    created. The format follows the file name unless given. Uploads are
+    limited to USER_IMPORT_MAX_ROWS users, since passwords are hashed
+    within the request.
+    """
+    lines = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        users, errors = parse_users(
+            lines,
+            format or guess_format(file.filename),
+            max_rows=settings.USER_IMPORT_MAX_ROWS,
+        )
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The file is not UTF-8 encoded",
+        )
+    except TooManyUsersToImportException as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE, detail=str(e)
+        )
+
+    result = crud.import_users(
+        db=db, users=users, chunk_size=settings.USER_IMPORT_CHUNK_SIZE
+    )
+    result.errors = sorted(errors + result.errors, key=lambda error: error.line)
+    return result
+
+
 @router.put(
     "/update/{user_id}",
     dependencies=[Depends(roles_required([UserRole.ADMIN]))],
@@ -43,7 +91,9 @@ def register_user(db: SessionDep, user: schemas.UserCreate):
 )
 def update_user(db: SessionDep, user: schemas.UserUpdate, user_id: int):
     try:
-        return crud.update_user(db=db, user=user, user_id=user_id)
+        db_user = crud.update_user(db=db, user=user, user_id=user_id)
+        token_versions.forget(user_id)
+        return db_user
     except MissingUserException as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except DuplicateEmailException as e:
@@ -62,7 +112,7 @@ def update_user(db: SessionDep, user: schemas.UserUpdate, user_id: int):
 def get_user(
     db: SessionDep,
     user_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_principal),
 ):
     if current_user.role != UserRole.ADMIN.value and current_user.id != user_id:
         raise HTTPException(
@@ -0,0 +1,60 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.api.deps import SessionDep, get_principal
+from app.crud import waitlist as crud
+from app.exceptions.event import MissingEventException
+from app.exceptions.waitlist import (
+    AlreadyWaitlistedException,
+    MissingWaitlistEntryException,
+    TicketsStillAvailableException,
+)
+from app.schemas import waitlist as schemas
+from app.schemas.token import Principal
+
+router = APIRouter(prefix="/waitlist", tags=["waitlist"])
+
+
+@router.post("/event/{event_id}", response_model=schemas.WaitlistPosition)
+def join_waitlist(
+    db: SessionDep, event_id: int, current_user: Principal = Depends(get_principal)
+):
+    """Join a sold-out event's waitlist; freed tickets are booked in join order."""
+    try:
+        crud.join_waitlist(db=db, event_id=event_id, user_id=current_user.id)
+        position = crud.get_waitlist_position(
+            db=db, event_id=event_id, user_id=current_user.id
+        )
+        return schemas.WaitlistPosition(
+            event_id=event_id, user_id=current_user.id, position=position
+        )
+    except MissingEventException as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except (AlreadyWaitlistedException, TicketsStillAvailableException) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/event/{event_id}", response_model=schemas.WaitlistPosition)
+def get_waitlist_position(
+    db: SessionDep, event_id: int, current_user: Principal = Depends(get_principal)
+):
+    """Get the number of users ahead of the current user on the waitlist."""
+    try:
+        position = crud.get_waitlist_position(
+            db=db, event_id=event_id, user_id=current_user.id
+        )
+        return schemas.WaitlistPosition(
+            event_id=event_id, user_id=current_user.id, position=position
+        )
+    except MissingWaitlistEntryException as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+
+@router.delete("/event/{event_id}", response_model=schemas.WaitlistEntry)
+def leave_waitlist(
+    db: SessionDep, event_id: int, current_user: Principal = Depends(get_principal)
+):
+    """Leave an event's waitlist."""
+    try:
+        return crud.leave_waitlist(db=db, event_id=event_id, user_id=current_user.id)
+    except MissingWaitlistEntryException as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
@@ -0,0 +1,89 @@
+import argparse
+import logging
+import time
+
+from app.core.config import settings
+from app.core.security import (
+    PASSWORD_HASH_COSTS,
+    PASSWORD_HASH_SCHEMES,
+    make_pwd_context,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Cost range tried per scheme
+COST_RANGES = {
+    "bcrypt": range(4, 18),
+    "argon2": range(1, 21),
+    "scrypt": range(10, 21),
+}
+
+# Setting holding each scheme's cost
+COST_SETTINGS = {
+    "bcrypt": "PASSWORD_HASH_BCRYPT_ROUNDS",
+    "argon2": "PASSWORD_HASH_ARGON2_TIME_COST",
+    "scrypt": "PASSWORD_HASH_SCRYPT_ROUNDS",
+}
+
+
+def measure_verify(scheme: str, cost: int, samples: int = 3) -> float:
+    """
+    Return the fastest of `samples` verifications, in seconds, of a hash made
+    with `scheme` at `cost`.
+    """
+    pwd_context = make_pwd_context(
+        scheme,
+        **{f"{scheme}__{PASSWORD_HASH_COSTS[scheme]}": cost},
+        argon2__memory_cost=settings.PASSWORD_HASH_ARGON2_MEMORY_COST_KIB,
+    )
+    hashed = pwd_context.hash("calibration")
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        pwd_context.verify("calibration", hashed)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def calibrate(scheme: str, target: float) -> int:
+    """
+    Return the highest cost whose verification takes at most `target` seconds
+    on this machine, or the lowest cost if even that is slower.
+    """
+    costs = COST_RANGES[scheme]
+    chosen = costs[0]
+    for cost in costs:
+        elapsed = measure_verify(scheme, cost)
+        logger.info("%s=%d: %.1f ms", COST_SETTINGS[scheme], cost, elapsed * 1000)
+        if elapsed > target:
+            break
+        chosen = cost
+    return chosen
+
+
+def main() -> None:
+    """
+    Pick the password hashing cost for a target verification time on the
+    hardware this runs on, and print the settings to use.
+
+    Run on the production hardware, e.g. inside the backend container.
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument(
+        "--scheme",
+        choices=PASSWORD_HASH_SCHEMES,
+        default=settings.PASSWORD_HASH_SCHEME,
+    )
+    parser.add_argument(
+        "--target-ms", type=float, default=250, help="Verify time budget per login."
+    )
+    args = parser.parse_args()
+
+    cost = calibrate(args.scheme, args.target_ms / 1000)
+    print(f"PASSWORD_HASH_SCHEME={args.scheme}")
+    print(f"{COST_SETTINGS[args.scheme]}={cost}")
+
+
+if __name__ == "__main__":
+    main()
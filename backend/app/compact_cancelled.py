@@ -0,0 +1,40 @@
+import logging
+from datetime import timedelta
+
+from sqlalchemy.orm import Session
+
+from app.core.clock import utcnow
+from app.core.config import settings
+from app.crud.cancellation import archive_cancelled
+from app.database.session import engine
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    """
+    Move bookings and tickets cancelled more than CANCELLED_RETENTION_DAYS ago
+    out of the hot tables into bookings_archive and tickets_archive.
+
+    Meant to run periodically, e.g. from cron, while the API is serving.
+    """
+    cancelled_before = utcnow() - timedelta(
+        days=settings.CANCELLED_RETENTION_DAYS
+    )
+    logger.info("Archiving rows cancelled before %s", cancelled_before.date())
+    with Session(engine) as session:
+        archived = archive_cancelled(
+            db=session,
+            cancelled_before=cancelled_before,
+            batch_size=settings.COMPACTION_BATCH_SIZE,
+        )
+    logger.info(
+        "Archived %d booking(s), %d ticket(s)",
+        archived["bookings"],
+        archived["tickets"],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+import asyncio
+import secrets
+import time
+from dataclasses import dataclass, field
+
+from app.core.config import settings
+
+
+@dataclass
+class QueueTicket:
+    token: str
+    event_id: int
+    owner: int
+    seq: int
+    last_seen: float
+
+
+@dataclass
+class _EventLine:
+    active: int = 0
+    next_seq: int = 0
+    waiting: dict[str, QueueTicket] = field(default_factory=dict)
+    changed: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+@dataclass
+class Admission:
+    admitted: bool
+    ticket: QueueTicket | None = None
+    position: int = 0
+
+
+class AdmissionQueue:
+    """
+    Per-event waiting room in front of the booking transactions.
+
+    At most `max_active` bookings per event run against the database at once.
+    Callers over the limit get a queue token and are admitted in FIFO order
+    when they come back with it; a token only counts for the caller it was
+    issued to. Events known to be sold out are rejected from memory. State is
+    per process; the lines are only touched from the event loop, sold-out
+    marks are single dict writes from any thread.
+    """
+
+    def __init__(self, max_active: int, token_ttl: float, sold_out_ttl: float):
+        self.max_active = max_active
+        self.token_ttl = token_ttl
+        self.sold_out_ttl = sold_out_ttl
+        self._lines: dict[int, _EventLine] = {}
+        self._tickets: dict[str, QueueTicket] = {}
+        self._sold_out: dict[int, float] = {}
+
+    def reset(self) -> None:
+        self._lines.clear()
+        self._tickets.clear()
+        self._sold_out.clear()
+
+    def is_sold_out(self, event_id: int) -> bool:
+        expires = self._sold_out.get(event_id)
+        if expires is None:
+            return False
+        if expires < time.monotonic():
+            self._sold_out.pop(event_id, None)
+            return False
+        return True
+
+    def mark_sold_out(self, event_id: int) -> None:
+        """
+        Remember that an event is sold out for `sold_out_ttl` seconds.
+
+        The mark expires on its own, so capacity freed by another worker
+        is picked up without any cross-process signalling.
+        """
+        self._sold_out[event_id] = time.monotonic() + self.sold_out_ttl
+
+    def reopen(self, event_id: int) -> None:
+        self._sold_out.pop(event_id, None)
+
+    def _line(self, event_id: int) -> _EventLine:
+        line = self._lines.get(event_id)
+        if line is None:
+            line = self._lines[event_id] = _EventLine()
+        return line
+
+    def _waiting_line(self, ticket: QueueTicket) -> _EventLine | None:
+        # Lookups must not bring back a line that was already dropped
+        line = self._lines.get(ticket.event_id)
+        if line is None or ticket.token not in line.waiting:
+            return None
+        return line
+
+    def _prune(self, line: _EventLine) -> None:
+        # Only abandoned tokens at the head of the line block anyone, so
+        # expiring from the head keeps this O(1) amortized per call.
+        deadline = time.monotonic() - self.token_ttl
+        while line.waiting:
+            head = next(iter(line.waiting.values()))
+            if head.last_seen >= deadline:
+                break
+            del line.waiting[head.token]
+            self._tickets.pop(head.token, None)
+
+    def _position(self, line: _EventLine, ticket: QueueTicket) -> int:
+        # Tokens are only appended, so the first one has the lowest seq. Gaps
+        # left by tokens admitted out of order make this an upper bound.
+        head = next(iter(line.waiting.values()))
+        return ticket.seq - head.seq
+
+    def try_admit(
+        self, event_id: int, owner: int, token: str | None = None
+    ) -> Admission:
+        """
+        Admit a booking for an event or place the caller in its waiting line.
+
+        Args:
+            event_id (int): The event being booked.
+            owner (int): The id of the user booking.
+            token (str | None): The queue token from an earlier attempt.
+
+        Returns:
+            Admission: Whether the caller may proceed, otherwise their ticket
+                       and the number of callers ahead of them.
+        """
+        line = self._line(event_id)
+        self._prune(line)
+        now = time.monotonic()
+
+        ticket = line.waiting.get(token) if token else None
+        if ticket is not None and ticket.owner != owner:
+            ticket = None
+        if ticket is None and not line.waiting and line.active < self.max_active:
+            line.active += 1
+            return Admission(admitted=True)
+
+        if ticket is None:
+            ticket = QueueTicket(
+                token=secrets.token_urlsafe(16),
+                event_id=event_id,
+                owner=owner,
+                seq=line.next_seq,
+                last_seen=now,
+            )
+            line.next_seq += 1
+            line.waiting[ticket.token] = ticket
+            self._tickets[ticket.token] = ticket
+
+        ticket.last_seen = now
+        position = self._position(line, ticket)
+        if position < self.max_active - line.active:
+            del line.waiting[ticket.token]
+            self._tickets.pop(ticket.token, None)
+            line.active += 1
+            return Admission(admitted=True)
+        return Admission(admitted=False, ticket=ticket, position=position)
+
+    def release(self, event_id: int) -> None:
+        line = self._line(event_id)
+        line.active = max(line.active - 1, 0)
+        line.changed.set()
+        line.changed = asyncio.Event()
+        if not line.active and not line.waiting:
+            del self._lines[event_id]
+
+    def get_ticket(self, token: str, owner: int) -> QueueTicket | None:
+        ticket = self._tickets.get(token)
+        if ticket is None or ticket.owner != owner:
+            return None
+        line = self._lines.get(ticket.event_id)
+        if line is None:
+            self._tickets.pop(token, None)
+            return None
+        self._prune(line)
+        if token not in line.waiting:
+            return None
+        ticket.last_seen = time.monotonic()
+        return ticket
+
+    def status(self, ticket: QueueTicket) -> tuple[int, bool] | None:
+        """
+        Return the number of callers ahead of a ticket and whether it may book.
+
+        Returns None once the ticket is no longer waiting in its event's line.
+        """
+        line = self._waiting_line(ticket)
+        if line is None:
+            return None
+        position = self._position(line, ticket)
+        return position, position < self.max_active - line.active
+
+    async def wait(
+        self, ticket: QueueTicket, timeout: float
+    ) -> tuple[int, bool] | None:
+        """
+        Long-poll until a ticket may book, its event sells out or `timeout` ends.
+
+        Returns None as soon as the ticket is no longer waiting.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            found = self.status(ticket)
+            if found is None:
+                return None
+            remaining = deadline - time.monotonic()
+            if found[1] or remaining <= 0 or self.is_sold_out(ticket.event_id):
+                return found
+            changed = self._lines[ticket.event_id].changed
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=min(remaining, 1.0))
+            except asyncio.TimeoutError:
+                pass
+            ticket.last_seen = time.monotonic()
+
+
+admission = AdmissionQueue(
+    max_active=settings.BOOKING_MAX_ACTIVE_PER_EVENT,
+    token_ttl=settings.BOOKING_QUEUE_TOKEN_TTL_SECONDS,
+    sold_out_ttl=settings.BOOKING_SOLD_OUT_TTL_SECONDS,
+)
@@ -0,0 +1,72 @@
+from dataclasses import dataclass
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.periodic import PeriodicTask
+from app.core.security import hash_api_key
+from app.crud.api_key import get_active_api_keys
+from app.database.session import engine
+from app.schemas.token import Principal
+
+
+@dataclass(frozen=True)
+class IndexedApiKey:
+    key_id: str
+    principal: Principal
+    scopes: frozenset[str]
+
+
+class ApiKeyIndex(PeriodicTask):
+    """
+    All unrevoked API keys by hash, reloaded every `interval` seconds.
+
+    Checking a key costs one HMAC and one dict lookup, with no query. The
+    worker creating or revoking a key reloads right away; other workers see
+    the change at their next reload, as they do role changes of the
+    service accounts.
+    """
+
+    name = "api-key-index"
+
+    def __init__(self, bind: Engine, interval: float):
+        super().__init__(bind=bind, interval=interval)
+        self._keys: dict[str, IndexedApiKey] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def reset(self) -> None:
+        self._keys = {}
+
+    def get(self, key: str) -> IndexedApiKey | None:
+        return self._keys.get(hash_api_key(key))
+
+    def tick(self) -> int:
+        with Session(self.bind) as session:
+            return self.reload(db=session)
+
+    def reload(self, *, db: Session) -> int:
+        """
+        Reload the index.
+
+        Returns:
+            int: The number of unrevoked keys.
+        """
+        rows = get_active_api_keys(db=db)
+        # Swapped whole, so lookups never see a half built index
+        self._keys = {
+            row.key_hash: IndexedApiKey(
+                key_id=row.key_id,
+                principal=Principal(id=row.user_id, email=row.email, role=row.role),
+                scopes=frozenset(row.scopes),
+            )
+            for row in rows
+        }
+        return len(self._keys)
+
+
+api_keys = ApiKeyIndex(
+    bind=engine, interval=settings.API_KEY_REFRESH_INTERVAL_SECONDS
+)
@@ -23,6 +23,20 @@ class Settings(BaseSettings):
     SECRET_KEY: str = secrets.token_urlsafe(32)
     # 60 minutes * 24 hours * 8 days = 8 days
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8
+    # Token versions are cached per worker; revoked tokens work at most this long
+    TOKEN_VERSION_CACHE_TTL_SECONDS: int = 10
+    TOKEN_VERSION_CACHE_SIZE: int = 100_000
+    VERIFIED_TOKEN_CACHE_SIZE: int = 100_000
+    # Revoked tokens are synced into every worker this often; 8 Mbit keep
+    # false positives of the denylist's Bloom filter under 1% up to ~800k
+    TOKEN_DENYLIST_SYNC_INTERVAL_SECONDS: int = 2
+    TOKEN_DENYLIST_BLOOM_BITS: int = 1 << 23
+    # API keys are indexed per worker; revocations by other workers apply this late
+    API_KEY_REFRESH_INTERVAL_SECONDS: int = 10
+    # Users are cached per worker; changes made by other workers show up this late
+    USER_CACHE_TTL_SECONDS: int = 30
+    # Around 1 KB per user
+    USER_CACHE_SIZE: int = 250_000
 
     PROJECT_NAME: str = "RDP-2026"
     POSTGRES_SERVER: str = "db"
@@ -31,6 +45,71 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str = "postgres"
     POSTGRES_DB: str = "appdb"
 
+    # Flash-sale waiting room in front of POST /bookings/event/{event_id}
+    BOOKING_MAX_ACTIVE_PER_EVENT: int = 16
+    BOOKING_QUEUE_TOKEN_TTL_SECONDS: int = 30
+    BOOKING_SOLD_OUT_TTL_SECONDS: int = 5
+    # Opt-in group commit: concurrent bookings of one event share a transaction.
+    # Admission lets at most BOOKING_MAX_ACTIVE_PER_EVENT of them in at once,
+    # which also bounds the batch; raise both together.
+    BOOKING_GROUP_COMMIT: bool = False
+    BOOKING_GROUP_COMMIT_WINDOW_MS: int = 3
+    BOOKING_GROUP_COMMIT_MAX_BATCH: int = 16
+    # Two-phase booking: seat holds and the sweeper releasing expired ones
+    SEAT_HOLD_TTL_SECONDS: int = 600
+    SEAT_HOLD_SWEEP_INTERVAL_SECONDS: int = 5
+    # Waitlist users booked per transaction when capacity frees up
+    WAITLIST_PROMOTION_BATCH_SIZE: int = 100
+    # Compaction of cancelled bookings and tickets into the archive tables
+    CANCELLED_RETENTION_DAYS: int = 30
+    COMPACTION_BATCH_SIZE: int = 1000
+    # On-sale times: early bookings rejected from memory, caches and the
+    # connection pool warmed ON_SALE_PREWARM_LEAD_SECONDS before the sale
+    ON_SALE_POLL_INTERVAL_SECONDS: int = 5
+    ON_SALE_PREWARM_LEAD_SECONDS: int = 30
+    ON_SALE_PREWARM_CONNECTIONS: int = 10
+    ON_SALE_CACHE_TTL_SECONDS: int = 2
+    # Retries of crud writes failing on serialization failures, deadlocks and
+    # lock timeouts, and isolation levels per operation ("booking.book_tickets")
+    DB_RETRY_ATTEMPTS: int = 3
+    DB_RETRY_BASE_DELAY_MS: int = 10
+    DB_RETRY_MAX_DELAY_MS: int = 500
+    DB_RETRY_BUDGET_RATIO: float = 0.1
+    DB_RETRY_BUDGET_MIN_PER_SECOND: float = 10
+    DB_ISOLATION_LEVELS: dict[str, str] = {}
+    # Responses stored for replay of requests sent with an Idempotency-Key
+    IDEMPOTENCY_KEY_TTL_SECONDS: int = 60 * 60 * 24
+    IDEMPOTENCY_CACHE_SIZE: int = 10_000
+    IDEMPOTENCY_WAIT_SECONDS: int = 10
+    # Keys whose first request never finished, e.g. its worker crashed
+    IDEMPOTENCY_PENDING_TIMEOUT_SECONDS: int = 60
+    # Scheme and cost of new password hashes; pick costs on the production
+    # hardware with `python -m app.calibrate_password_hash`. Hashes made with
+    # another scheme or cost are replaced on the user's next login.
+    PASSWORD_HASH_SCHEME: Literal["bcrypt", "argon2", "scrypt"] = "bcrypt"
+    PASSWORD_HASH_BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_ARGON2_TIME_COST: int = 3
+    PASSWORD_HASH_ARGON2_MEMORY_COST_KIB: int = 64 * 1024
+    PASSWORD_HASH_SCRYPT_ROUNDS: int = 16
+    # Login attempts per email and per client address in a sliding window,
+    # counted in a shared memory table (one per host, 24 bytes per slot)
+    LOGIN_THROTTLE_WINDOW_SECONDS: int = 60
+    LOGIN_THROTTLE_PER_EMAIL: int = 5
+    LOGIN_THROTTLE_PER_ADDRESS: int = 30
+    LOGIN_THROTTLE_SLOTS: int = 1 << 16
+    LOGIN_THROTTLE_SHM_NAME: str | None = "login-throttle"
+    # Password hashing runs in this many worker processes (0: request threads);
+    # logins beyond PASSWORD_HASH_MAX_PENDING at once are refused with a 503
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 16
+
+    # Bulk user imports: users per INSERT, and rows per upload to the API.
+    # An upload is hashed within its request, about 25s for 200 users at
+    # bcrypt cost 12 on 2 workers; larger files go through
+    # `python -m app.import_users`
+    USER_IMPORT_CHUNK_SIZE: int = 1000
+    USER_IMPORT_MAX_ROWS: int = 200
+
     FIRST_SUPERUSER_EMAIL: EmailStr = "admin@admin.com"
     FIRST_SUPERUSER: str = "admin"
     FIRST_SUPERUSER_PASSWORD: str = "changethis"
@@ -0,0 +1,131 @@
+import logging
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.clock import utcnow
+from app.core.config import settings
+from app.core.periodic import PeriodicTask
+from app.crud.revoked_token import delete_expired_revocations, get_revoked_tokens
+from app.database.session import engine
+
+logger = logging.getLogger(__name__)
+
+# Revocations committed this late after their revoked_at are still picked up
+SYNC_OVERLAP = timedelta(seconds=60)
+
+
+class BloomFilter:
+    """
+    Set of 128-bit random numbers that may answer "maybe" for absent ones.
+
+    Members are uniformly random already, so bit positions are derived from
+    their own bits by double hashing instead of hashing them again.
+    """
+
+    def __init__(self, bits: int, hashes: int):
+        self.bits = bits
+        self.hashes = hashes
+        self._array = bytearray((bits + 7) // 8)
+
+    def _positions(self, value: int):
+        first, step = value & 0xFFFFFFFFFFFFFFFF, (value >> 64) | 1
+        for i in range(self.hashes):
+            yield (first + i * step) % self.bits
+
+    def add(self, value: int) -> None:
+        for position in self._positions(value):
+            self._array[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value: int) -> bool:
+        array = self._array
+        for position in self._positions(value):
+            if not array[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+
+class TokenDenylist(PeriodicTask):
+    """
+    The ids (jti) of revoked, unexpired access tokens, checked per request.
+
+    A Bloom filter answers for almost every token that it is not revoked in
+    about a microsecond; only its maybes are confirmed in the exact map of
+    revoked ids. Revocations are written to the revoked_tokens table and
+    synced into every worker every `interval` seconds, so other workers
+    refuse a revoked token at most that much later. Entries are dropped,
+    and the filter rebuilt, once their tokens have expired.
+    """
+
+    name = "token-denylist"
+
+    def __init__(self, bind: Engine, interval: float, bloom_bits: int, hashes: int = 7):
+        super().__init__(bind=bind, interval=interval)
+        self.bloom_bits = bloom_bits
+        self.hashes = hashes
+        self._lock = threading.Lock()
+        self._bloom = BloomFilter(bloom_bits, hashes)
+        self._expires: dict[str, datetime] = {}
+        self._synced_at: datetime | None = None
+
+    def __len__(self) -> int:
+        return len(self._expires)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._bloom = BloomFilter(self.bloom_bits, self.hashes)
+            self._expires = {}
+            self._synced_at = None
+
+    def add(self, jti: str, expires_at: datetime) -> None:
+        with self._lock:
+            self._expires[jti] = expires_at
+            self._bloom.add(int(jti, 16))
+
+    def is_revoked(self, jti: str) -> bool:
+        try:
+            value = int(jti, 16)
+        except ValueError:
+            # Not issued by us
+            return True
+        if value not in self._bloom:
+            return False
+        return jti in self._expires
+
+    def tick(self) -> int:
+        """
+        Load the revocations made since the last sync and drop expired ones.
+
+        Returns:
+            int: The number of revoked tokens loaded.
+        """
+        now = utcnow()
+        since = None if self._synced_at is None else self._synced_at - SYNC_OVERLAP
+        with Session(self.bind) as session:
+            revoked = get_revoked_tokens(db=session, since=since, now=now)
+            delete_expired_revocations(db=session, now=now)
+
+        with self._lock:
+            for jti, expires_at in revoked:
+                if jti not in self._expires:
+                    self._expires[jti] = expires_at
+                    self._bloom.add(int(jti, 16))
+            expired = [jti for jti, at in self._expires.items() if at <= now]
+            if expired:
+                for jti in expired:
+                    del self._expires[jti]
+                bloom = BloomFilter(self.bloom_bits, self.hashes)
+                for jti in self._expires:
+                    bloom.add(int(jti, 16))
+                self._bloom = bloom
+            self._synced_at = now
+        return len(revoked)
+
+
+token_denylist = TokenDenylist(
+    bind=engine,
+    interval=settings.TOKEN_DENYLIST_SYNC_INTERVAL_SECONDS,
+    bloom_bits=settings.TOKEN_DENYLIST_BLOOM_BITS,
+)
@@ -0,0 +1,90 @@
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.booking import book_tickets_for_users
+from app.exceptions.ticket import NoTicketsAvailableException
+from app.schemas.booking import Booking
+
+
+@dataclass
+class _PendingBatch:
+    user_ids: list[int] = field(default_factory=list)
+    futures: list[Future] = field(default_factory=list)
+    full: threading.Event = field(default_factory=threading.Event)
+
+
+class BookingBatcher:
+    """
+    Group commit for concurrent single-ticket bookings of the same event.
+
+    The first caller for an event becomes the batch leader: it waits up to
+    `window` seconds (or until `max_batch` callers joined), then books the
+    whole batch in one transaction on its own session. Every caller gets its
+    own booking or error back.
+    """
+
+    def __init__(self, window: float, max_batch: int):
+        self.window = window
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._pending: dict[int, _PendingBatch] = {}
+
+    def book(self, *, db: Session, event_id: int, user_id: int) -> Booking:
+        """
+        Book one ticket for a user as part of the event's next batch.
+
+        Raises:
+            MissingEventException: If the event does not exist or was deleted.
+            NotOnSaleYetException: If the event's tickets are not on sale yet.
+            NoTicketsAvailableException: If the event sold out before this
+                                         caller's turn in the batch.
+            DatabaseException: If the batch transaction failed.
+        """
+        future: Future = Future()
+        with self._lock:
+            batch = self._pending.get(event_id)
+            leader = batch is None
+            if leader:
+                batch = self._pending[event_id] = _PendingBatch()
+            batch.user_ids.append(user_id)
+            batch.futures.append(future)
+            if len(batch.user_ids) >= self.max_batch:
+                del self._pending[event_id]
+                batch.full.set()
+
+        if leader:
+            batch.full.wait(self.window)
+            with self._lock:
+                if self._pending.get(event_id) is batch:
+                    del self._pending[event_id]
+            self._flush(db=db, event_id=event_id, batch=batch)
+
+        return future.result()
+
+    def _flush(self, *, db: Session, event_id: int, batch: _PendingBatch) -> None:
+        try:
+            results = book_tickets_for_users(
+                db=db, event_id=event_id, user_ids=batch.user_ids
+            )
+        except Exception as e:
+            for future in batch.futures:
+                future.set_exception(e)
+            return
+
+        # Followers serialize on their own threads, so hand them detached
+        # snapshots instead of objects bound to the leader's session.
+        for future, db_booking in zip(batch.futures, results):
+            if db_booking is None:
+                future.set_exception(NoTicketsAvailableException())
+            else:
+                future.set_result(Booking.model_validate(db_booking))
+
+
+booking_batcher = BookingBatcher(
+    window=settings.BOOKING_GROUP_COMMIT_WINDOW_MS / 1000,
+    max_batch=settings.BOOKING_GROUP_COMMIT_MAX_BATCH,
+)
@@ -0,0 +1,142 @@
+import itertools
+import multiprocessing
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import contextmanager
+
+from app.core import security
+from app.core.config import settings
+from app.exceptions.security import PasswordHashingOverloadedException
+
+
+class PasswordHasher:
+    """
+    Runs password hashing and verification in a pool of worker processes.
+
+    bcrypt is CPU bound; run in request threads, a burst of logins occupies
+    the whole request threadpool and starves every other sync route. At
+    most `max_pending` operations run or wait for a worker at a time, so a
+    login storm holds at most that many request threads. Further ones are
+    rejected right away instead of queueing. Until `start` is called, e.g.
+    in tests and scripts, the operations run in the calling thread, under
+    the same limit.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._pool: ProcessPoolExecutor | None = None
+
+    def start(self) -> None:
+        if self._pool is not None or self.workers <= 0:
+            return
+        # Forking a process with running threads can copy held locks
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    def stop(self) -> None:
+        if self._pool is None:
+            return
+        self._pool.shutdown(cancel_futures=True)
+        self._pool = None
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "workers": self.workers if self._pool is not None else 0,
+            "pending": self.pending,
+            "rejected": self.rejected,
+        }
+
+    @contextmanager
+    def _slot(self):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordHashingOverloadedException()
+            self.pending += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    def _run(self, func, *args):
+        with self._slot():
+            if self._pool is None:
+                return func(*args)
+            return self._pool.submit(func, *args).result()
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """
+        Check a password against its hash on a worker.
+
+        Raises:
+            PasswordHashingOverloadedException: If too many are in progress.
+        """
+        return self._run(security.verify_password, plain_password, hashed_password)
+
+    def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> tuple[bool, str | None]:
+        """
+        Check a password on a worker, rehashing it if its hash is outdated.
+
+        Returns:
+            tuple[bool, str | None]: Whether it matched, and the new hash if
+                                     the policy asks for one.
+
+        Raises:
+            PasswordHashingOverloadedException: If too many are in progress.
+        """
+        return self._run(
+            security.verify_and_update_password, plain_password, hashed_password
+        )
+
+    def hash(self, password: str) -> str:
+        """
+        Hash a new password on a worker.
+
+        Raises:
+            PasswordHashingOverloadedException: If too many are in progress.
+        """
+        return self._run(security.get_password_hash, password)
+
+    def hash_many(self, passwords: list[str]) -> list[str]:
+        """
+        Hash many passwords, e.g. of an import, on all workers.
+
+        At most one hash per worker is queued at a time, so logins arriving
+        meanwhile wait for no more than one hash per worker.
+
+        Raises:
+            PasswordHashingOverloadedException: If too many are in progress.
+        """
+        with self._slot():
+            if self._pool is None:
+                return [security.get_password_hash(p) for p in passwords]
+
+            hashes: list[str] = [""] * len(passwords)
+            queued = iter(enumerate(passwords))
+            running = {}
+            for index, password in itertools.islice(queued, self.workers):
+                future = self._pool.submit(security.get_password_hash, password)
+                running[future] = index
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    hashes[running.pop(future)] = future.result()
+                for index, password in itertools.islice(queued, len(done)):
+                    future = self._pool.submit(security.get_password_hash, password)
+                    running[future] = index
+            return hashes
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
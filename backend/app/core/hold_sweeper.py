@@ -0,0 +1,42 @@
+import logging
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.idempotency import idempotency
+from app.core.periodic import PeriodicTask
+from app.core.waitlist import offer_freed_tickets
+from app.crud.hold import release_expired_holds
+from app.database.session import engine
+
+logger = logging.getLogger(__name__)
+
+
+class HoldSweeper(PeriodicTask):
+    """
+    Background thread releasing expired seat holds every `interval` seconds.
+
+    Each tick is one set-based delete plus one counter update per affected
+    event, so its cost does not grow with the number of holds checked. Any
+    number of workers may run a sweeper; each expired hold is released once.
+    Expired idempotency keys are purged on the same tick.
+    """
+
+    name = "hold-sweeper"
+
+    def tick(self) -> dict[int, int]:
+        with Session(self.bind) as session:
+            released = release_expired_holds(db=session)
+            purged = idempotency.purge(db=session)
+        for event_id in released:
+            offer_freed_tickets(self.bind, event_id)
+        if released:
+            logger.info("Released expired seat holds: %s", released)
+        if purged:
+            logger.info("Purged %d expired idempotency keys", purged)
+        return released
+
+
+hold_sweeper = HoldSweeper(
+    bind=engine, interval=settings.SEAT_HOLD_SWEEP_INTERVAL_SECONDS
+)
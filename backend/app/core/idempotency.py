@@ -0,0 +1,232 @@
+import hashlib
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.clock import utcnow
+from app.core.config import settings
+from app.crud import idempotency as crud
+from app.exceptions.idempotency import (
+    IdempotencyKeyInProgressException,
+    IdempotencyKeyReuseException,
+)
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    request_hash: str
+    body: Any
+
+
+class IdempotencyStore:
+    """
+    Run a mutating request at most once per Idempotency-Key.
+
+    The first response for a key is stored in the `idempotency_keys` table
+    and in an in-process LRU cache in front of it, and later requests with
+    the same key get it back without running the handler again. Duplicates
+    arriving while the first request still runs wait for it: on a future in
+    this process, or by polling the pending row when it runs elsewhere.
+    Failed requests are not stored, so they can be retried. A key whose
+    first request is still pending after `pending_timeout` seconds, because
+    its worker died, is claimed again by the next retry.
+    """
+
+    def __init__(
+        self, ttl: float, cache_size: int, wait: float, pending_timeout: float
+    ):
+        self.ttl = ttl
+        self.wait = wait
+        self.pending_timeout = pending_timeout
+        self.cache = TTLCache(max_size=cache_size, ttl=ttl)
+        self._lock = threading.Lock()
+        self._in_flight: dict[str, Future] = {}
+
+    def reset(self) -> None:
+        self.cache.clear()
+
+    def _cache_key(self, key: str, scope: str) -> str:
+        return hashlib.sha256(f"{scope}\n{key}".encode()).hexdigest()
+
+    def _cutoffs(self) -> tuple[datetime, datetime]:
+        now = utcnow()
+        return (
+            now - timedelta(seconds=self.ttl),
+            now - timedelta(seconds=self.pending_timeout),
+        )
+
+    def lookup(self, *, db: Session, key: str, scope: str) -> StoredResponse | None:
+        """
+        Return the stored response for `key`, if its first request finished.
+
+        Lets callers skip checks that would refuse a retry, e.g. of a booking
+        that took the last ticket, before `run` replays it.
+        """
+        cache_key = self._cache_key(key, scope)
+        stored = self.cache.get(cache_key)
+        if stored is not None:
+            return stored
+        db_key = crud.get_idempotency_key(db=db, key=cache_key)
+        expires_before, _ = self._cutoffs()
+        if (
+            db_key is None
+            or db_key.response is None
+            or db_key.created_at < expires_before
+        ):
+            return None
+        stored = StoredResponse(db_key.request_hash, db_key.response)
+        self.cache.set(cache_key, stored)
+        return stored
+
+    def purge(self, *, db: Session) -> int:
+        """Delete expired keys and keys left pending; returns how many."""
+        expires_before, pending_before = self._cutoffs()
+        return crud.delete_expired_idempotency_keys(
+            db=db, expires_before=expires_before, pending_before=pending_before
+        )
+
+    def run(
+        self,
+        *,
+        db: Session,
+        key: str | None,
+        scope: str,
+        handler: Callable[[], Any],
+        response_model: Any,
+        request: BaseModel | None = None,
+    ) -> Any:
+        """
+        Call `handler` once for `key` and return its (stored) response.
+
+        Args:
+            db (Session): The request's database session.
+            key (str | None): The client's Idempotency-Key; None runs the
+                              handler unconditionally.
+            scope (str): The caller and route the key is valid for.
+            handler (Callable): Runs the request and returns its response.
+            response_model: The route's response model, used to store the
+                            response as JSON.
+            request (BaseModel | None): The request body, which must match
+                                        the one first sent with the key.
+
+        Raises:
+            IdempotencyKeyReuseException: If the key was used with another body.
+            IdempotencyKeyInProgressException: If the first request with the key
+                                               did not finish in time.
+        """
+        if key is None:
+            return handler()
+
+        cache_key = self._cache_key(key, scope)
+        request_hash = hashlib.sha256(
+            request.model_dump_json().encode() if request else b""
+        ).hexdigest()
+
+        stored = self.cache.get(cache_key)
+        if stored is not None:
+            return self._replay(stored, request_hash)
+
+        with self._lock:
+            future = self._in_flight.get(cache_key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[cache_key] = Future()
+
+        if not leader:
+            try:
+                stored = future.result(timeout=self.wait)
+            except FutureTimeoutError:
+                raise IdempotencyKeyInProgressException()
+            return self._replay(stored, request_hash)
+
+        try:
+            stored = self._execute(
+                db=db,
+                key=cache_key,
+                request_hash=request_hash,
+                handler=handler,
+                response_model=response_model,
+            )
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(stored)
+        finally:
+            with self._lock:
+                del self._in_flight[cache_key]
+        return self._replay(stored, request_hash)
+
+    def _execute(
+        self,
+        *,
+        db: Session,
+        key: str,
+        request_hash: str,
+        handler: Callable[[], Any],
+        response_model: Any,
+    ) -> StoredResponse:
+        expires_before, pending_before = self._cutoffs()
+        db_key = crud.claim_idempotency_key(
+            db=db,
+            key=key,
+            request_hash=request_hash,
+            expires_before=expires_before,
+            pending_before=pending_before,
+        )
+        if db_key is not None:
+            if db_key.request_hash != request_hash:
+                raise IdempotencyKeyReuseException()
+            body = self._wait_for_response(db=db, key=key, db_key=db_key)
+            stored = StoredResponse(request_hash, body)
+        else:
+            try:
+                response = handler()
+            except BaseException:
+                crud.release_idempotency_key(db=db, key=key)
+                raise
+            adapter = TypeAdapter(response_model)
+            body = adapter.dump_python(
+                adapter.validate_python(response, from_attributes=True), mode="json"
+            )
+            crud.complete_idempotency_key(db=db, key=key, response=body)
+            stored = StoredResponse(request_hash, body)
+
+        self.cache.set(key, stored)
+        return stored
+
+    def _wait_for_response(self, *, db: Session, key: str, db_key) -> Any:
+        # The first request runs in another process; poll its pending row
+        deadline = time.monotonic() + self.wait
+        while db_key is not None and db_key.response is None:
+            if time.monotonic() > deadline:
+                raise IdempotencyKeyInProgressException()
+            time.sleep(0.05)
+            db.rollback()
+            db_key = crud.get_idempotency_key(db=db, key=key)
+        if db_key is None:
+            # The first request failed and released the key
+            raise IdempotencyKeyInProgressException()
+        return db_key.response
+
+    def _replay(self, stored: StoredResponse, request_hash: str) -> Any:
+        if stored.request_hash != request_hash:
+            raise IdempotencyKeyReuseException()
+        return stored.body
+
+
+idempotency = IdempotencyStore(
+    ttl=settings.IDEMPOTENCY_KEY_TTL_SECONDS,
+    cache_size=settings.IDEMPOTENCY_CACHE_SIZE,
+    wait=settings.IDEMPOTENCY_WAIT_SECONDS,
+    pending_timeout=settings.IDEMPOTENCY_PENDING_TIMEOUT_SECONDS,
+)
@@ -0,0 +1,193 @@
+import fcntl
+import hashlib
+import math
+import os
+import struct
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+
+from app.core.config import settings
+from app.exceptions.security import LoginThrottledException
+
+# key hash, window number, attempts in that window, attempts in the one before
+_SLOT = struct.Struct("<QqII")
+# Slots probed per key; a key lives in one of them
+_PROBES = 8
+
+
+class LoginThrottle:
+    """
+    Sliding-window limit of login attempts per email and per client address.
+
+    Attempts are counted in fixed windows; a key's rate is its count in the
+    current window plus the previous window's count, weighted by how much
+    of it still overlaps the sliding window. Each key takes one 24 byte slot
+    of a fixed table, so memory is constant. Keys idle for two windows are
+    free to be overwritten, and when all slots a key may use are busy the
+    stalest one is taken.
+
+    With a `name`, the table lives in a shared memory segment of that name,
+    so all workers on a host count together; it is created by the first
+    worker and outlives them. A segment left with another number of slots
+    is replaced. Without a name the table is private to the process.
+    """
+
+    def __init__(
+        self,
+        window: float,
+        per_email: int,
+        per_address: int,
+        slots: int,
+        name: str | None = None,
+    ):
+        self.window = window
+        self.per_email = per_email
+        self.per_address = per_address
+        self.slots = slots
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._file_lock: int | None = None
+        self._shm: shared_memory.SharedMemory | None = None
+        size = slots * _SLOT.size
+        if name is None:
+            self._buf = memoryview(bytearray(size))
+            return
+
+        self._file_lock = os.open(
+            os.path.join(tempfile.gettempdir(), f"{name}.lock"),
+            os.O_RDWR | os.O_CREAT,
+            0o600,
+        )
+        with self._locked():
+            self._shm = self._attach(name, size)
+        self._buf = self._shm.buf[:size]
+
+    @staticmethod
+    def _attach(name: str, size: int) -> shared_memory.SharedMemory:
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            shm = shared_memory.SharedMemory(name=name)
+            if shm.size != size:
+                # Made before LOGIN_THROTTLE_SLOTS changed; start over
+                shm.unlink()
+                shm.close()
+                shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        # The segment belongs to the host, not to the process that made it
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+    def close(self) -> None:
+        """Detach from the shared memory segment, which stays for other workers."""
+        if self._shm is None:
+            return
+        self._buf.release()
+        self._shm.close()
+        os.close(self._file_lock)
+        self._shm = self._file_lock = None
+
+    @contextmanager
+    def _locked(self):
+        with self._lock:
+            if self._file_lock is None:
+                yield
+                return
+            fcntl.flock(self._file_lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._file_lock, fcntl.LOCK_UN)
+
+    def reset(self) -> None:
+        with self._locked():
+            self._buf[:] = bytes(len(self._buf))
+            self.rejected = 0
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        # 0 marks an empty slot
+        digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "little") or 1
+
+    def _find(
+        self, key_hash: int, window: int, taken: set[int] = frozenset()
+    ) -> tuple[int, int, int]:
+        """
+        Return the slot of a key and its current and previous counts.
+
+        A new key gets the stalest slot not `taken` by another key already.
+        """
+        first = key_hash % self.slots
+        stalest, stalest_window = first, None
+        for probe in range(_PROBES):
+            index = (first + probe) % self.slots
+            slot_hash, slot_window, current, previous = _SLOT.unpack_from(
+                self._buf, index * _SLOT.size
+            )
+            if slot_hash == key_hash:
+                if slot_window == window:
+                    return index, current, previous
+                if slot_window == window - 1:
+                    return index, 0, current
+                return index, 0, 0
+            if index in taken:
+                continue
+            if stalest_window is None or slot_window < stalest_window:
+                stalest, stalest_window = index, slot_window
+        return stalest, 0, 0
+
+    def _rate(self, current: int, previous: int, now: float) -> float:
+        overlap = 1 - (now % self.window) / self.window
+        return current + previous * overlap
+
+    def hit(self, *, email: str, address: str | None) -> None:
+        """
+        Count a login attempt, unless it is over a limit.
+
+        Raises:
+            LoginThrottledException: If the email or the client address made
+                                     too many attempts recently.
+        """
+        keys = [(f"email:{email.lower()}", self.per_email)]
+        if address:
+            keys.append((f"address:{address}", self.per_address))
+
+        now = time.time()
+        window = int(now // self.window)
+        with self._locked():
+            # Check every limit before counting, so an attempt refused for
+            # its address does not use up the email's budget
+            found = []
+            for key, limit in keys:
+                key_hash = self._hash(key)
+                taken = {index for _, index, _, _ in found}
+                index, current, previous = self._find(key_hash, window, taken)
+                if self._rate(current, previous, now) >= limit:
+                    self.rejected += 1
+                    retry_after = self.window - now % self.window
+                    raise LoginThrottledException(retry_after=math.ceil(retry_after))
+                found.append((key_hash, index, current, previous))
+            for key_hash, index, current, previous in found:
+                _SLOT.pack_into(
+                    self._buf,
+                    index * _SLOT.size,
+                    key_hash,
+                    window,
+                    current + 1,
+                    previous,
+                )
+
+    def stats(self) -> dict[str, int]:
+        return {"slots": self.slots, "rejected": self.rejected}
+
+
+login_throttle = LoginThrottle(
+    window=settings.LOGIN_THROTTLE_WINDOW_SECONDS,
+    per_email=settings.LOGIN_THROTTLE_PER_EMAIL,
+    per_address=settings.LOGIN_THROTTLE_PER_ADDRESS,
+    slots=settings.LOGIN_THROTTLE_SLOTS,
+    name=settings.LOGIN_THROTTLE_SHM_NAME,
+)
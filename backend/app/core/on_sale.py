@@ -0,0 +1,148 @@
+import logging
+import threading
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.clock import utcnow
+from app.core.config import settings
+from app.core.periodic import PeriodicTask
+from app.crud.event import get_events_going_on_sale
+from app.crud.inventory import get_available_count
+from app.database.session import engine
+from app.schemas.event import Event
+
+logger = logging.getLogger(__name__)
+
+
+class OnSaleScheduler(PeriodicTask):
+    """
+    Keeps this process ready for events whose tickets go on sale soon.
+
+    Every `interval` seconds the on-sale times of all upcoming events are
+    loaded, so bookings that arrive too early are rejected from memory. About
+    `lead` seconds before an event goes on sale its detail payload and ticket
+    availability are computed into the caches below and up to
+    `warm_connections` pool connections are opened, so the first requests
+    after the sale opens find everything warm. Warmed entries live until
+    `cache_ttl` seconds after the sale opened and are then read from the
+    database again. State is per process; the database refuses early
+    bookings on its own, this only keeps them away from it.
+    """
+
+    name = "on-sale-scheduler"
+
+    def __init__(
+        self,
+        bind: Engine,
+        interval: float,
+        lead: float,
+        warm_connections: int,
+        cache_ttl: float,
+        cache_size: int = 1024,
+    ):
+        super().__init__(bind=bind, interval=interval)
+        self.lead = lead
+        self.warm_connections = warm_connections
+        self.cache_ttl = cache_ttl
+        self.events = TTLCache(max_size=cache_size, ttl=cache_ttl)
+        self.availability = TTLCache(max_size=cache_size, ttl=cache_ttl)
+        self._lock = threading.Lock()
+        self._on_sale_at: dict[int, datetime] = {}
+        self._warmed: set[int] = set()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._on_sale_at.clear()
+            self._warmed.clear()
+        self.events.clear()
+        self.availability.clear()
+
+    def schedule(self, event_id: int, on_sale_at: datetime | None) -> None:
+        """Remember (or forget, for None) when an event goes on sale."""
+        with self._lock:
+            self._warmed.discard(event_id)
+            if on_sale_at is None or on_sale_at <= utcnow():
+                self._on_sale_at.pop(event_id, None)
+            else:
+                self._on_sale_at[event_id] = on_sale_at
+
+    def forget(self, event_id: int) -> None:
+        """Drop an event's schedule and cached payloads after it changed."""
+        self.schedule(event_id, None)
+        self.events.pop(event_id)
+        self.availability.pop(event_id)
+
+    def pending(self, event_id: int) -> datetime | None:
+        """Return when an event goes on sale, None if it already is."""
+        on_sale_at = self._on_sale_at.get(event_id)
+        if on_sale_at is None:
+            return None
+        if on_sale_at <= utcnow():
+            with self._lock:
+                self._on_sale_at.pop(event_id, None)
+            return None
+        return on_sale_at
+
+    def tick(self) -> list[int]:
+        """
+        Reload the upcoming on-sale times and warm the events due shortly.
+
+        Returns:
+            list[int]: The ids of the events warmed by this tick.
+        """
+        now = utcnow()
+        warmed = []
+        with Session(self.bind) as session:
+            upcoming = get_events_going_on_sale(db=session, after=now)
+            with self._lock:
+                self._on_sale_at = {e.id: e.on_sale_at for e in upcoming}
+                self._warmed &= self._on_sale_at.keys()
+
+            for db_event in upcoming:
+                opens_in = (db_event.on_sale_at - now).total_seconds()
+                if opens_in > self.lead or db_event.id in self._warmed:
+                    continue
+                self._warm_event(session, db_event, ttl=opens_in + self.cache_ttl)
+                self._warmed.add(db_event.id)
+                warmed.append(db_event.id)
+
+        if warmed:
+            self._warm_pool()
+            logger.info("Warmed events going on sale: %s", warmed)
+        return warmed
+
+    def _warm_event(self, session: Session, db_event, ttl: float) -> None:
+        payload = Event.model_validate(db_event).model_dump(mode="json")
+        self.events.set(db_event.id, payload, ttl=ttl)
+        available = get_available_count(db=session, event_id=db_event.id)
+        self.availability.set(db_event.id, available, ttl=ttl)
+
+    def _warm_pool(self) -> None:
+        # Check out several connections at once so the pool really opens
+        # that many; connections beyond its size would be discarded again.
+        size = getattr(self.bind.pool, "size", None)
+        count = self.warm_connections
+        if callable(size):
+            count = min(count, size())
+
+        connections = []
+        try:
+            for _ in range(count):
+                connections.append(self.bind.connect())
+                connections[-1].execute(text("SELECT 1"))
+        finally:
+            for connection in connections:
+                connection.close()
+
+
+on_sale = OnSaleScheduler(
+    bind=engine,
+    interval=settings.ON_SALE_POLL_INTERVAL_SECONDS,
+    lead=settings.ON_SALE_PREWARM_LEAD_SECONDS,
+    warm_connections=settings.ON_SALE_PREWARM_CONNECTIONS,
+    cache_ttl=settings.ON_SALE_CACHE_TTL_SECONDS,
+)
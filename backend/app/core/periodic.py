@@ -0,0 +1,49 @@
+import logging
+import threading
+from abc import ABC, abstractmethod
+
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask(ABC):
+    """
+    Background thread calling `tick` every `interval` seconds until stopped.
+
+    Subclasses implement `tick`; errors are logged and the next tick runs
+    as scheduled.
+    """
+
+    name = "periodic-task"
+
+    def __init__(self, bind: Engine, interval: float):
+        self.bind = bind
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @abstractmethod
+    def tick(self):
+        """Do one round of the task's work."""
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.tick()
+            except Exception:
+                logger.exception("%s failed", self.name)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
@@ -0,0 +1,224 @@
+import functools
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.exceptions.db import (
+    TransientDatabaseException,
+    UncommittedChangesException,
+)
+
+logger = logging.getLogger(__name__)
+
+# serialization_failure, deadlock_detected, lock_not_available (lock_timeout)
+TRANSIENT_SQLSTATES = {"40001", "40P01", "55P03"}
+
+
+def is_transient(error: DBAPIError) -> bool:
+    """Return whether a failed transaction may succeed when simply run again."""
+    orig = error.orig
+    sqlstate = getattr(orig, "sqlstate", None) or getattr(orig, "pgcode", None)
+    if sqlstate in TRANSIENT_SQLSTATES:
+        return True
+    # SQLite reports lock timeouts only by message
+    return "database is locked" in str(orig)
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_flushed(session: Session, _) -> None:
+    session.info["flushed"] = True
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _clear_flushed(session: Session, transaction) -> None:
+    if transaction.parent is None:
+        session.info.pop("flushed", None)
+
+
+def has_uncommitted_changes(db: Session) -> bool:
+    """Return whether the session has changes, flushed or not, to commit."""
+    return bool(db.new or db.dirty or db.deleted or db.info.get("flushed"))
+
+
+class RetryBudget:
+    """
+    Token bucket capping retries at a fraction of all transactions.
+
+    Every transaction deposits `ratio` tokens and every retry withdraws one,
+    on top of `min_per_second` retries that are always allowed. When the
+    database is overloaded and most transactions fail, retries stop instead
+    of multiplying its load.
+    """
+
+    def __init__(self, ratio: float, min_per_second: float):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.capacity = max(min_per_second, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._tokens = min(self._tokens + self.ratio, self.capacity)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self._tokens + (now - self._updated) * self.min_per_second,
+                self.capacity,
+            )
+            self._updated = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class Retrier:
+    """
+    Runs crud write operations again when they fail on transient errors.
+
+    Serialization failures, deadlocks and lock timeouts are retried up to
+    `attempts` times with full-jitter exponential backoff, as long as the
+    shared retry budget allows. Counts per operation are kept for metrics.
+    """
+
+    def __init__(
+        self,
+        attempts: int,
+        base_delay: float,
+        max_delay: float,
+        budget: RetryBudget,
+        isolation_levels: dict[str, str] | None = None,
+    ):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+        self.isolation_levels = isolation_levels or {}
+        self._lock = threading.Lock()
+        self._counts: dict[str, Counter] = {}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        with self._lock:
+            return {name: dict(counts) for name, counts in self._counts.items()}
+
+    def _count(self, name: str, key: str) -> None:
+        with self._lock:
+            self._counts.setdefault(name, Counter())[key] += 1
+
+    def _backoff(self, retry: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**retry))
+
+    def run(
+        self,
+        name: str,
+        func: Callable[..., Any],
+        *args,
+        db: Session,
+        isolation_level: str | None = None,
+        **kwargs,
+    ) -> Any:
+        """
+        Call `func(*args, db=db, **kwargs)`, retrying transient failures.
+
+        Every attempt starts from a clean transaction, so the session must
+        not hold uncommitted changes; they would be committed by an isolation
+        level change or lost on a retry. An operation with an isolation level
+        runs in a transaction of its own; a read-only transaction the session
+        has open is ended first. Operations called from inside another one run
+        in its transaction and are retried together with it.
+
+        Raises:
+            UncommittedChangesException: If the session has uncommitted
+                                         changes.
+            TransientDatabaseException: If the operation still failed on a
+                                        transient error after its retries.
+        """
+        if db.info.get("retrying"):
+            return func(*args, db=db, **kwargs)
+
+        if has_uncommitted_changes(db):
+            raise UncommittedChangesException(name)
+
+        level = self.isolation_levels.get(name, isolation_level)
+        self._count(name, "calls")
+        self.budget.deposit()
+        retry = 0
+        db.info["retrying"] = True
+        try:
+            while True:
+                try:
+                    if level is not None:
+                        if db.in_transaction():
+                            db.commit()
+                        db.connection(execution_options={"isolation_level": level})
+                    result = func(*args, db=db, **kwargs)
+                    if retry:
+                        self._count(name, "recovered")
+                    return result
+                except DBAPIError as e:
+                    db.rollback()
+                    if not is_transient(e):
+                        raise
+                    if retry >= self.attempts:
+                        self._count(name, "exhausted")
+                        raise TransientDatabaseException(str(e.orig))
+                    if not self.budget.withdraw():
+                        self._count(name, "budget_exhausted")
+                        raise TransientDatabaseException(str(e.orig))
+                    self._count(name, "retries")
+                    logger.info("Retrying %s after transient error: %s", name, e.orig)
+                    time.sleep(self._backoff(retry))
+                    retry += 1
+        finally:
+            db.info.pop("retrying", None)
+
+
+retrier = Retrier(
+    attempts=settings.DB_RETRY_ATTEMPTS,
+    base_delay=settings.DB_RETRY_BASE_DELAY_MS / 1000,
+    max_delay=settings.DB_RETRY_MAX_DELAY_MS / 1000,
+    budget=RetryBudget(
+        ratio=settings.DB_RETRY_BUDGET_RATIO,
+        min_per_second=settings.DB_RETRY_BUDGET_MIN_PER_SECOND,
+    ),
+    isolation_levels=settings.DB_ISOLATION_LEVELS,
+)
+
+
+def retryable(func: Callable | None = None, *, isolation_level: str | None = None):
+    """
+    Decorate a crud write function to be retried on transient errors.
+
+    The operation is named `<crud module>.<function>`, e.g.
+    `booking.book_tickets`, which is also the key of its retry metrics and of
+    its entry in `DB_ISOLATION_LEVELS`, overriding `isolation_level`.
+    """
+    if func is None:
+        return functools.partial(retryable, isolation_level=isolation_level)
+
+    name = f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, db: Session, **kwargs):
+        return retrier.run(
+            name, func, *args, db=db, isolation_level=isolation_level, **kwargs
+        )
+
+    return wrapper
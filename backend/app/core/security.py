@@ -1,3 +1,5 @@
+import hmac
+import secrets
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
@@ -6,26 +8,85 @@ from passlib.context import CryptContext
 
 from app.core.config import settings
 
+PASSWORD_HASH_SCHEMES = ("bcrypt", "argon2", "scrypt")
+
+# Cost parameter each scheme is calibrated by
+PASSWORD_HASH_COSTS = {
+    "bcrypt": "rounds",
+    "argon2": "time_cost",
+    "scrypt": "rounds",
+}
+
+
+def make_pwd_context(scheme: str, **costs: int) -> CryptContext:
+    """
+    Create a password hashing context for a hashing policy.
+
+    New hashes use `scheme` with the given costs, keyed like
+    `bcrypt__rounds`. Hashes of every supported scheme still verify, and
+    those of another scheme or cost are reported as needing an update.
+
+    Args:
+        scheme (str): The scheme of new hashes, one of PASSWORD_HASH_SCHEMES.
+        **costs (int): Cost parameters, e.g. `bcrypt__rounds=12`.
+
+    Returns:
+        CryptContext: The hashing context.
+    """
+    return CryptContext(
+        schemes=[scheme, *(s for s in PASSWORD_HASH_SCHEMES if s != scheme)],
+        default=scheme,
+        deprecated="auto",
+        **costs,
+    )
+
+
 # Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = make_pwd_context(
+    settings.PASSWORD_HASH_SCHEME,
+    bcrypt__rounds=settings.PASSWORD_HASH_BCRYPT_ROUNDS,
+    argon2__time_cost=settings.PASSWORD_HASH_ARGON2_TIME_COST,
+    argon2__memory_cost=settings.PASSWORD_HASH_ARGON2_MEMORY_COST_KIB,
+    scrypt__rounds=settings.PASSWORD_HASH_SCRYPT_ROUNDS,
+)
 
 # Algorithm used for JWT encoding
 ALGORITHM = "HS256"
 
+# Prefix of API keys, so leaked ones are easy to find
+API_KEY_PREFIX = "rdp_"
+
 
-def create_access_token(subject: str | Any, role: str, expires_delta: timedelta) -> str:
+def create_access_token(
+    subject: str | Any,
+    role: str,
+    expires_delta: timedelta,
+    user_id: int,
+    token_version: int,
+) -> str:
     """
     Create an access token.
 
     Args:
         subject (str | Any): The subject for whom the access token is being created.
+        role (str): The user's role.
         expires_delta (timedelta): The duration for which the access token will be valid.
+        user_id (int): The user's id, so requests need no lookup by email.
+        token_version (int): The user's token version; bumping it revokes the token.
 
     Returns:
         str: The generated access token.
     """
     expire = datetime.now(timezone.utc) + expires_delta
-    to_encode = {"exp": expire, "sub": str(subject), "role": role}
+    to_encode = {
+        "exp": expire,
+        "sub": str(subject),
+        "role": role,
+        "uid": user_id,
+        "ver": token_version,
+        # Lets the single token be revoked
+        "jti": secrets.token_hex(16),
+    }
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -44,6 +105,24 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """
+    Verify a plain password and rehash it if its hash is outdated.
+
+    Args:
+        plain_password (str): The plain password to verify.
+        hashed_password (str): The hashed password to verify against.
+
+    Returns:
+        tuple[bool, str | None]: Whether the password matches, and a new hash
+                                 under the current policy if the old one was
+                                 made with another scheme or cost.
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
 def get_password_hash(password: str) -> str:
     """
     Hash a password.
@@ -55,3 +134,30 @@ def get_password_hash(password: str) -> str:
         str: The hashed password.
     """
     return pwd_context.hash(password)
+
+
+def hash_api_key(key: str) -> str:
+    """
+    Hash an API key for storage and lookup.
+
+    API keys are long random strings, so a keyed fast hash is as safe as a
+    slow password hash and costs a microsecond instead of a few hundred ms.
+
+    Args:
+        key (str): The API key.
+
+    Returns:
+        str: The hex HMAC-SHA256 of the key under SECRET_KEY.
+    """
+    return hmac.digest(settings.SECRET_KEY.encode(), key.encode(), "sha256").hex()
+
+
+def generate_api_key() -> tuple[str, str]:
+    """
+    Generate a new API key.
+
+    Returns:
+        tuple[str, str]: The key's public id and the key itself.
+    """
+    key_id = secrets.token_hex(8)
+    return key_id, f"{API_KEY_PREFIX}{key_id}_{secrets.token_urlsafe(32)}"
@@ -0,0 +1,44 @@
+import hashlib
+import time
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.schemas.token import TokenData
+
+
+class VerifiedTokenCache:
+    """
+    Claims of access tokens whose signature was already verified.
+
+    Keyed by a digest of the raw token, so a token seen before costs a dict
+    lookup instead of an HMAC check and claims parsing. Entries expire with
+    the token's `exp`. Revocation is still checked on every request; a
+    token found revoked is forgotten.
+    """
+
+    def __init__(self, max_size: int):
+        self.cache = TTLCache(max_size=max_size, ttl=0)
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def reset(self) -> None:
+        self.cache.clear()
+
+    def get(self, token: str) -> TokenData | None:
+        return self.cache.get(self._key(token))
+
+    def put(self, token: str, token_data: TokenData, exp: float | None) -> None:
+        """Remember verified claims until `exp`; tokens without one are not."""
+        if exp is None:
+            return
+        ttl = exp - time.time()
+        if ttl > 0:
+            self.cache.set(self._key(token), token_data, ttl=ttl)
+
+    def forget(self, token: str) -> None:
+        self.cache.pop(self._key(token))
+
+
+verified_tokens = VerifiedTokenCache(max_size=settings.VERIFIED_TOKEN_CACHE_SIZE)
@@ -0,0 +1,40 @@
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.crud.user import get_token_version
+
+
+class TokenVersionCache:
+    """
+    Current token version per user id, cached for `ttl` seconds.
+
+    Checking a token costs a primary key lookup of one column once per user
+    and `ttl`, instead of loading the user row on every request. A worker
+    that bumps a version forgets it right away; other workers refuse the
+    old tokens at the latest `ttl` seconds later.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.cache = TTLCache(max_size=max_size, ttl=ttl)
+
+    def reset(self) -> None:
+        self.cache.clear()
+
+    def get(self, *, db: Session, user_id: int) -> int | None:
+        """Return the user's token version, None if the user does not exist."""
+        version = self.cache.get(user_id)
+        if version is None:
+            version = get_token_version(db=db, user_id=user_id)
+            if version is not None:
+                self.cache.set(user_id, version)
+        return version
+
+    def forget(self, user_id: int) -> None:
+        self.cache.pop(user_id)
+
+
+token_versions = TokenVersionCache(
+    max_size=settings.TOKEN_VERSION_CACHE_SIZE,
+    ttl=settings.TOKEN_VERSION_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,77 @@
+import threading
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.user import User
+from app.schemas.user import UserInDB
+
+
+class UserCache:
+    """
+    Read-only snapshots of users by id and email, cached for `ttl` seconds.
+
+    Authenticating a request or a login needs one lookup per user and `ttl`
+    instead of one per request. Snapshots are plain schemas, safe to share
+    between sessions and threads. The crud functions that change users
+    forget them right away; other workers see changes at most `ttl` seconds
+    late. Unknown users are not cached.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.by_id = TTLCache(max_size=max_size, ttl=ttl)
+        self.ids_by_email = TTLCache(max_size=max_size, ttl=ttl)
+        self._lock = threading.Lock()
+        # Bumped on every forget, so lookups racing a change don't cache
+        # the row they read before it
+        self._generation = 0
+
+    def reset(self) -> None:
+        self.by_id.clear()
+        self.ids_by_email.clear()
+
+    def stats(self) -> dict[str, int]:
+        return self.by_id.stats()
+
+    def get(self, *, db: Session, user_id: int) -> UserInDB | None:
+        """Return a snapshot of the user, None if the user does not exist."""
+        db_user = self.by_id.get(user_id)
+        if db_user is None:
+            db_user = self._load(db, User.id == user_id)
+        return db_user
+
+    def get_by_email(self, *, db: Session, email: str) -> UserInDB | None:
+        """Return a snapshot of the user, None if no user has the email."""
+        user_id = self.ids_by_email.get(email)
+        if user_id is not None:
+            db_user = self.by_id.get(user_id)
+            if db_user is not None and db_user.email == email:
+                return db_user
+        return self._load(db, User.email == email)
+
+    def forget(self, user_id: int, email: str | None = None) -> None:
+        with self._lock:
+            self._generation += 1
+        self.by_id.pop(user_id)
+        if email is not None:
+            self.ids_by_email.pop(email)
+
+    def _load(self, db: Session, where) -> UserInDB | None:
+        generation = self._generation
+        db_user = db.scalars(select(User).where(where)).first()
+        if db_user is None:
+            return None
+        snapshot = UserInDB.model_validate(db_user)
+        with self._lock:
+            if generation == self._generation:
+                self.by_id.set(snapshot.id, snapshot)
+                self.ids_by_email.set(snapshot.email, snapshot.id)
+        return snapshot
+
+
+user_cache = UserCache(
+    max_size=settings.USER_CACHE_SIZE,
+    ttl=settings.USER_CACHE_TTL_SECONDS,
+)
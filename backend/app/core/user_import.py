@@ -0,0 +1,83 @@
+import csv
+import json
+from collections.abc import Iterable
+from typing import Literal
+
+from pydantic import ValidationError
+
+from app.exceptions.user import TooManyUsersToImportException
+from app.models.enums import UserRole
+from app.schemas.user import UserCreate, UserImportError
+
+ImportFormat = Literal["csv", "ndjson"]
+
+
+def guess_format(filename: str | None) -> ImportFormat:
+    """NDJSON for .ndjson and .jsonl files, CSV otherwise."""
+    if filename and filename.lower().endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    return "csv"
+
+
+def _records(lines: Iterable[str], fmt: ImportFormat):
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, {k: v for k, v in row.items() if k and v}
+        return
+
+    for line, raw in enumerate(lines, start=1):
+        if not raw.strip():
+            continue
+        try:
+            record = json.loads(raw)
+        except json.JSONDecodeError as e:
+            yield line, f"Invalid JSON: {e.msg}"
+            continue
+        yield line, record if isinstance(record, dict) else "Not a JSON object"
+
+
+def parse_users(
+    lines: Iterable[str], fmt: ImportFormat, max_rows: int | None = None
+) -> tuple[list[tuple[int, UserCreate]], list[UserImportError]]:
+    """
+    Parse users to import from CSV with a header row or from NDJSON.
+
+    Records have the fields of UserCreate; the role defaults to visitor.
+    Lines are read only as far as needed, so a file over `max_rows` records
+    is refused without reading the rest of it.
+
+    Args:
+        lines (Iterable[str]): The file's lines, e.g. the open file; CSV
+                               files should be opened with newline="".
+
+    Returns:
+        tuple[list[tuple[int, UserCreate]], list[UserImportError]]: The valid
+            users with their lines, and an error for every invalid record.
+
+    Raises:
+        TooManyUsersToImportException: If there are more than `max_rows`.
+    """
+    users, errors = [], []
+    for line, record in _records(lines, fmt):
+        if max_rows is not None and len(users) + len(errors) >= max_rows:
+            raise TooManyUsersToImportException(max_rows=max_rows)
+        if isinstance(record, str):
+            errors.append(UserImportError(line=line, error=record))
+            continue
+        record.setdefault("role", UserRole.VISITOR.value)
+        try:
+            users.append((line, UserCreate.model_validate(record)))
+        except ValidationError as e:
+            error = "; ".join(
+                f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()
+            )
+            email = record.get("email")
+            errors.append(
+                UserImportError(
+                    line=line,
+                    email=email if isinstance(email, str) else None,
+                    error=error,
+                )
+            )
+    return users, errors
@@ -0,0 +1,63 @@
+import logging
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.admission import admission
+from app.core.config import settings
+from app.core.on_sale import on_sale
+from app.crud.waitlist import has_waitlist, promote_waitlist
+
+logger = logging.getLogger(__name__)
+
+
+def promote_waitlisted(bind: Engine, event_id: int) -> int:
+    """
+    Book freed-up tickets of an event for its waitlist, batch by batch.
+
+    Runs on its own session. Stops when the event is full again or the
+    waitlist is empty.
+
+    Returns:
+        int: The number of promoted users.
+    """
+    batch_size = settings.WAITLIST_PROMOTION_BATCH_SIZE
+    promoted = 0
+    with Session(bind) as session:
+        while True:
+            try:
+                db_bookings = promote_waitlist(
+                    db=session, event_id=event_id, limit=batch_size
+                )
+            except Exception:
+                logger.exception("Waitlist promotion for event %d failed", event_id)
+                break
+            promoted += len(db_bookings)
+            if len(db_bookings) < batch_size:
+                break
+    if promoted:
+        logger.info(
+            "Promoted %d waitlisted user(s) for event %d", promoted, event_id
+        )
+    return promoted
+
+
+def offer_freed_tickets(bind: Engine, event_id: int) -> int:
+    """
+    Give tickets freed on an event to its waitlist before anyone else.
+
+    Called on every path that returns tickets to the inventory: cancellations,
+    released and expired holds, capacity increases. The event is reopened to
+    walk-up buyers only once its waitlist is empty, so nobody admitted in the
+    meantime takes a freed ticket ahead of the line.
+
+    Returns:
+        int: The number of promoted users.
+    """
+    promoted = promote_waitlisted(bind, event_id)
+    with Session(bind) as session:
+        waiting = has_waitlist(db=session, event_id=event_id)
+    if not waiting:
+        admission.reopen(event_id)
+    on_sale.availability.pop(event_id)
+    return promoted
@@ -0,0 +1,76 @@
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.core.clock import utcnow
+from app.core.retry import retryable
+from app.core.security import generate_api_key, hash_api_key
+from app.crud.user import get_user
+from app.exceptions.api_key import MissingApiKeyException
+from app.models.api_key import ApiKey
+from app.models.user import User
+from app.schemas.api_key import ApiKeyCreate
+
+
+@retryable
+def create_api_key(*, db: Session, api_key: ApiKeyCreate):
+    """
+    Create an API key acting as a service account.
+
+    Returns:
+        tuple[ApiKey, str]: The stored key and the key itself, which is not
+                            stored and can't be shown again.
+
+    Raises:
+        MissingUserException: If the service account does not exist.
+    """
+    get_user(db=db, user_id=api_key.user_id)
+
+    key_id, key = generate_api_key()
+    db_key = ApiKey(
+        key_id=key_id,
+        key_hash=hash_api_key(key),
+        name=api_key.name,
+        user_id=api_key.user_id,
+        scopes=[scope.value for scope in api_key.scopes],
+    )
+    db.add(db_key)
+    db.commit()
+    db.refresh(db_key)
+    return db_key, key
+
+
+def get_api_keys(db: Session):
+    return db.query(ApiKey).order_by(ApiKey.id).all()
+
+
+def get_active_api_keys(*, db: Session):
+    """
+    Return the hash, id and scopes of every unrevoked key, with its account.
+    """
+    return db.execute(
+        select(
+            ApiKey.key_hash,
+            ApiKey.key_id,
+            ApiKey.scopes,
+            User.id.label("user_id"),
+            User.email,
+            User.role,
+        )
+        .join(User, User.id == ApiKey.user_id)
+        .where(ApiKey.revoked_at.is_(None))
+    ).all()
+
+
+@retryable
+def revoke_api_key(*, db: Session, key_id: str):
+    db_key = db.scalars(
+        update(ApiKey)
+        .where(ApiKey.key_id == key_id, ApiKey.revoked_at.is_(None))
+        .values(revoked_at=utcnow())
+        .returning(ApiKey)
+    ).first()
+    if db_key is None:
+        db.rollback()
+        raise MissingApiKeyException()
+    db.commit()
+    return db_key
@@ -1,21 +1,40 @@
+from collections import defaultdict
+
+from sqlalchemy import case, insert, select, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.crud.ticket import delete_ticket, get_ticket
+from app.core.clock import utcnow
+from app.core.retry import retryable
+from app.crud.inventory import (
+    adjust_tickets_sold,
+    claim_available_tickets,
+    claim_seats,
+    claim_tickets,
+)
+from app.crud.ticket import get_ticket
 from app.crud.user import get_user
-from app.exceptions.booking import MissingBookingException
+from app.exceptions.booking import CartItemSoldOutException, MissingBookingException
 from app.exceptions.db import DatabaseException
+from app.exceptions.event import MissingEventException, NotOnSaleYetException
+from app.exceptions.ticket import NoTicketsAvailableException
 from app.models.booking import Booking
+from app.models.event import Event
+from app.models.ticket import Ticket
 from app.schemas.booking import BookingCreate, BookingUpdate
 
 
 def get_all_bookings(db: Session):
-    return db.query(Booking).all()
+    return db.query(Booking).filter(Booking.cancelled_at.is_(None)).all()
 
 
 def get_booking(*, db: Session, booking_number: int):
     db_booking = (
-        db.query(Booking).filter(Booking.booking_number == booking_number).first()
+        db.query(Booking)
+        .filter(
+            Booking.booking_number == booking_number, Booking.cancelled_at.is_(None)
+        )
+        .first()
     )
     if not db_booking:
         raise MissingBookingException()
@@ -23,24 +42,31 @@ def get_booking(*, db: Session, booking_number: int):
 
 
 def get_bookings_by_user(*, db: Session, user_id: int):
-    return db.query(Booking).filter(Booking.user_id == user_id).all()
+    return (
+        db.query(Booking)
+        .filter(Booking.user_id == user_id, Booking.cancelled_at.is_(None))
+        .all()
+    )
 
 
 def get_bookings_by_ticket(*, db: Session, ticket_id: int):
-    return db.query(Booking).filter(Booking.ticket_id == ticket_id).all()
+    return (
+        db.query(Booking)
+        .filter(Booking.ticket_id == ticket_id, Booking.cancelled_at.is_(None))
+        .all()
+    )
 
 
 def get_bookings_by_event(*, db: Session, event_id: int):
-    from app.models.ticket import Ticket
-
     return (
         db.query(Booking)
         .join(Ticket, Booking.ticket_id == Ticket.id)
-        .filter(Ticket.event_id == event_id)
+        .filter(Ticket.event_id == event_id, Booking.cancelled_at.is_(None))
         .all()
     )
 
 
+@retryable
 def create_booking(*, db: Session, booking_data: BookingCreate):
     _ = get_ticket(db=db, ticket_id=booking_data.ticket_id)
     _ = get_user(db=db, user_id=booking_data.user_id)
@@ -60,6 +86,231 @@ def create_booking(*, db: Session, booking_data: BookingCreate):
         raise DatabaseException(str(e))
 
 
+def _insert_tickets(*, db: Session, db_events: list[Event]):
+    """
+    Get one ticket per entry of `db_events`, in order, without committing.
+
+    Pre-allocated seats are claimed per event; all other tickets are written
+    with one multi-row INSERT ... RETURNING, whatever their event.
+
+    Returns:
+        list[int]: The ticket ids.
+    """
+    ticket_ids = [None] * len(db_events)
+
+    seat_slots = defaultdict(list)
+    for index, db_event in enumerate(db_events):
+        if db_event.seats_preallocated:
+            seat_slots[db_event.id].append(index)
+    for event_id, indices in seat_slots.items():
+        seats = claim_seats(db=db, event_id=event_id, quantity=len(indices))
+        for index, seat in zip(indices, seats):
+            ticket_ids[index] = seat.id
+
+    new = [i for i, db_event in enumerate(db_events) if not db_event.seats_preallocated]
+    if new:
+        new_ids = db.scalars(
+            insert(Ticket).returning(Ticket.id, sort_by_parameter_order=True),
+            [
+                {
+                    "event_id": db_events[i].id,
+                    "seat_num": "",
+                    "price": db_events[i].ticket_price,
+                }
+                for i in new
+            ],
+        ).all()
+        db.execute(
+            update(Ticket),
+            [
+                {"id": ticket_id, "seat_num": f"{db_events[i].title}-{ticket_id}"}
+                for i, ticket_id in zip(new, new_ids)
+            ],
+        )
+        for index, ticket_id in zip(new, new_ids):
+            ticket_ids[index] = ticket_id
+    return ticket_ids
+
+
+def insert_bookings(*, db: Session, db_event: Event, user_ids: list[int]):
+    """
+    Insert one ticket and one booking per user id without committing.
+
+    The inventory must already be claimed for `len(user_ids)` tickets. Tickets
+    and bookings are written with multi-row INSERT ... RETURNING statements,
+    so the number of round trips does not grow with the batch size.
+
+    Returns:
+        list[Booking]: The bookings, in the order of `user_ids`.
+    """
+    ticket_ids = _insert_tickets(db=db, db_events=[db_event] * len(user_ids))
+    return db.scalars(
+        insert(Booking).returning(Booking, sort_by_parameter_order=True),
+        [
+            {"user_id": user_id, "ticket_id": ticket_id}
+            for user_id, ticket_id in zip(user_ids, ticket_ids)
+        ],
+    ).all()
+
+
+@retryable
+def book_tickets(*, db: Session, event_id: int, user_id: int, quantity: int):
+    """
+    Sell `quantity` tickets for an event and book them for a user atomically.
+
+    The event's inventory is claimed first, so concurrent buyers cannot both
+    get the last seats. Either all tickets are booked in one commit or none.
+
+    Raises:
+        MissingEventException: If the event does not exist or was deleted.
+        NotOnSaleYetException: If the event's tickets are not on sale yet.
+        NoTicketsAvailableException: If fewer than `quantity` tickets are left.
+    """
+    db_event = claim_tickets(db=db, event_id=event_id, quantity=quantity)
+
+    try:
+        db_bookings = insert_bookings(
+            db=db, db_event=db_event, user_ids=[user_id] * quantity
+        )
+        booking_numbers = [db_booking.booking_number for db_booking in db_bookings]
+        db.commit()
+    except (
+        MissingEventException,
+        NotOnSaleYetException,
+        NoTicketsAvailableException,
+    ):
+        db.rollback()
+        raise
+    except IntegrityError as e:
+        db.rollback()
+        raise DatabaseException(str(e))
+
+    return (
+        db.query(Booking)
+        .filter(Booking.booking_number.in_(booking_numbers))
+        .order_by(Booking.booking_number)
+        .all()
+    )
+
+
+@retryable
+def book_tickets_for_users(*, db: Session, event_id: int, user_ids: list[int]):
+    """
+    Book one ticket per user for an event in one transaction, first come first.
+
+    Capacity is checked once for the whole group. Users beyond the remaining
+    capacity get no booking instead of failing the others.
+
+    Returns:
+        list[Booking | None]: The booking of each user, None if sold out.
+
+    Raises:
+        MissingEventException: If the event does not exist or was deleted.
+        NotOnSaleYetException: If the event's tickets are not on sale yet.
+    """
+    db_event, claimed = claim_available_tickets(
+        db=db, event_id=event_id, quantity=len(user_ids)
+    )
+    if not claimed:
+        db.rollback()
+        return [None] * len(user_ids)
+
+    try:
+        db_bookings = insert_bookings(
+            db=db, db_event=db_event, user_ids=user_ids[:claimed]
+        )
+        booking_numbers = [db_booking.booking_number for db_booking in db_bookings]
+        db.commit()
+    except NoTicketsAvailableException:
+        db.rollback()
+        raise
+    except IntegrityError as e:
+        db.rollback()
+        raise DatabaseException(str(e))
+
+    db_bookings = (
+        db.query(Booking)
+        .filter(Booking.booking_number.in_(booking_numbers))
+        .order_by(Booking.booking_number)
+        .all()
+    )
+    return db_bookings + [None] * (len(user_ids) - claimed)
+
+
+def book_ticket(*, db: Session, event_id: int, user_id: int):
+    """
+    Sell one ticket for an event and book it for a user in a single transaction.
+
+    Events with pre-allocated seats hand out a free seat row; otherwise a
+    ticket is inserted with its final seat number.
+
+    Raises:
+        MissingEventException: If the event does not exist or was deleted.
+        NotOnSaleYetException: If the event's tickets are not on sale yet.
+        NoTicketsAvailableException: If the event is sold out.
+    """
+    return book_tickets(db=db, event_id=event_id, user_id=user_id, quantity=1)[0]
+
+
+@retryable
+def checkout_cart(*, db: Session, user_id: int, items: dict[int, int]):
+    """
+    Book tickets of several events for a user in one transaction.
+
+    The inventory of every event is claimed before anything is inserted, in
+    ascending event id order, so concurrent carts lock the same rows in the
+    same order and cannot deadlock. Tickets and bookings of all events are
+    then written with one multi-row INSERT each. All or nothing is booked.
+
+    Args:
+        items (dict[int, int]): The number of tickets per event id.
+
+    Returns:
+        list[Booking]: The new bookings, ordered by event id.
+
+    Raises:
+        MissingEventException: If an event does not exist or was deleted.
+        NotOnSaleYetException: If an event's tickets are not on sale yet.
+        CartItemSoldOutException: If an event has too few tickets left.
+    """
+    db_events = []
+    try:
+        for event_id in sorted(items):
+            try:
+                db_event = claim_tickets(
+                    db=db, event_id=event_id, quantity=items[event_id]
+                )
+            except NoTicketsAvailableException:
+                raise CartItemSoldOutException(event_id=event_id)
+            db_events += [db_event] * items[event_id]
+
+        ticket_ids = _insert_tickets(db=db, db_events=db_events)
+        db_bookings = db.scalars(
+            insert(Booking).returning(Booking, sort_by_parameter_order=True),
+            [{"user_id": user_id, "ticket_id": ticket_id} for ticket_id in ticket_ids],
+        ).all()
+        booking_numbers = [db_booking.booking_number for db_booking in db_bookings]
+        db.commit()
+    except (
+        MissingEventException,
+        NotOnSaleYetException,
+        NoTicketsAvailableException,
+    ):
+        db.rollback()
+        raise
+    except IntegrityError as e:
+        db.rollback()
+        raise DatabaseException(str(e))
+
+    return (
+        db.query(Booking)
+        .filter(Booking.booking_number.in_(booking_numbers))
+        .order_by(Booking.booking_number)
+        .all()
+    )
+
+
+@retryable
 def update_booking(*, db: Session, booking_number: int, booking_data: BookingUpdate):
     db_booking = get_booking(db=db, booking_number=booking_number)
 
@@ -82,15 +333,55 @@ def update_booking(*, db: Session, booking_number: int, booking_data: BookingUpd
         raise DatabaseException(str(e))
 
 
+@retryable
 def delete_booking(*, db: Session, booking_number: int):
-    db_booking = get_booking(db=db, booking_number=booking_number)
-    ticket_id = db_booking.ticket_id
+    """
+    Cancel a booking and give its ticket back to the event's inventory.
+
+    The booking and its ticket are cancelled with one UPDATE each instead of
+    being deleted. Pre-allocated seats go back to the pool of unsold seats
+    rather than being cancelled.
+
+    Returns:
+        Row: The cancelled booking's number, user id and ticket id.
+
+    Raises:
+        MissingBookingException: If there is no live booking with this number.
+    """
+    cancelled_at = utcnow()
 
     try:
-        db.delete(db_booking)
-        db.commit()
+        db_booking = db.execute(
+            update(Booking)
+            .where(
+                Booking.booking_number == booking_number,
+                Booking.cancelled_at.is_(None),
+            )
+            .values(cancelled_at=cancelled_at)
+            .returning(Booking.booking_number, Booking.user_id, Booking.ticket_id)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if not db_booking:
+            db.rollback()
+            raise MissingBookingException()
 
-        delete_ticket(db=db, ticket_id=ticket_id)
+        is_seat = (
+            select(Event.seats_preallocated)
+            .where(Event.id == Ticket.event_id)
+            .scalar_subquery()
+        )
+        event_id = db.execute(
+            update(Ticket)
+            .where(Ticket.id == db_booking.ticket_id)
+            .values(
+                sold_at=case((is_seat, None), else_=Ticket.sold_at),
+                cancelled_at=case((is_seat, None), else_=cancelled_at),
+            )
+            .returning(Ticket.event_id)
+            .execution_options(synchronize_session=False)
+        ).scalar_one()
+        adjust_tickets_sold(db=db, event_id=event_id, delta=-1)
+        db.commit()
 
         return db_booking
     except IntegrityError as e:
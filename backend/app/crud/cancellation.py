@@ -0,0 +1,124 @@
+from datetime import datetime
+
+from sqlalchemy import Select, delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.core.retry import retryable
+from app.models.archive import BookingArchive, TicketArchive
+from app.models.booking import Booking
+from app.models.hold import SeatHold
+from app.models.ticket import Ticket
+
+
+def cancel_event_bookings(*, db: Session, event_ids: Select, cancelled_at: datetime):
+    """
+    Cancel every live booking and ticket of the selected events without committing.
+
+    Runs one UPDATE for the bookings, one each for sold tickets and unsold
+    pre-allocated seats, and one DELETE for open seat holds, with `event_ids`
+    as a subquery, so the cost in round trips does not depend on the number
+    of attendees. Only sold tickets count towards `cancelled_tickets`. Callers mark the
+    events deleted first: that row lock waits for in-flight bookings to
+    commit, and no new booking can claim a deleted event afterwards.
+
+    Returns:
+        dict[str, int]: `cancelled_bookings`, `cancelled_tickets` and
+                        `released_holds` counts.
+    """
+    event_tickets = select(Ticket.id).where(Ticket.event_id.in_(event_ids))
+    cancelled_bookings = db.execute(
+        update(Booking)
+        .where(Booking.ticket_id.in_(event_tickets), Booking.cancelled_at.is_(None))
+        .values(cancelled_at=cancelled_at)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    live_tickets = (Ticket.event_id.in_(event_ids), Ticket.cancelled_at.is_(None))
+    cancelled_tickets = db.execute(
+        update(Ticket)
+        .where(*live_tickets, Ticket.sold_at.is_not(None))
+        .values(cancelled_at=cancelled_at)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    # Unsold pre-allocated seats go too, but nobody held them
+    db.execute(
+        update(Ticket)
+        .where(*live_tickets, Ticket.sold_at.is_(None))
+        .values(cancelled_at=cancelled_at)
+        .execution_options(synchronize_session=False)
+    )
+    released_holds = db.execute(
+        delete(SeatHold)
+        .where(SeatHold.event_id.in_(event_ids))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    return {
+        "cancelled_bookings": cancelled_bookings,
+        "cancelled_tickets": cancelled_tickets,
+        "released_holds": released_holds,
+    }
+
+
+def _archive_batch(*, db: Session, model, archive, key, ids: list[int]) -> None:
+    columns = [column.name for column in model.__table__.c]
+    db.execute(
+        insert(archive).from_select(
+            columns, select(*model.__table__.c).where(key.in_(ids))
+        )
+    )
+    db.execute(
+        delete(model).where(key.in_(ids)).execution_options(synchronize_session=False)
+    )
+
+
+@retryable
+def archive_cancelled(*, db: Session, cancelled_before: datetime, batch_size: int):
+    """
+    Move bookings and tickets cancelled before a cutoff into the archive tables.
+
+    Rows are moved in batches of `batch_size`, each its own short transaction,
+    so compaction never holds locks on many live rows at once. Bookings go
+    first; a ticket is only moved once no booking references it anymore.
+
+    Returns:
+        dict[str, int]: The number of archived `bookings` and `tickets`.
+    """
+    archived = {"bookings": 0, "tickets": 0}
+    batches = (
+        (
+            "bookings",
+            Booking,
+            BookingArchive,
+            Booking.booking_number,
+            select(Booking.booking_number).where(
+                Booking.cancelled_at < cancelled_before
+            ),
+        ),
+        (
+            "tickets",
+            Ticket,
+            TicketArchive,
+            Ticket.id,
+            select(Ticket.id).where(
+                Ticket.cancelled_at < cancelled_before,
+                ~select(Booking.booking_number)
+                .where(Booking.ticket_id == Ticket.id)
+                .exists(),
+            ),
+        ),
+    )
+
+    for name, model, archive, key, candidates in batches:
+        while True:
+            ids = db.scalars(
+                candidates.order_by(key)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            ).all()
+            if not ids:
+                break
+            _archive_batch(db=db, model=model, archive=archive, key=key, ids=ids)
+            db.commit()
+            archived[name] += len(ids)
+            if len(ids) < batch_size:
+                break
+    return archived
@@ -1,15 +1,21 @@
-from datetime import datetime, timezone
+from datetime import datetime
 
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from app.core.clock import utcnow
+from app.core.retry import retryable
+from app.crud.cancellation import cancel_event_bookings
+from app.crud.inventory import rebalance_shards, sync_seats
 from app.crud.location import get_location
 from app.crud.user import get_user
 from app.exceptions.db import DatabaseException
 from app.exceptions.event import MissingEventException, WrongRoleException
 from app.models.enums import UserRole
 from app.models.event import Event
-from app.schemas.event import EventCreate, EventUpdate
+from app.schemas.event import Event as EventSchema
+from app.schemas.event import EventCreate, EventDeleted, EventUpdate
 
 
 def get_events(
@@ -31,6 +37,15 @@ def get_event(*, db: Session, event_id: int):
     return db_event
 
 
+def get_events_going_on_sale(*, db: Session, after: datetime):
+    return (
+        db.query(Event)
+        .filter(Event.deleted_at.is_(None), Event.on_sale_at > after)
+        .order_by(Event.on_sale_at)
+        .all()
+    )
+
+
 def get_events_by_location(*, db: Session, location_id: int):
     return db.query(Event).filter(
         Event.location_id == location_id, Event.deleted_at.is_(None)
@@ -43,6 +58,7 @@ def get_event_by_organizer(*, db: Session, organizer_id: int):
     )
 
 
+@retryable
 def create_event(*, db: Session, event: EventCreate):
     db_user = get_user(db=db, user_id=event.organizer_id)
 
@@ -62,9 +78,18 @@ def create_event(*, db: Session, event: EventCreate):
         location_id=event.location_id,
         organizer_id=event.organizer_id,
         ticket_capacity=event.ticket_capacity,
+        ticket_price=event.ticket_price,
+        inventory_shards=event.inventory_shards,
+        seats_preallocated=event.preallocate_seats,
+        on_sale_at=event.on_sale_at,
     )
     try:
         db.add(db_event)
+        db.flush()
+        if db_event.inventory_shards > 1:
+            rebalance_shards(db=db, db_event=db_event, sold=0)
+        if db_event.seats_preallocated:
+            sync_seats(db=db, db_event=db_event)
         db.commit()
         db.refresh(db_event)
         return db_event
@@ -73,6 +98,7 @@ def create_event(*, db: Session, event: EventCreate):
         raise DatabaseException(str(e))
 
 
+@retryable
 def update_event(*, db: Session, event: EventUpdate, event_id: int):
     db_event = get_event(db=db, event_id=event_id)
 
@@ -88,24 +114,49 @@ def update_event(*, db: Session, event: EventUpdate, event_id: int):
         ):
             raise WrongRoleException(user=db_user.username)
 
+    was_sharded = db_event.inventory_shards > 1
+
     for key, value in update_data.items():
         setattr(db_event, key, value)
 
+    if (was_sharded or db_event.inventory_shards > 1) and (
+        "ticket_capacity" in update_data or "inventory_shards" in update_data
+    ):
+        rebalance_shards(db=db, db_event=db_event)
+    if db_event.seats_preallocated and "ticket_capacity" in update_data:
+        sync_seats(db=db, db_event=db_event)
+
     db.commit()
     db.refresh(db_event)
     return db_event
 
 
+@retryable
 def delete_event(*, db: Session, event_id: int):
+    """
+    Soft-delete an event and cancel its bookings and tickets in one transaction.
+
+    Returns:
+        EventDeleted: The deleted event and the number of cancelled rows.
+    """
     db_event = get_event(db=db, event_id=event_id)
 
     try:
-        db_event.deleted_at = datetime.now(timezone.utc)
+        deleted_at = utcnow()
+        db_event.deleted_at = deleted_at
+        db.flush()
+        cancelled = cancel_event_bookings(
+            db=db,
+            event_ids=select(Event.id).where(Event.id == event_id),
+            cancelled_at=deleted_at,
+        )
 
         db.commit()
         db.refresh(db_event)
 
-        return db_event
+        return EventDeleted(
+            **EventSchema.model_validate(db_event).model_dump(), **cancelled
+        )
     except IntegrityError as e:
         db.rollback()
         raise DatabaseException(str(e))
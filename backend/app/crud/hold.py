@@ -0,0 +1,159 @@
+from collections import Counter
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.clock import utcnow
+from app.core.retry import retryable
+from app.crud.booking import insert_bookings
+from app.crud.event import get_event
+from app.crud.inventory import adjust_tickets_sold, claim_tickets
+from app.exceptions.db import DatabaseException
+from app.exceptions.event import MissingEventException
+from app.exceptions.hold import ExpiredSeatHoldException, MissingSeatHoldException
+from app.exceptions.ticket import NoTicketsAvailableException
+from app.models.booking import Booking
+from app.models.hold import SeatHold
+
+
+@retryable
+def create_hold(
+    *, db: Session, event_id: int, user_id: int, quantity: int, ttl_seconds: int
+):
+    """
+    Reserve `quantity` tickets of an event for a user until the hold expires.
+
+    The tickets are taken from the event's inventory right away, but no
+    ticket or booking rows are written until the hold is confirmed.
+
+    Raises:
+        MissingEventException: If the event does not exist or was deleted.
+        NotOnSaleYetException: If the event's tickets are not on sale yet.
+        NoTicketsAvailableException: If fewer than `quantity` tickets are left.
+    """
+    claim_tickets(db=db, event_id=event_id, quantity=quantity)
+    db_hold = SeatHold(
+        event_id=event_id,
+        user_id=user_id,
+        quantity=quantity,
+        expires_at=utcnow() + timedelta(seconds=ttl_seconds),
+    )
+    db.add(db_hold)
+    db.commit()
+    db.refresh(db_hold)
+    return db_hold
+
+
+def _take_hold(*, db: Session, hold_id: int, user_id: int):
+    # Deleting the hold is what decides between confirm, release and the
+    # sweeper: whoever deletes the row owns its claimed inventory.
+    taken = db.execute(
+        delete(SeatHold)
+        .where(
+            SeatHold.id == hold_id,
+            SeatHold.user_id == user_id,
+            SeatHold.expires_at > utcnow(),
+        )
+        .returning(*SeatHold.__table__.c)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if taken:
+        return taken
+
+    db_hold = (
+        db.query(SeatHold)
+        .filter(SeatHold.id == hold_id, SeatHold.user_id == user_id)
+        .first()
+    )
+    db.rollback()
+    if db_hold:
+        raise ExpiredSeatHoldException()
+    raise MissingSeatHoldException()
+
+
+@retryable
+def confirm_hold(*, db: Session, hold_id: int, user_id: int):
+    """
+    Turn a user's unexpired hold into one booking per held ticket.
+
+    Returns:
+        list[Booking]: The new bookings.
+
+    Raises:
+        MissingSeatHoldException: If the user has no hold with this id.
+        ExpiredSeatHoldException: If the hold expired before confirmation.
+        MissingEventException: If the event was deleted in the meantime.
+    """
+    hold = _take_hold(db=db, hold_id=hold_id, user_id=user_id)
+    try:
+        db_event = get_event(db=db, event_id=hold.event_id)
+    except MissingEventException:
+        db.rollback()
+        raise
+
+    try:
+        db_bookings = insert_bookings(
+            db=db, db_event=db_event, user_ids=[user_id] * hold.quantity
+        )
+        booking_numbers = [db_booking.booking_number for db_booking in db_bookings]
+        db.commit()
+    except NoTicketsAvailableException:
+        db.rollback()
+        raise
+    except IntegrityError as e:
+        db.rollback()
+        raise DatabaseException(str(e))
+
+    return (
+        db.query(Booking)
+        .filter(Booking.booking_number.in_(booking_numbers))
+        .order_by(Booking.booking_number)
+        .all()
+    )
+
+
+@retryable
+def release_hold(*, db: Session, hold_id: int, user_id: int):
+    """
+    Give a user's unexpired hold back to the event's inventory.
+
+    Returns:
+        Row: The released hold.
+
+    Raises:
+        MissingSeatHoldException: If the user has no hold with this id.
+        ExpiredSeatHoldException: If the hold already expired.
+    """
+    hold = _take_hold(db=db, hold_id=hold_id, user_id=user_id)
+    adjust_tickets_sold(db=db, event_id=hold.event_id, delta=-hold.quantity)
+    db.commit()
+    return hold
+
+
+@retryable
+def release_expired_holds(*, db: Session, now: datetime | None = None):
+    """
+    Delete all expired holds and give their tickets back in one transaction.
+
+    The holds are removed with a single DELETE ... RETURNING, then each
+    affected event's counter is decremented once by its total.
+
+    Returns:
+        dict[int, int]: The number of released tickets per event id.
+    """
+    expired = db.execute(
+        delete(SeatHold)
+        .where(SeatHold.expires_at <= (now or utcnow()))
+        .returning(SeatHold.event_id, SeatHold.quantity)
+        .execution_options(synchronize_session=False)
+    ).all()
+
+    released = Counter()
+    for event_id, quantity in expired:
+        released[event_id] += quantity
+    for event_id in sorted(released):
+        adjust_tickets_sold(db=db, event_id=event_id, delta=-released[event_id])
+    db.commit()
+    return dict(released)
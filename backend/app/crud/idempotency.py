@@ -0,0 +1,89 @@
+from datetime import datetime
+
+from sqlalchemy import and_, delete, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.clock import utcnow
+from app.models.idempotency import IdempotencyKey
+
+
+def get_idempotency_key(*, db: Session, key: str):
+    return db.get(IdempotencyKey, key, populate_existing=True)
+
+
+def _expired(expires_before: datetime, pending_before: datetime):
+    # Pending rows left behind by a crashed request expire much sooner
+    return or_(
+        IdempotencyKey.created_at < expires_before,
+        and_(
+            IdempotencyKey.response.is_(None),
+            IdempotencyKey.created_at < pending_before,
+        ),
+    )
+
+
+def claim_idempotency_key(
+    *,
+    db: Session,
+    key: str,
+    request_hash: str,
+    expires_before: datetime,
+    pending_before: datetime,
+):
+    """
+    Record that a request with `key` has started, unless one already has.
+
+    The pending row is committed right away so that other workers see it.
+    Rows created before `expires_before`, and rows still pending since
+    before `pending_before`, are deleted and claimed again.
+
+    Returns:
+        IdempotencyKey | None: The existing row, or None if this caller
+                               claimed the key and has to run the request.
+    """
+    db.execute(
+        delete(IdempotencyKey).where(
+            IdempotencyKey.key == key, _expired(expires_before, pending_before)
+        )
+    )
+    db.add(
+        IdempotencyKey(
+            key=key, request_hash=request_hash, created_at=utcnow()
+        )
+    )
+    try:
+        db.commit()
+        return None
+    except IntegrityError:
+        db.rollback()
+        return get_idempotency_key(db=db, key=key)
+
+
+def complete_idempotency_key(*, db: Session, key: str, response):
+    db_key = get_idempotency_key(db=db, key=key)
+    db_key.response = response
+    db.commit()
+    return db_key
+
+
+def release_idempotency_key(*, db: Session, key: str):
+    """Forget a pending key whose request failed so that a retry runs again."""
+    db.rollback()
+    db.execute(
+        delete(IdempotencyKey).where(
+            IdempotencyKey.key == key, IdempotencyKey.response.is_(None)
+        )
+    )
+    db.commit()
+
+
+def delete_expired_idempotency_keys(
+    *, db: Session, expires_before: datetime, pending_before: datetime
+) -> int:
+    """Delete the rows that `claim_idempotency_key` would claim again."""
+    result = db.execute(
+        delete(IdempotencyKey).where(_expired(expires_before, pending_before))
+    )
+    db.commit()
+    return result.rowcount
@@ -0,0 +1,439 @@
+import random
+
+from sqlalchemy import Integer, cast, delete, func, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.clock import utcnow
+from app.core.retry import retryable
+from app.exceptions.db import TransientDatabaseException
+from app.exceptions.event import MissingEventException, NotOnSaleYetException
+from app.exceptions.ticket import NoTicketsAvailableException
+from app.models.event import Event
+from app.models.hold import SeatHold
+from app.models.inventory import EventInventoryShard
+from app.models.ticket import Ticket
+
+
+def _get_event(*, db: Session, event_id: int):
+    db_event = (
+        db.query(Event).filter(Event.id == event_id, Event.deleted_at.is_(None)).first()
+    )
+    if not db_event:
+        raise MissingEventException()
+    return db_event
+
+
+def check_on_sale(*, db_event: Event):
+    """
+    Raises:
+        NotOnSaleYetException: If the event's tickets are not on sale yet.
+    """
+    if db_event.on_sale_at is not None and db_event.on_sale_at > utcnow():
+        raise NotOnSaleYetException(on_sale_at=db_event.on_sale_at)
+
+
+def _get_shards(*, db: Session, event_id: int, lock: bool = False):
+    query = (
+        db.query(EventInventoryShard)
+        .filter(EventInventoryShard.event_id == event_id)
+        .order_by(EventInventoryShard.shard)
+    )
+    if lock:
+        query = query.with_for_update()
+    return query.all()
+
+
+def _claim_from_shards(*, db: Session, db_event: Event, quantity: int):
+    shard_count = db_event.inventory_shards
+    start = random.randrange(shard_count)
+
+    # Try to take the whole quantity from one slot, starting at a random one
+    # so concurrent buyers spread their row locks over all slots.
+    for offset in range(shard_count):
+        shard = (start + offset) % shard_count
+        result = db.execute(
+            update(EventInventoryShard)
+            .where(
+                EventInventoryShard.event_id == db_event.id,
+                EventInventoryShard.shard == shard,
+                EventInventoryShard.sold + quantity <= EventInventoryShard.capacity,
+            )
+            .values(sold=EventInventoryShard.sold + quantity)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount:
+            return
+
+    if quantity == 1:
+        raise NoTicketsAvailableException()
+
+    # No single slot is large enough: lock all of them in slot order and
+    # spread the quantity over whatever is left.
+    shards = _get_shards(db=db, event_id=db_event.id, lock=True)
+    if sum(max(s.capacity - s.sold, 0) for s in shards) < quantity:
+        raise NoTicketsAvailableException()
+
+    remaining = quantity
+    for db_shard in shards:
+        take = min(max(db_shard.capacity - db_shard.sold, 0), remaining)
+        db_shard.sold += take
+        remaining -= take
+    db.flush()
+
+
+def claim_tickets(*, db: Session, event_id: int, quantity: int = 1):
+    """
+    Take `quantity` tickets from an event's inventory without committing.
+
+    For unsharded events the capacity check and the increment are one
+    conditional UPDATE on the event row. Sharded events claim from one of
+    their counter slots instead, falling back to the others when it runs dry.
+    Row locks are held only until the caller commits. Counter updates leave
+    the event's `updated_at` alone; selling a ticket does not edit the event.
+
+    Returns:
+        Event: The claimed event.
+
+    Raises:
+        MissingEventException: If the event does not exist or was deleted.
+        NotOnSaleYetException: If the event's tickets are not on sale yet.
+        NoTicketsAvailableException: If fewer than `quantity` tickets are left.
+    """
+    db_event = db.scalars(
+        update(Event)
+        .where(
+            Event.id == event_id,
+            Event.deleted_at.is_(None),
+            or_(Event.on_sale_at.is_(None), Event.on_sale_at <= utcnow()),
+            Event.inventory_shards <= 1,
+            Event.tickets_sold + quantity <= Event.ticket_capacity,
+        )
+        .values(
+            tickets_sold=Event.tickets_sold + quantity,
+            updated_at=Event.updated_at,
+        )
+        .returning(Event)
+    ).first()
+    if db_event:
+        return db_event
+
+    db_event = _get_event(db=db, event_id=event_id)
+    check_on_sale(db_event=db_event)
+    if db_event.inventory_shards <= 1:
+        raise NoTicketsAvailableException()
+
+    _claim_from_shards(db=db, db_event=db_event, quantity=quantity)
+    return db_event
+
+
+# Reads and conditional increments of a counter row before giving up
+_CLAIM_ATTEMPTS = 10
+
+
+def _claim_up_to(*, db: Session, sold, capacity, where: tuple, quantity: int):
+    """
+    Claim up to `quantity` from one counter row, returning how many.
+
+    Raises:
+        TransientDatabaseException: If the row kept changing between the
+                                    read and the conditional increment.
+    """
+    # The row lock makes the first increment succeed where FOR UPDATE works
+    # (Postgres). Where it is a no-op (SQLite) the relative, conditional
+    # increment still never oversells; losing a race means reading again.
+    for _ in range(_CLAIM_ATTEMPTS):
+        row = db.execute(select(sold, capacity).where(*where).with_for_update()).first()
+        take = min(quantity, row[1] - row[0]) if row else 0
+        if take <= 0:
+            return 0
+        values = {sold: sold + take}
+        if sold.class_ is Event:
+            values[Event.updated_at] = Event.updated_at
+        result = db.execute(
+            update(sold.class_)
+            .where(*where, sold + take <= capacity)
+            .values(values)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount:
+            return take
+    raise TransientDatabaseException("inventory kept changing during the claim")
+
+
+def claim_available_tickets(*, db: Session, event_id: int, quantity: int):
+    """
+    Take up to `quantity` tickets from an event's inventory without committing.
+
+    Unlike `claim_tickets` this never fails for lack of capacity; it claims
+    whatever is left, for callers that book on behalf of several buyers at
+    once. Each counter row is claimed with a conditional increment, so
+    concurrent callers can never take more than its capacity.
+
+    Returns:
+        tuple[Event, int]: The event and the number of tickets claimed.
+
+    Raises:
+        MissingEventException: If the event does not exist or was deleted.
+        NotOnSaleYetException: If the event's tickets are not on sale yet.
+        TransientDatabaseException: If a counter row kept changing under it.
+    """
+    db_event = _get_event(db=db, event_id=event_id)
+    check_on_sale(db_event=db_event)
+
+    if db_event.inventory_shards <= 1:
+        claimed = _claim_up_to(
+            db=db,
+            sold=Event.tickets_sold,
+            capacity=Event.ticket_capacity,
+            where=(Event.id == event_id,),
+            quantity=quantity,
+        )
+    else:
+        claimed = 0
+        for shard in range(db_event.inventory_shards):
+            if claimed == quantity:
+                break
+            claimed += _claim_up_to(
+                db=db,
+                sold=EventInventoryShard.sold,
+                capacity=EventInventoryShard.capacity,
+                where=(
+                    EventInventoryShard.event_id == event_id,
+                    EventInventoryShard.shard == shard,
+                ),
+                quantity=quantity - claimed,
+            )
+    db.expire(db_event, ["tickets_sold"])
+    return db_event, claimed
+
+
+def adjust_tickets_sold(*, db: Session, event_id: int, delta: int):
+    """
+    Add `delta` to an event's sold counter without a capacity check.
+
+    Used when tickets are created or removed outside of a booking. The change
+    is committed together with the caller's transaction.
+    """
+    result = db.execute(
+        update(Event)
+        .where(Event.id == event_id, Event.inventory_shards <= 1)
+        .values(tickets_sold=Event.tickets_sold + delta, updated_at=Event.updated_at)
+    )
+    if result.rowcount:
+        return
+
+    shards = _get_shards(db=db, event_id=event_id, lock=True)
+    if not shards:
+        return
+
+    if delta > 0:
+        random.choice(shards).sold += delta
+    else:
+        remaining = -delta
+        for db_shard in sorted(shards, key=lambda s: s.sold, reverse=True):
+            take = min(db_shard.sold, remaining)
+            db_shard.sold -= take
+            remaining -= take
+    db.flush()
+
+
+def get_tickets_sold(*, db: Session, db_event: Event):
+    if db_event.inventory_shards <= 1:
+        return db_event.tickets_sold
+    return db.scalar(
+        select(func.coalesce(func.sum(EventInventoryShard.sold), 0)).where(
+            EventInventoryShard.event_id == db_event.id
+        )
+    )
+
+
+def get_available_count(*, db: Session, event_id: int):
+    db_event = _get_event(db=db, event_id=event_id)
+    return db_event.ticket_capacity - get_tickets_sold(db=db, db_event=db_event)
+
+
+def rebalance_shards(*, db: Session, db_event: Event, sold: int | None = None):
+    """
+    Split an event's capacity over `db_event.inventory_shards` counter slots.
+
+    Existing slots are replaced. The tickets already sold (or `sold`, when
+    given) are kept and spread over the new slots. With a single shard the
+    counter moves back onto the event row. Does not commit.
+    """
+    if sold is None:
+        existing = _get_shards(db=db, event_id=db_event.id, lock=True)
+        sold = sum(s.sold for s in existing) if existing else db_event.tickets_sold
+
+    db.execute(
+        delete(EventInventoryShard).where(EventInventoryShard.event_id == db_event.id)
+    )
+    db_event.tickets_sold = sold
+
+    shard_count = db_event.inventory_shards
+    if shard_count <= 1:
+        db.flush()
+        return
+
+    base, extra = divmod(db_event.ticket_capacity, shard_count)
+    rows = []
+    remaining = sold
+    for shard in range(shard_count):
+        capacity = base + (1 if shard < extra else 0)
+        take = remaining if shard == shard_count - 1 else min(capacity, remaining)
+        rows.append(
+            {
+                "event_id": db_event.id,
+                "shard": shard,
+                "capacity": capacity,
+                "sold": take,
+            }
+        )
+        remaining -= take
+    db.execute(insert(EventInventoryShard), rows)
+    db.flush()
+
+
+def sync_seats(*, db: Session, db_event: Event):
+    """
+    Bring an event's pre-allocated seat rows in line with its capacity.
+
+    Missing seats are inserted in one multi-row INSERT, numbered after the
+    highest seat number the event has, and surplus unsold seats are deleted,
+    highest seat first. Does not commit.
+    """
+    seat_count = (
+        db.query(func.count(Ticket.id))
+        .filter(Ticket.event_id == db_event.id, Ticket.cancelled_at.is_(None))
+        .scalar()
+    )
+    missing = db_event.ticket_capacity - seat_count
+
+    if missing > 0:
+        # Seats sold above deleted ones leave gaps, so counting would reuse
+        # a number still taken. Cast, as text "9" sorts after "10".
+        last_seat = db.scalar(
+            select(func.coalesce(func.max(cast(Ticket.seat_num, Integer)), 0)).where(
+                Ticket.event_id == db_event.id,
+                Ticket.seat_num.regexp_match("^[0-9]+$"),
+            )
+        )
+        # Core insert: the ORM would replace sold_at=None with its default
+        db.execute(
+            insert(Ticket.__table__),
+            [
+                {
+                    "event_id": db_event.id,
+                    "seat_num": str(last_seat + n),
+                    "price": db_event.ticket_price,
+                    "sold_at": None,
+                }
+                for n in range(1, missing + 1)
+            ],
+        )
+    elif missing < 0:
+        surplus = (
+            select(Ticket.id)
+            .where(
+                Ticket.event_id == db_event.id,
+                Ticket.sold_at.is_(None),
+                Ticket.cancelled_at.is_(None),
+            )
+            .order_by(Ticket.id.desc())
+            .limit(-missing)
+        )
+        db.execute(
+            delete(Ticket)
+            .where(Ticket.id.in_(surplus))
+            .execution_options(synchronize_session=False)
+        )
+    db.flush()
+
+
+def claim_seats(*, db: Session, event_id: int, quantity: int = 1):
+    """
+    Mark `quantity` pre-allocated seats of an event as sold without committing.
+
+    Seats locked by concurrent buyers are skipped instead of waited for. Call
+    after `claim_tickets`, which already guarantees that enough seats exist.
+
+    Returns:
+        list[Ticket]: The claimed seats.
+
+    Raises:
+        NoTicketsAvailableException: If fewer than `quantity` seats are free.
+    """
+    seats = db.scalars(
+        select(Ticket)
+        .where(
+            Ticket.event_id == event_id,
+            Ticket.sold_at.is_(None),
+            Ticket.cancelled_at.is_(None),
+        )
+        .order_by(Ticket.id)
+        .limit(quantity)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if len(seats) < quantity:
+        raise NoTicketsAvailableException()
+
+    sold_at = utcnow()
+    for seat in seats:
+        seat.sold_at = sold_at
+    db.flush()
+    return seats
+
+
+@retryable
+def reconcile_tickets_sold(*, db: Session, event_id: int | None = None):
+    """
+    Rebuild the sold counters from the tickets and seat_holds tables.
+
+    Returns:
+        int: The number of events whose counter was wrong.
+    """
+    sold_count = (
+        select(func.count(Ticket.id))
+        .where(
+            Ticket.event_id == Event.id,
+            Ticket.sold_at.isnot(None),
+            Ticket.cancelled_at.is_(None),
+        )
+        .scalar_subquery()
+    ) + (
+        select(func.coalesce(func.sum(SeatHold.quantity), 0))
+        .where(SeatHold.event_id == Event.id)
+        .scalar_subquery()
+    )
+    stmt = (
+        update(Event)
+        .where(Event.inventory_shards <= 1, Event.tickets_sold != sold_count)
+        .values(tickets_sold=sold_count, updated_at=Event.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    sharded = db.query(Event).filter(Event.inventory_shards > 1)
+    if event_id is not None:
+        stmt = stmt.where(Event.id == event_id)
+        sharded = sharded.filter(Event.id == event_id)
+
+    corrected = db.execute(stmt).rowcount
+
+    for db_event in sharded.with_for_update().all():
+        counted = (
+            db.query(func.count(Ticket.id))
+            .filter(
+                Ticket.event_id == db_event.id,
+                Ticket.sold_at.isnot(None),
+                Ticket.cancelled_at.is_(None),
+            )
+            .scalar()
+        ) + (
+            db.query(func.coalesce(func.sum(SeatHold.quantity), 0))
+            .filter(SeatHold.event_id == db_event.id)
+            .scalar()
+        )
+        if counted != get_tickets_sold(db=db, db_event=db_event):
+            corrected += 1
+        rebalance_shards(db=db, db_event=db_event, sold=counted)
+
+    db.commit()
+    return corrected
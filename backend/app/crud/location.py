@@ -1,15 +1,19 @@
-from datetime import datetime, timezone
-
+from sqlalchemy import select, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from app.core.clock import utcnow
+from app.core.retry import retryable
+from app.crud.cancellation import cancel_event_bookings
 from app.exceptions.db import DatabaseException
 from app.exceptions.location import (
     DuplicateLocationNameException,
     MissingLocationException,
 )
+from app.models.event import Event
 from app.models.location import Location
-from app.schemas.location import LocationCreate, LocationUpdate
+from app.schemas.location import Location as LocationSchema
+from app.schemas.location import LocationCreate, LocationDeleted, LocationUpdate
 
 
 def get_location(*, db: Session, location_id: int):
@@ -35,6 +39,7 @@ def get_locations(db: Session):
     return db.query(Location).filter(Location.deleted_at.is_(None)).all()
 
 
+@retryable
 def create_location(*, db: Session, location: LocationCreate):
     if get_location_by_name(db=db, location_name=location.name):
         raise DuplicateLocationNameException(name=location.name)
@@ -53,6 +58,7 @@ def create_location(*, db: Session, location: LocationCreate):
         raise DatabaseException(str(e))
 
 
+@retryable
 def update_location(*, db: Session, location: LocationUpdate, location_id: int):
     db_location = get_location(db=db, location_id=location_id)
 
@@ -73,18 +79,44 @@ def update_location(*, db: Session, location: LocationUpdate, location_id: int):
         raise DatabaseException(str(e))
 
 
+@retryable
 def delete_location(*, db: Session, location_id: int):
+    """
+    Soft-delete a location with its events, their bookings and tickets.
+
+    The events are marked deleted with one UPDATE, then their bookings and
+    tickets are cancelled set-wise, all in one transaction.
+
+    Returns:
+        LocationDeleted: The deleted location and the number of affected rows.
+    """
     db_location = get_location(db=db, location_id=location_id)
     if not db_location:
         raise MissingLocationException()
 
     try:
-        db_location.deleted_at = datetime.now(timezone.utc)
+        deleted_at = utcnow()
+        db_location.deleted_at = deleted_at
+        deleted_events = db.execute(
+            update(Event)
+            .where(Event.location_id == location_id, Event.deleted_at.is_(None))
+            .values(deleted_at=deleted_at)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        cancelled = cancel_event_bookings(
+            db=db,
+            event_ids=select(Event.id).where(Event.location_id == location_id),
+            cancelled_at=deleted_at,
+        )
 
         db.commit()
         db.refresh(db_location)
 
-        return db_location
+        return LocationDeleted(
+            **LocationSchema.model_validate(db_location).model_dump(),
+            deleted_events=deleted_events,
+            **cancelled,
+        )
     except IntegrityError as e:
         db.rollback()
         raise DatabaseException(str(e))
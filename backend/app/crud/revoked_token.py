@@ -0,0 +1,45 @@
+from datetime import datetime
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.clock import utcnow
+from app.core.retry import retryable
+from app.models.revoked_token import RevokedToken
+
+
+@retryable
+def revoke_token(*, db: Session, jti: str, expires_at: datetime):
+    """Record that the token with `jti` is revoked; revoking twice is a no-op."""
+    db_revoked = RevokedToken(jti=jti, expires_at=expires_at, revoked_at=utcnow())
+    try:
+        db.add(db_revoked)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+    return db_revoked
+
+
+def get_revoked_tokens(*, db: Session, since: datetime | None, now: datetime):
+    """
+    Return the jti and expiry of the unexpired tokens revoked after `since`,
+    or of all unexpired revoked tokens.
+    """
+    query = select(RevokedToken.jti, RevokedToken.expires_at).where(
+        RevokedToken.expires_at > now
+    )
+    if since is not None:
+        query = query.where(RevokedToken.revoked_at >= since)
+    return db.execute(query).all()
+
+
+@retryable
+def delete_expired_revocations(*, db: Session, now: datetime):
+    deleted = db.execute(
+        delete(RevokedToken)
+        .where(RevokedToken.expires_at <= now)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return deleted
@@ -1,38 +1,61 @@
+from sqlalchemy import update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from app.core.clock import utcnow
+from app.core.retry import retryable
 from app.crud.event import get_event
+from app.crud.inventory import adjust_tickets_sold, get_available_count
 from app.exceptions.db import DatabaseException
-from app.exceptions.ticket import MissingTicketException
+from app.exceptions.ticket import (
+    MissingTicketException,
+    PreallocatedSeatMoveException,
+)
+from app.models.booking import Booking
 from app.models.ticket import Ticket
 from app.schemas.ticket import TicketCreate, TicketUpdate
 
 
 def get_tickets(db: Session):
-    return db.query(Ticket).all()
+    return db.query(Ticket).filter(Ticket.cancelled_at.is_(None)).all()
 
 
 def get_ticket(*, db: Session, ticket_id: int):
-    db_ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
+    db_ticket = (
+        db.query(Ticket)
+        .filter(Ticket.id == ticket_id, Ticket.cancelled_at.is_(None))
+        .first()
+    )
     if not db_ticket:
         raise MissingTicketException()
     return db_ticket
 
 
 def get_tickets_by_event(*, db: Session, event_id: int):
-    return db.query(Ticket).filter(Ticket.event_id == event_id).all()
+    return (
+        db.query(Ticket)
+        .filter(Ticket.event_id == event_id, Ticket.cancelled_at.is_(None))
+        .all()
+    )
 
 
 def get_available_tickets_by_event(*, db: Session, event_id: int):
-    return db.query(Ticket).filter(Ticket.event_id == event_id).all()
+    return (
+        db.query(Ticket)
+        .filter(
+            Ticket.event_id == event_id,
+            Ticket.sold_at.is_(None),
+            Ticket.cancelled_at.is_(None),
+        )
+        .all()
+    )
 
 
 def get_available_ticket_count_by_event(*, db: Session, event_id: int):
-    event = get_event(db=db, event_id=event_id)
-    sold_count = db.query(Ticket).filter(Ticket.event_id == event_id).count()
-    return event.ticket_capacity - sold_count
+    return get_available_count(db=db, event_id=event_id)
 
 
+@retryable
 def create_ticket(*, db: Session, ticket: TicketCreate):
     _ = get_event(db=db, event_id=ticket.event_id)
 
@@ -44,6 +67,7 @@ def create_ticket(*, db: Session, ticket: TicketCreate):
 
     try:
         db.add(db_ticket)
+        adjust_tickets_sold(db=db, event_id=ticket.event_id, delta=1)
         db.commit()
         db.refresh(db_ticket)
         return db_ticket
@@ -52,14 +76,22 @@ def create_ticket(*, db: Session, ticket: TicketCreate):
         raise DatabaseException(str(e))
 
 
+@retryable
 def update_ticket(*, db: Session, ticket: TicketUpdate, ticket_id: int):
     db_ticket = get_ticket(db=db, ticket_id=ticket_id)
 
     try:
         update_data = ticket.model_dump(exclude_unset=True)
 
-        if "event_id" in update_data:
-            _ = get_event(db=db, event_id=update_data["event_id"])
+        if "event_id" in update_data and update_data["event_id"] != db_ticket.event_id:
+            db_event = get_event(db=db, event_id=update_data["event_id"])
+            # Seat rows follow the capacity, moving one would leave the source
+            # event short of a seat and put the target over its capacity
+            if db_ticket.event.seats_preallocated or db_event.seats_preallocated:
+                raise PreallocatedSeatMoveException()
+            if db_ticket.sold_at is not None:
+                adjust_tickets_sold(db=db, event_id=db_ticket.event_id, delta=-1)
+                adjust_tickets_sold(db=db, event_id=update_data["event_id"], delta=1)
 
         for key, value in update_data.items():
             setattr(db_ticket, key, value)
@@ -72,11 +104,31 @@ def update_ticket(*, db: Session, ticket: TicketUpdate, ticket_id: int):
         raise DatabaseException(str(e))
 
 
+@retryable
 def delete_ticket(*, db: Session, ticket_id: int):
+    """
+    Cancel a ticket together with its live booking, if any.
+
+    Pre-allocated seats go back to the pool of unsold seats instead, like in
+    `delete_booking`; the seat rows themselves follow the event's capacity.
+    """
     db_ticket = get_ticket(db=db, ticket_id=ticket_id)
 
     try:
-        db.delete(db_ticket)
+        cancelled_at = utcnow()
+        sold = db_ticket.sold_at is not None
+        if db_ticket.event.seats_preallocated:
+            db_ticket.sold_at = None
+        else:
+            db_ticket.cancelled_at = cancelled_at
+        db.execute(
+            update(Booking)
+            .where(Booking.ticket_id == ticket_id, Booking.cancelled_at.is_(None))
+            .values(cancelled_at=cancelled_at)
+            .execution_options(synchronize_session=False)
+        )
+        if sold:
+            adjust_tickets_sold(db=db, event_id=db_ticket.event_id, delta=-1)
         db.commit()
         return db_ticket
     except IntegrityError as e:
@@ -1,13 +1,22 @@
+from sqlalchemy import insert, select, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.core.security import get_password_hash, verify_password
+from app.core.hashing import password_hasher
+from app.core.retry import retryable
+from app.core.user_cache import user_cache
 from app.exceptions.db import DatabaseException
 from app.exceptions.user import DuplicateEmailException, MissingUserException
 from app.models.user import User
-from app.schemas.user import UserCreate, UserUpdate
+from app.schemas.user import (
+    UserCreate,
+    UserImportError,
+    UserImportResult,
+    UserUpdate,
+)
 
 
+@retryable
 def create_user(*, db: Session, user: UserCreate):
     if get_user_by_email(db=db, email=user.email):
         raise DuplicateEmailException(email=user.email)
@@ -15,13 +24,14 @@ def create_user(*, db: Session, user: UserCreate):
     db_user = User(
         username=user.username,
         email=user.email,
-        hashed_password=get_password_hash(user.password),
+        hashed_password=password_hasher.hash(user.password),
         role=user.role.value,
     )
     try:
         db.add(db_user)
         db.commit()
         db.refresh(db_user)
+        user_cache.forget(db_user.id, email=db_user.email)
         return db_user
     except IntegrityError as e:
         db.rollback()
@@ -40,18 +50,56 @@ def get_users(db: Session):
 
 
 def authenticate_user(*, db: Session, email: str, password: str):
-    db_user = db.query(User).filter(User.email == email).first()
+    """
+    Return a cached snapshot of the user if the password matches.
+
+    A hash made with another scheme or cost than the current policy's is
+    replaced with a new one on the way.
+    """
+    db_user = user_cache.get_by_email(db=db, email=email)
     if not db_user:
         return None
-    if not verify_password(password, str(db_user.hashed_password)):
+    verified, new_hash = password_hasher.verify_and_update(
+        password, str(db_user.hashed_password)
+    )
+    if not verified:
         return None
+    if new_hash is not None:
+        rehash_password(
+            db=db,
+            user_id=db_user.id,
+            old_hash=db_user.hashed_password,
+            new_hash=new_hash,
+        )
     return db_user
 
 
+@retryable
+def rehash_password(*, db: Session, user_id: int, old_hash: str, new_hash: str):
+    """
+    Replace an outdated hash of the same password.
+
+    Leaves tokens and `updated_at` alone, and skips users whose password
+    was changed meanwhile.
+    """
+    db.execute(
+        update(User)
+        .where(User.id == user_id, User.hashed_password == old_hash)
+        .values(hashed_password=new_hash, updated_at=User.updated_at)
+    )
+    db.commit()
+    user_cache.forget(user_id)
+
+
+def get_token_version(*, db: Session, user_id: int):
+    return db.scalar(select(User.token_version).where(User.id == user_id))
+
+
 def get_user_by_email(*, db: Session, email):
     return db.query(User).filter(User.email == email).first()
 
 
+@retryable
 def update_user(*, db: Session, user: UserUpdate, user_id: int):
     db_user = get_user(db=db, user_id=user_id)
 
@@ -61,23 +109,112 @@ def update_user(*, db: Session, user: UserUpdate, user_id: int):
     if get_user_by_email(db=db, email=user.email) and db_user.email != user.email:
         raise DuplicateEmailException(email=str(user.email))
 
+    old_email = db_user.email
     try:
         update_data = user.model_dump(exclude_unset=True)
         if "password" in update_data:
-            hashed_password = get_password_hash(update_data["password"])
+            hashed_password = password_hasher.hash(update_data["password"])
             update_data["hashed_password"] = hashed_password
             del update_data["password"]
 
         if "role" in update_data:
             update_data["role"] = update_data["role"].value
 
+        if "hashed_password" in update_data or "role" in update_data:
+            update_data["token_version"] = User.token_version + 1
+
         for key, value in update_data.items():
             setattr(db_user, key, value)
 
         db.add(db_user)
         db.commit()
         db.refresh(db_user)
+        user_cache.forget(user_id, email=old_email)
         return db_user
     except IntegrityError as e:
         db.rollback()
         raise DatabaseException(str(e))
+
+
+def get_existing_emails(*, db: Session, emails: list[str], chunk_size: int = 10_000):
+    """Return which of the emails are taken, with one query per chunk."""
+    existing = set()
+    for start in range(0, len(emails), chunk_size):
+        chunk = emails[start : start + chunk_size]
+        existing.update(db.scalars(select(User.email).where(User.email.in_(chunk))))
+    return existing
+
+
+@retryable
+def insert_users(*, db: Session, users: list[dict]):
+    """Insert users with hashed passwords in one multi-row INSERT."""
+    try:
+        db.execute(insert(User), users)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise
+
+
+def import_users(
+    *, db: Session, users: list[tuple[int, UserCreate]], chunk_size: int
+) -> UserImportResult:
+    """
+    Create many users at once, reporting the ones that can't be created.
+
+    Emails taken already, or earlier in the import, are found with set-based
+    queries up front. Passwords are hashed on all password hashing workers,
+    and users inserted `chunk_size` at a time. If a chunk hits an email
+    taken meanwhile, its users are inserted one by one instead.
+
+    Args:
+        users: The users to create, with their line in the imported file.
+
+    Returns:
+        UserImportResult: The number of users created and the rows skipped.
+    """
+    errors = []
+    existing = get_existing_emails(db=db, emails=[user.email for _, user in users])
+    accepted = []
+    for line, user in users:
+        if user.email in existing:
+            error = str(DuplicateEmailException(email=user.email))
+            errors.append(UserImportError(line=line, email=user.email, error=error))
+            continue
+        existing.add(user.email)
+        accepted.append((line, user))
+
+    hashes = password_hasher.hash_many([user.password for _, user in accepted])
+    rows = [
+        (
+            line,
+            {
+                "username": user.username,
+                "email": user.email,
+                "hashed_password": hashed_password,
+                "role": user.role.value,
+            },
+        )
+        for (line, user), hashed_password in zip(accepted, hashes)
+    ]
+
+    created = 0
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start : start + chunk_size]
+        try:
+            insert_users(db=db, users=[row for _, row in chunk])
+            created += len(chunk)
+            continue
+        except IntegrityError:
+            pass
+        for line, row in chunk:
+            try:
+                insert_users(db=db, users=[row])
+                created += 1
+            except IntegrityError as e:
+                errors.append(
+                    UserImportError(line=line, email=row["email"], error=str(e.orig))
+                )
+
+    errors.sort(key=lambda error: error.line)
+    return UserImportResult(created=created, errors=errors)
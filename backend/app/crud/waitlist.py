@@ -0,0 +1,165 @@
+from sqlalchemy import delete, exists, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.retry import retryable
+from app.crud.booking import insert_bookings
+from app.crud.inventory import (
+    adjust_tickets_sold,
+    claim_available_tickets,
+    get_available_count,
+)
+from app.exceptions.db import DatabaseException
+from app.exceptions.event import MissingEventException
+from app.exceptions.ticket import NoTicketsAvailableException
+from app.exceptions.waitlist import (
+    AlreadyWaitlistedException,
+    MissingWaitlistEntryException,
+    TicketsStillAvailableException,
+)
+from app.models.booking import Booking
+from app.models.event import Event
+from app.models.waitlist import WaitlistEntry
+
+
+def get_waitlist_entry(*, db: Session, event_id: int, user_id: int):
+    db_entry = (
+        db.query(WaitlistEntry)
+        .filter(WaitlistEntry.event_id == event_id, WaitlistEntry.user_id == user_id)
+        .first()
+    )
+    if not db_entry:
+        raise MissingWaitlistEntryException()
+    return db_entry
+
+
+def get_waitlist_position(*, db: Session, event_id: int, user_id: int):
+    """
+    Return how many users are ahead of a user on an event's waitlist.
+
+    Counts the entries with a lower join sequence number, a range scan of the
+    (event_id, seq) index, so users who already left are not included.
+
+    Raises:
+        MissingWaitlistEntryException: If the user is not on the waitlist.
+    """
+    db_entry = get_waitlist_entry(db=db, event_id=event_id, user_id=user_id)
+    return db.scalar(
+        select(func.count()).where(
+            WaitlistEntry.event_id == event_id, WaitlistEntry.seq < db_entry.seq
+        )
+    )
+
+
+def has_waitlist(*, db: Session, event_id: int) -> bool:
+    return db.scalar(select(exists().where(WaitlistEntry.event_id == event_id)))
+
+
+@retryable
+def join_waitlist(*, db: Session, event_id: int, user_id: int):
+    """
+    Put a user at the end of a sold-out event's waitlist.
+
+    Raises:
+        MissingEventException: If the event does not exist or was deleted.
+        TicketsStillAvailableException: If the event is not sold out.
+        AlreadyWaitlistedException: If the user is already waiting.
+    """
+    if get_available_count(db=db, event_id=event_id) > 0:
+        raise TicketsStillAvailableException()
+
+    seq = db.scalar(
+        update(Event)
+        .where(Event.id == event_id, Event.deleted_at.is_(None))
+        .values(waitlist_seq=Event.waitlist_seq + 1, updated_at=Event.updated_at)
+        .returning(Event.waitlist_seq)
+    )
+    if seq is None:
+        db.rollback()
+        raise MissingEventException()
+
+    db_entry = WaitlistEntry(event_id=event_id, user_id=user_id, seq=seq)
+    try:
+        db.add(db_entry)
+        db.commit()
+        db.refresh(db_entry)
+        return db_entry
+    except IntegrityError:
+        db.rollback()
+        raise AlreadyWaitlistedException()
+
+
+@retryable
+def leave_waitlist(*, db: Session, event_id: int, user_id: int):
+    db_entry = db.execute(
+        delete(WaitlistEntry)
+        .where(WaitlistEntry.event_id == event_id, WaitlistEntry.user_id == user_id)
+        .returning(*WaitlistEntry.__table__.c)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if not db_entry:
+        db.rollback()
+        raise MissingWaitlistEntryException()
+    db.commit()
+    return db_entry
+
+
+@retryable
+def promote_waitlist(*, db: Session, event_id: int, limit: int):
+    """
+    Book tickets for up to `limit` users from the head of an event's waitlist.
+
+    The free inventory is claimed first, then as many entries are taken off
+    the head of the line with one `FOR UPDATE SKIP LOCKED` query, booked
+    with multi-row inserts and removed with one DELETE, in one transaction.
+
+    Returns:
+        list[Booking]: The bookings of the promoted users, in waitlist order.
+
+    Raises:
+        MissingEventException: If the event does not exist or was deleted.
+    """
+    db_event, claimed = claim_available_tickets(
+        db=db, event_id=event_id, quantity=limit
+    )
+    if not claimed:
+        db.rollback()
+        return []
+
+    entries = db.execute(
+        select(WaitlistEntry.id, WaitlistEntry.user_id)
+        .where(WaitlistEntry.event_id == event_id)
+        .order_by(WaitlistEntry.seq)
+        .limit(claimed)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not entries:
+        db.rollback()
+        return []
+    if len(entries) < claimed:
+        adjust_tickets_sold(db=db, event_id=event_id, delta=len(entries) - claimed)
+
+    try:
+        db_bookings = insert_bookings(
+            db=db, db_event=db_event, user_ids=[entry.user_id for entry in entries]
+        )
+        booking_numbers = [db_booking.booking_number for db_booking in db_bookings]
+        db.execute(
+            delete(WaitlistEntry)
+            .where(WaitlistEntry.id.in_([entry.id for entry in entries]))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+    except NoTicketsAvailableException:
+        db.rollback()
+        raise
+    except IntegrityError as e:
+        db.rollback()
+        raise DatabaseException(str(e))
+
+    return (
+        db.query(Booking)
+        .filter(Booking.booking_number.in_(booking_numbers))
+        .order_by(Booking.booking_number)
+        .all()
+    )
@@ -0,0 +1,3 @@
+class MissingApiKeyException(Exception):
+    def __init__(self):
+        super().__init__("API key not found in the db.")
@@ -1,3 +1,12 @@
+from app.exceptions.ticket import NoTicketsAvailableException
+
+
 class MissingBookingException(Exception):
     def __init__(self):
         super().__init__("Booking not found in the db.")
+
+
+class CartItemSoldOutException(NoTicketsAvailableException):
+    def __init__(self, event_id: int):
+        self.event_id = event_id
+        super().__init__(f"No tickets available for event {event_id}")
@@ -1,3 +1,16 @@
 class DatabaseException(Exception):
     def __init__(self, error: str):
         super().__init__(f"Database error occurred: {error}")
+
+
+class TransientDatabaseException(Exception):
+    def __init__(self, error: str):
+        super().__init__(f"Database is busy, please retry: {error}")
+
+
+class UncommittedChangesException(Exception):
+    def __init__(self, operation: str):
+        super().__init__(
+            f"{operation} needs a session without uncommitted changes; "
+            "commit or roll them back first"
+        )
@@ -1,3 +1,6 @@
+from datetime import datetime
+
+
 class MissingEventException(Exception):
     def __init__(self):
         super().__init__("Event not found in the db.")
@@ -6,3 +9,9 @@ class MissingEventException(Exception):
 class WrongRoleException(Exception):
     def __init__(self, user: str):
         super().__init__(f"User '{user}' is not an ORGANIZER.")
+
+
+class NotOnSaleYetException(Exception):
+    def __init__(self, on_sale_at: datetime):
+        self.on_sale_at = on_sale_at
+        super().__init__(f"Tickets for this event go on sale at {on_sale_at}.")
@@ -0,0 +1,8 @@
+class MissingSeatHoldException(Exception):
+    def __init__(self):
+        super().__init__("Seat hold not found in the db.")
+
+
+class ExpiredSeatHoldException(Exception):
+    def __init__(self):
+        super().__init__("Seat hold has expired")
@@ -0,0 +1,8 @@
+class IdempotencyKeyReuseException(Exception):
+    def __init__(self):
+        super().__init__("Idempotency-Key was already used for a different request")
+
+
+class IdempotencyKeyInProgressException(Exception):
+    def __init__(self):
+        super().__init__("A request with this Idempotency-Key is still in progress")
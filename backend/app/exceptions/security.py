@@ -0,0 +1,9 @@
+class PasswordHashingOverloadedException(Exception):
+    def __init__(self):
+        super().__init__("Too many passwords are being checked at once, please retry.")
+
+
+class LoginThrottledException(Exception):
+    def __init__(self, retry_after: int):
+        self.retry_after = retry_after
+        super().__init__("Too many login attempts, please retry later.")
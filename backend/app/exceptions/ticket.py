@@ -1,3 +1,13 @@
 class MissingTicketException(Exception):
     def __init__(self):
         super().__init__("Ticket not found in the db.")
+
+
+class NoTicketsAvailableException(Exception):
+    def __init__(self, message: str = "No tickets available"):
+        super().__init__(message)
+
+
+class PreallocatedSeatMoveException(Exception):
+    def __init__(self):
+        super().__init__("Pre-allocated seats cannot be moved to another event.")
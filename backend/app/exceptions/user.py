@@ -10,3 +10,11 @@ class MissingUserException(Exception):
         else:
             msg = f"User with name '{user}' not found in the db."
         super().__init__(msg)
+
+
+class TooManyUsersToImportException(Exception):
+    def __init__(self, max_rows: int):
+        super().__init__(
+            f"At most {max_rows} users can be imported at once; "
+            "use `python -m app.import_users` for larger files."
+        )
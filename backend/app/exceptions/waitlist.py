@@ -0,0 +1,13 @@
+class MissingWaitlistEntryException(Exception):
+    def __init__(self):
+        super().__init__("Not on the waitlist for this event.")
+
+
+class AlreadyWaitlistedException(Exception):
+    def __init__(self):
+        super().__init__("Already on the waitlist for this event.")
+
+
+class TicketsStillAvailableException(Exception):
+    def __init__(self):
+        super().__init__("Tickets are still available, book one instead.")
@@ -0,0 +1,59 @@
+import argparse
+import logging
+from pathlib import Path
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.hashing import password_hasher
+from app.core.user_import import guess_format, parse_users
+from app.crud.user import import_users
+from app.database.session import engine
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    """
+    Create the users in a CSV or NDJSON file, e.g. a whole organization.
+
+    Records have the fields username, email, password and, optionally, role.
+    Passwords are hashed on `--workers` processes. Rows that can't be
+    imported are logged and skipped.
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--format", choices=["csv", "ndjson"])
+    parser.add_argument(
+        "--workers", type=int, default=settings.PASSWORD_HASH_WORKERS
+    )
+    args = parser.parse_args()
+
+    with args.path.open(encoding="utf-8-sig", newline="") as lines:
+        users, errors = parse_users(
+            lines, args.format or guess_format(args.path.name)
+        )
+    logger.info("Importing %d user(s) from %s", len(users), args.path)
+
+    password_hasher.workers = args.workers
+    password_hasher.start()
+    try:
+        with Session(engine) as session:
+            result = import_users(
+                db=session, users=users, chunk_size=settings.USER_IMPORT_CHUNK_SIZE
+            )
+    finally:
+        password_hasher.stop()
+
+    for error in sorted(errors + result.errors, key=lambda error: error.line):
+        logger.warning("Line %d (%s): %s", error.line, error.email or "-", error.error)
+    logger.info(
+        "Created %d user(s), skipped %d",
+        result.created,
+        len(errors) + len(result.errors),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,50 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from fastapi.routing import APIRoute
 
 from app.api.main import api_router
+from app.core.api_keys import api_keys
 from app.core.config import settings
+from app.core.denylist import token_denylist
+from app.core.hashing import password_hasher
+from app.core.hold_sweeper import hold_sweeper
+from app.core.on_sale import on_sale
+from app.exceptions.db import TransientDatabaseException
+from app.exceptions.security import PasswordHashingOverloadedException
 
 
 def cstm_generate_unique_id(route: APIRoute) -> str:
     return f"{route.tags[0]}-{route.name}"
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    password_hasher.start()
+    # Revocations must be known before the first request is served
+    token_denylist.tick()
+    if settings.TOKEN_DENYLIST_SYNC_INTERVAL_SECONDS > 0:
+        token_denylist.start()
+    api_keys.tick()
+    if settings.API_KEY_REFRESH_INTERVAL_SECONDS > 0:
+        api_keys.start()
+    if settings.SEAT_HOLD_SWEEP_INTERVAL_SECONDS > 0:
+        hold_sweeper.start()
+    if settings.ON_SALE_POLL_INTERVAL_SECONDS > 0:
+        on_sale.start()
+    yield
+    api_keys.stop()
+    token_denylist.stop()
+    on_sale.stop()
+    hold_sweeper.stop()
+    password_hasher.stop()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
+    lifespan=lifespan,
     openapi_prefix=f"{settings.API_V1_STR}",
     # openapi_url=f"{settings.API_V1_STR}/openapi.json",
     generate_unique_id_function=cstm_generate_unique_id,
@@ -30,6 +63,28 @@ app.add_middleware(
 app.include_router(api_router)
 
 
+@app.exception_handler(TransientDatabaseException)
+async def transient_database_error(_: Request, e: TransientDatabaseException):
+    # Retries inside the crud layer ran out; the client may try again shortly
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": str(e)},
+        headers={"Retry-After": "1"},
+    )
+
+
+@app.exception_handler(PasswordHashingOverloadedException)
+async def password_hashing_overloaded(
+    _: Request, e: PasswordHashingOverloadedException
+):
+    # Refused instead of queued, so a login storm can't tie up request threads
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": str(e)},
+        headers={"Retry-After": "1"},
+    )
+
+
 # models must be imported and registered from app.models to create the tables
 
 # Create tables
@@ -1,6 +1,14 @@
+from .api_key import ApiKey as ApiKey
+from .archive import BookingArchive as BookingArchive
+from .archive import TicketArchive as TicketArchive
 from .booking import Booking as Booking
 from .enums import UserRole as UserRole
 from .event import Event as Event
+from .hold import SeatHold as SeatHold
+from .idempotency import IdempotencyKey as IdempotencyKey
+from .inventory import EventInventoryShard as EventInventoryShard
 from .location import Location as Location
+from .revoked_token import RevokedToken as RevokedToken
 from .ticket import Ticket as Ticket
 from .user import User as User
+from .waitlist import WaitlistEntry as WaitlistEntry
@@ -0,0 +1,19 @@
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Integer, String, func
+
+from app.database.session import Base
+
+
+class ApiKey(Base):
+    __tablename__ = "api_keys"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # Public part of the key, to list and revoke it by
+    key_id = Column(String(16), unique=True, nullable=False)
+    # HMAC-SHA256 of the whole key under SECRET_KEY
+    key_hash = Column(String(64), unique=True, nullable=False)
+    name = Column(String(50), nullable=False)
+    # The service account the key acts as
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    scopes = Column(JSON, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=func.now())
+    revoked_at = Column(DateTime, nullable=True)
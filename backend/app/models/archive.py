@@ -0,0 +1,29 @@
+from sqlalchemy import Column, DateTime, Integer, String, func
+
+from app.database.session import Base
+
+
+# Cancelled bookings and tickets moved out of the hot tables by compaction
+class BookingArchive(Base):
+    __tablename__ = "bookings_archive"
+
+    booking_number = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    ticket_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime)
+    cancelled_at = Column(DateTime, nullable=False)
+    archived_at = Column(DateTime, nullable=False, default=func.now())
+
+
+class TicketArchive(Base):
+    __tablename__ = "tickets_archive"
+
+    id = Column(Integer, primary_key=True)
+    event_id = Column(Integer, nullable=False, index=True)
+    seat_num = Column(String(10), nullable=False)
+    price = Column(Integer, nullable=False)
+    sold_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    cancelled_at = Column(DateTime, nullable=False)
+    archived_at = Column(DateTime, nullable=False, default=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, func
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, func
 from sqlalchemy.orm import relationship
 
 from app.database.session import Base
@@ -9,10 +9,29 @@ class Booking(Base):
 
     booking_number = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    ticket_id = Column(Integer, ForeignKey("tickets.id"), nullable=False, unique=True)
+    ticket_id = Column(Integer, ForeignKey("tickets.id"), nullable=False)
     created_at = Column(DateTime, nullable=False, default=func.now())
     updated_at = Column(DateTime, onupdate=func.now())
     cancelled_at = Column(DateTime, nullable=True)
 
+    # Partial indexes over live rows only: cancelled bookings stay in the
+    # table until compaction but are never read by the hot queries, and a
+    # ticket can be booked again once its previous booking was cancelled.
+    __table_args__ = (
+        Index(
+            "uq_bookings_ticket_id_live",
+            ticket_id,
+            unique=True,
+            postgresql_where=cancelled_at.is_(None),
+            sqlite_where=cancelled_at.is_(None),
+        ),
+        Index(
+            "ix_bookings_user_id_live",
+            user_id,
+            postgresql_where=cancelled_at.is_(None),
+            sqlite_where=cancelled_at.is_(None),
+        ),
+    )
+
     user = relationship("User", back_populates="bookings")
     ticket = relationship("Ticket", back_populates="booking")
@@ -5,3 +5,8 @@ class UserRole(str, Enum):
     ADMIN = "admin"
     ORGANIZER = "organizer"
     VISITOR = "visitor"
+
+
+class ApiKeyScope(str, Enum):
+    BOOKINGS_READ = "bookings:read"
+    BOOKINGS_WRITE = "bookings:write"
@@ -1,4 +1,5 @@
 from sqlalchemy import (
+    Boolean,
     Column,
     Date,
     DateTime,
@@ -7,6 +8,7 @@ from sqlalchemy import (
     String,
     Text,
     Time,
+    false,
     func,
 )
 from sqlalchemy.orm import relationship
@@ -25,6 +27,18 @@ class Event(Base):
     location_id = Column(Integer, ForeignKey("locations.id"), nullable=False)
     organizer_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     ticket_capacity = Column(Integer, nullable=False)
+    ticket_price = Column(Integer, nullable=False, default=25, server_default="25")
+    seats_preallocated = Column(
+        Boolean, nullable=False, default=False, server_default=false()
+    )
+    # Authoritative only while inventory_shards is 1, otherwise the sum of
+    # event_inventory_shards.sold is, and this is refreshed on rebalance.
+    tickets_sold = Column(Integer, nullable=False, default=0, server_default="0")
+    inventory_shards = Column(Integer, nullable=False, default=1, server_default="1")
+    # Last sequence number handed out to a waitlist entry of this event
+    waitlist_seq = Column(Integer, nullable=False, default=0, server_default="0")
+    # Bookings are refused before this time; NULL means on sale right away
+    on_sale_at = Column(DateTime, nullable=True, index=True)
     created_at = Column(DateTime, nullable=False, default=func.now())
     updated_at = Column(DateTime, onupdate=func.now())
     deleted_at = Column(DateTime, nullable=True)
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, func
+
+from app.database.session import Base
+
+
+class SeatHold(Base):
+    __tablename__ = "seat_holds"
+
+    id = Column(Integer, primary_key=True, index=True)
+    event_id = Column(Integer, ForeignKey("events.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    created_at = Column(DateTime, nullable=False, default=func.now())
@@ -0,0 +1,14 @@
+from sqlalchemy import JSON, Column, DateTime, String
+
+from app.database.session import Base
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    # sha256 of the caller, the route and the client's Idempotency-Key header
+    key = Column(String(64), primary_key=True)
+    request_hash = Column(String(64), nullable=False)
+    # NULL while the first request with this key is still running
+    response = Column(JSON(none_as_null=True), nullable=True)
+    created_at = Column(DateTime, nullable=False, index=True)
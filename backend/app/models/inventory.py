@@ -0,0 +1,12 @@
+from sqlalchemy import Column, ForeignKey, Integer
+
+from app.database.session import Base
+
+
+class EventInventoryShard(Base):
+    __tablename__ = "event_inventory_shards"
+
+    event_id = Column(Integer, ForeignKey("events.id"), primary_key=True)
+    shard = Column(Integer, primary_key=True)
+    capacity = Column(Integer, nullable=False)
+    sold = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, DateTime, String
+
+from app.database.session import Base
+
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    # The token's jti claim
+    jti = Column(String(32), primary_key=True)
+    # The token's exp; the row is useless, and deleted, after it
+    expires_at = Column(DateTime, nullable=False, index=True)
+    revoked_at = Column(DateTime, nullable=False, index=True)
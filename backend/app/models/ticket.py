@@ -2,6 +2,7 @@ from sqlalchemy import (
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     func,
@@ -18,9 +19,19 @@ class Ticket(Base):
     event_id = Column(Integer, ForeignKey("events.id"), nullable=False)
     seat_num = Column(String(10), nullable=False)
     price = Column(Integer, nullable=False)
-    sold_at = Column(DateTime, nullable=False, default=func.now())
+    # NULL for pre-allocated seats that have not been sold yet
+    sold_at = Column(DateTime, nullable=True, default=func.now())
     updated_at = Column(DateTime, onupdate=func.now())
     cancelled_at = Column(DateTime, nullable=True)
 
+    __table_args__ = (
+        Index(
+            "ix_tickets_event_id_live",
+            event_id,
+            postgresql_where=cancelled_at.is_(None),
+            sqlite_where=cancelled_at.is_(None),
+        ),
+    )
+
     event = relationship("Event", back_populates="tickets")
     booking = relationship("Booking", back_populates="ticket")
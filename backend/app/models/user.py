@@ -16,6 +16,8 @@ class User(Base):
     email: Mapped[EmailStr] = mapped_column(String(50), unique=True, index=True, nullable=False)
     hashed_password: Mapped[str] = mapped_column(String, nullable=False)
     role : Mapped[UserRole] = mapped_column(Enum(UserRole), nullable=False)
+    # Bumped on role and password changes; tokens with an older one are refused
+    token_version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
     created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=func.now())
     updated_at: Mapped[datetime | None] = mapped_column(DateTime, onupdate=func.now())
 
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, func
+
+from app.database.session import Base
+
+
+class WaitlistEntry(Base):
+    __tablename__ = "waitlist_entries"
+
+    id = Column(Integer, primary_key=True, index=True)
+    event_id = Column(Integer, ForeignKey("events.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # Per-event join order, taken from events.waitlist_seq
+    seq = Column(Integer, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=func.now())
+
+    __table_args__ = (
+        Index("uq_waitlist_entries_event_seq", event_id, seq, unique=True),
+        Index("uq_waitlist_entries_event_user", event_id, user_id, unique=True),
+    )
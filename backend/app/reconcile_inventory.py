@@ -0,0 +1,25 @@
+import logging
+
+from sqlalchemy.orm import Session
+
+from app.crud.inventory import reconcile_tickets_sold
+from app.database.session import engine
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    """
+    Rebuild every event's sold ticket counter from the tickets table.
+
+    Run after restoring data or editing tickets directly in the database.
+    """
+    logger.info("Reconciling ticket inventory")
+    with Session(engine) as session:
+        corrected = reconcile_tickets_sold(db=session)
+    logger.info("Corrected %d event counter(s)", corrected)
+
+
+if __name__ == "__main__":
+    main()
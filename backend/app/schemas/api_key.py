@@ -0,0 +1,28 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+from app.models.enums import ApiKeyScope
+
+
+class ApiKeyCreate(BaseModel):
+    name: str = Field(..., min_length=1, max_length=50)
+    user_id: int
+    scopes: list[ApiKeyScope] = Field(..., min_length=1)
+
+
+class ApiKey(BaseModel):
+    key_id: str
+    name: str
+    user_id: int
+    scopes: list[ApiKeyScope]
+    created_at: datetime
+    revoked_at: datetime | None = None
+
+    class Config:
+        from_attributes = True
+
+
+class ApiKeyCreated(ApiKey):
+    # Shown once; only its hash is stored
+    key: str
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class BookingBase(BaseModel):
@@ -12,6 +12,19 @@ class BookingCreate(BookingBase):
     pass
 
 
+class BookingBatchCreate(BaseModel):
+    quantity: int = Field(..., ge=1, le=100)
+
+
+class CartItem(BaseModel):
+    event_id: int
+    quantity: int = Field(1, ge=1, le=100)
+
+
+class CartCheckout(BaseModel):
+    items: list[CartItem] = Field(..., min_length=1, max_length=20)
+
+
 class BookingUpdate(BaseModel):
     user_id: int | None = None
     ticket_id: int | None = None
@@ -37,3 +50,11 @@ class BookingDeleted(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class BookingQueueStatus(BaseModel):
+    token: str
+    event_id: int
+    position: int
+    ready: bool
+    sold_out: bool
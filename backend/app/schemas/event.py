@@ -1,6 +1,13 @@
-from datetime import date, datetime, time
+from datetime import date, datetime, time, timezone
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+
+
+def _to_utc(value: datetime | None) -> datetime | None:
+    # Naive times are taken as UTC, like every other timestamp in the db
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
 
 
 class EventBase(BaseModel):
@@ -11,6 +18,9 @@ class EventBase(BaseModel):
     location_id: int
     organizer_id: int
     ticket_capacity: int = Field(..., ge=1)
+    ticket_price: int = Field(25, ge=0)
+    inventory_shards: int = Field(1, ge=1, le=64)
+    on_sale_at: datetime | None = None
 
 
 class EventCreate(BaseModel):
@@ -21,6 +31,12 @@ class EventCreate(BaseModel):
     location_id: int
     organizer_id: int
     ticket_capacity: int
+    ticket_price: int = Field(25, ge=0)
+    inventory_shards: int = Field(1, ge=1, le=64)
+    preallocate_seats: bool = False
+    on_sale_at: datetime | None = None
+
+    _on_sale_at_utc = field_validator("on_sale_at")(_to_utc)
 
 
 class EventUpdate(BaseModel):
@@ -31,10 +47,17 @@ class EventUpdate(BaseModel):
     location_id: int | None = None
     organizer_id: int | None = None
     ticket_capacity: int | None = None
+    ticket_price: int | None = Field(None, ge=0)
+    inventory_shards: int | None = Field(None, ge=1, le=64)
+    on_sale_at: datetime | None = None
+
+    _on_sale_at_utc = field_validator("on_sale_at")(_to_utc)
 
 
 class EventInDBBase(EventBase):
     id: int
+    tickets_sold: int = 0
+    seats_preallocated: bool = False
     created_at: datetime
     updated_at: datetime | None = None
     deleted_at: datetime | None = None
@@ -45,3 +68,9 @@ class EventInDBBase(EventBase):
 
 class Event(EventInDBBase):
     pass
+
+
+class EventDeleted(Event):
+    cancelled_bookings: int = 0
+    cancelled_tickets: int = 0
+    released_holds: int = 0
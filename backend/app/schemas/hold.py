@@ -0,0 +1,19 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class SeatHoldCreate(BaseModel):
+    quantity: int = Field(1, ge=1, le=100)
+
+
+class SeatHold(BaseModel):
+    id: int
+    event_id: int
+    user_id: int
+    quantity: int
+    expires_at: datetime
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
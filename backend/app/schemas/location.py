@@ -29,3 +29,10 @@ class LocationInDBBase(LocationBase):
 
 class Location(LocationInDBBase):
     pass
+
+
+class LocationDeleted(Location):
+    deleted_events: int = 0
+    cancelled_bookings: int = 0
+    cancelled_tickets: int = 0
+    released_holds: int = 0
@@ -21,7 +21,7 @@ class TicketUpdate(BaseModel):
 
 class TicketInDBBase(TicketBase):
     id: int
-    sold_at: datetime
+    sold_at: datetime | None = None
     updated_at: datetime | None = None
 
     class Config:
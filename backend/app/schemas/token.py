@@ -9,3 +9,17 @@ class Token(BaseModel):
 class TokenData(BaseModel):
     username: str | None = None
     role: str | None = None
+    user_id: int | None = None
+    version: int | None = None
+    jti: str | None = None
+    exp: int | None = None
+    # Set for API keys only
+    scopes: list[str] | None = None
+
+
+class Principal(BaseModel):
+    """The authenticated caller, built from verified token claims alone."""
+
+    id: int
+    email: str
+    role: str
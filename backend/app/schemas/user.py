@@ -37,3 +37,16 @@ class User(UserInDBBase):
 
 class UserInDB(UserInDBBase):
     hashed_password: str
+    token_version: int = 0
+
+
+class UserImportError(BaseModel):
+    # Line of the row in the imported file
+    line: int
+    email: str | None = None
+    error: str
+
+
+class UserImportResult(BaseModel):
+    created: int
+    errors: list[UserImportError]
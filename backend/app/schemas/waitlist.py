@@ -0,0 +1,20 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class WaitlistEntry(BaseModel):
+    id: int
+    event_id: int
+    user_id: int
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class WaitlistPosition(BaseModel):
+    event_id: int
+    user_id: int
+    # Number of users ahead in the line
+    position: int
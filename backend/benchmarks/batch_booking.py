@@ -0,0 +1,51 @@
+"""
+Wall time of booking N tickets: one `book_tickets` batch vs N `book_ticket` calls.
+
+    python -m benchmarks.batch_booking --sizes 1 5 10 25 50 100
+"""
+
+import time
+
+from sqlalchemy.orm import Session
+
+from app.crud.booking import book_ticket, book_tickets
+from benchmarks.common import make_engine, make_parser, seed_events, seed_users
+
+
+def main() -> None:
+    parser = make_parser(__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 5, 10, 25, 50, 100])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = make_engine(args.database_url)
+    capacity = max(args.sizes) * args.repeat
+    with Session(engine) as session:
+        user_id = seed_users(session, 1)[0]
+        event_ids = seed_events(session, 2 * len(args.sizes), capacity)
+
+    print(f"{'size':>5} {'loop ms':>10} {'batch ms':>10} {'speedup':>8}")
+    for index, size in enumerate(args.sizes):
+        loop_event, batch_event = event_ids[2 * index : 2 * index + 2]
+        with Session(engine) as session:
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                for _ in range(size):
+                    book_ticket(db=session, event_id=loop_event, user_id=user_id)
+            loop = (time.perf_counter() - started) / args.repeat
+
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                book_tickets(
+                    db=session, event_id=batch_event, user_id=user_id, quantity=size
+                )
+            batch = (time.perf_counter() - started) / args.repeat
+
+        print(
+            f"{size:>5} {loop * 1000:>10.2f} {batch * 1000:>10.2f} "
+            f"{loop / batch:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
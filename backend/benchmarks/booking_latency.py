@@ -0,0 +1,82 @@
+"""
+Latency of a single booking: the original multi-commit route vs `book_ticket`.
+
+    python -m benchmarks.booking_latency --bookings 500
+    python -m benchmarks.booking_latency --database-url postgresql+psycopg://...
+"""
+
+import time
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.crud import booking as crud_booking
+from app.crud import event as crud_event
+from app.crud import ticket as crud_ticket
+from app.schemas.booking import BookingCreate
+from app.schemas.ticket import TicketCreate, TicketUpdate
+from benchmarks.common import make_engine, make_parser, report, seed_events, seed_users
+
+
+def legacy_book(db: Session, event_id: int, user_id: int):
+    """
+    The booking sequence `book_event` ran before `book_ticket` existed.
+    """
+    available = crud_ticket.get_available_ticket_count_by_event(
+        db=db, event_id=event_id
+    )
+    if available <= 0:
+        raise RuntimeError("No tickets available")
+
+    db_event = crud_event.get_event(db=db, event_id=event_id)
+    ticket = crud_ticket.create_ticket(
+        db=db, ticket=TicketCreate(event_id=event_id, seat_num="temp", price=25)
+    )
+    ticket = crud_ticket.update_ticket(
+        db=db,
+        ticket_id=ticket.id,
+        ticket=TicketUpdate(seat_num=f"{db_event.title}-{ticket.id}"),
+    )
+    return crud_booking.create_booking(
+        db=db, booking_data=BookingCreate(user_id=user_id, ticket_id=ticket.id)
+    )
+
+
+def atomic_book(db: Session, event_id: int, user_id: int):
+    return crud_booking.book_ticket(db=db, event_id=event_id, user_id=user_id)
+
+
+def main() -> None:
+    parser = make_parser(__doc__)
+    parser.add_argument("--bookings", type=int, default=300)
+    args = parser.parse_args()
+
+    engine = make_engine(args.database_url)
+    statements = 0
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count_statement(*_):
+        nonlocal statements
+        statements += 1
+
+    with Session(engine) as session:
+        user_id = seed_users(session, 1)[0]
+        legacy_event, atomic_event = seed_events(session, 2, args.bookings)
+
+    for name, book, event_id in (
+        ("legacy (3 commits)", legacy_book, legacy_event),
+        ("book_ticket (1 commit)", atomic_book, atomic_event),
+    ):
+        samples = []
+        statements = 0
+        with Session(engine) as session:
+            for _ in range(args.bookings):
+                started = time.perf_counter()
+                book(session, event_id, user_id)
+                samples.append(time.perf_counter() - started)
+        report(name, samples)
+        print(f"{'':<28} statements/booking={statements / args.bookings:.1f}")
+
+
+if __name__ == "__main__":
+    main()
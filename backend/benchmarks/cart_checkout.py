@@ -0,0 +1,125 @@
+"""
+Deadlocks of concurrent, overlapping multi-event carts: inventory claimed in
+the order the buyer listed the events vs in ascending event id order, as
+`checkout_cart` does. Retries are bypassed so every deadlock is counted.
+Deadlocks need a database with row locks; use a Postgres URL.
+
+    python -m benchmarks.cart_checkout --database-url postgresql+psycopg://... \\
+        --concurrency 32 --carts 50 --events 8 --cart-size 3 --latency-ms 1
+"""
+
+import random
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+import app.crud.booking as crud_booking
+from app.crud.booking import checkout_cart, insert_bookings
+from app.exceptions.ticket import NoTicketsAvailableException
+from benchmarks.common import make_engine, make_parser, report, seed_events, seed_users
+
+DEADLOCK_SQLSTATE = "40P01"
+
+
+def checkout_unordered(*, db: Session, user_id: int, items: list[tuple[int, int]]):
+    # The naive cart: claim and book each event in the order it was listed
+    for event_id, quantity in items:
+        db_event = crud_booking.claim_tickets(
+            db=db, event_id=event_id, quantity=quantity
+        )
+        insert_bookings(db=db, db_event=db_event, user_ids=[user_id] * quantity)
+    db.commit()
+
+
+def checkout_ordered(*, db: Session, user_id: int, items: list[tuple[int, int]]):
+    checkout_cart.__wrapped__(db=db, user_id=user_id, items=dict(items))
+
+
+def run(engine, checkout, *, event_ids, user_ids, carts, cart_size):
+    def worker(index: int) -> tuple[list[float], Counter]:
+        rng = random.Random(index)
+        samples, outcomes = [], Counter()
+        with Session(engine) as session:
+            for _ in range(carts):
+                items = [(event_id, 1) for event_id in rng.sample(event_ids, cart_size)]
+                started = time.perf_counter()
+                try:
+                    checkout(db=session, user_id=user_ids[index], items=items)
+                    outcomes["booked"] += 1
+                except NoTicketsAvailableException:
+                    session.rollback()
+                    outcomes["sold out"] += 1
+                except DBAPIError as e:
+                    session.rollback()
+                    sqlstate = getattr(e.orig, "sqlstate", None)
+                    deadlock = sqlstate == DEADLOCK_SQLSTATE
+                    outcomes["deadlocks" if deadlock else "other errors"] += 1
+                samples.append(time.perf_counter() - started)
+        return samples, outcomes
+
+    samples, outcomes = [], Counter()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(user_ids)) as pool:
+        for worker_samples, worker_outcomes in pool.map(worker, range(len(user_ids))):
+            samples += worker_samples
+            outcomes += worker_outcomes
+    return samples, outcomes, time.perf_counter() - started
+
+
+def main() -> None:
+    parser = make_parser(__doc__)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--carts", type=int, default=50, help="Carts per worker.")
+    parser.add_argument("--events", type=int, default=8)
+    parser.add_argument("--cart-size", type=int, default=3)
+    parser.add_argument(
+        "--latency-ms",
+        type=float,
+        default=1,
+        help="Simulated network latency after each inventory claim.",
+    )
+    args = parser.parse_args()
+
+    # Stretch the time row locks are held, as a remote database would
+    claim_tickets = crud_booking.claim_tickets
+
+    def slow_claim_tickets(**kwargs):
+        db_event = claim_tickets(**kwargs)
+        time.sleep(args.latency_ms / 1000)
+        return db_event
+
+    crud_booking.claim_tickets = slow_claim_tickets
+
+    capacity = args.concurrency * args.carts
+    for name, checkout in (
+        ("listed order", checkout_unordered),
+        ("ascending id", checkout_ordered),
+    ):
+        engine = make_engine(args.database_url)
+        with Session(engine) as session:
+            user_ids = seed_users(session, args.concurrency)
+            event_ids = seed_events(session, args.events, capacity)
+
+        samples, outcomes, elapsed = run(
+            engine,
+            checkout,
+            event_ids=event_ids,
+            user_ids=user_ids,
+            carts=args.carts,
+            cart_size=args.cart_size,
+        )
+        engine.dispose()
+        report(f"{name} c={args.concurrency}", samples)
+        print(
+            f"{'':<28} {outcomes['booked'] / elapsed:.1f} carts/s  "
+            f"deadlocks={outcomes['deadlocks']}  "
+            f"other errors={outcomes['other errors']}  "
+            f"sold out={outcomes['sold out']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import argparse
+import statistics
+import tempfile
+from datetime import date, time
+from pathlib import Path
+
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.orm import Session
+
+from app.database.session import Base
+from app.models.enums import UserRole
+from app.models.event import Event
+from app.models.location import Location
+from app.models.user import User
+
+DEFAULT_DATABASE_URL = f"sqlite:///{Path(tempfile.gettempdir()) / 'bench.db'}"
+
+
+def make_parser(description: str) -> argparse.ArgumentParser:
+    """
+    Build an argument parser with the options shared by all benchmarks.
+
+    Args:
+        description (str): Help text of the benchmark.
+
+    Returns:
+        argparse.ArgumentParser: The parser, ready for benchmark specific options.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        "--database-url",
+        default=DEFAULT_DATABASE_URL,
+        help="SQLAlchemy URL of a scratch database. All tables are dropped.",
+    )
+    return parser
+
+
+def make_engine(database_url: str) -> Engine:
+    """
+    Create an engine for a scratch benchmark database with fresh tables.
+
+    SQLite databases run in WAL mode with a busy timeout, so concurrent
+    benchmarks measure lock waits instead of failing on the first conflict.
+
+    Args:
+        database_url (str): SQLAlchemy URL of the database.
+
+    Returns:
+        Engine: The engine.
+    """
+    if database_url.startswith("sqlite"):
+        engine = create_engine(
+            database_url,
+            connect_args={"check_same_thread": False, "timeout": 30},
+            pool_size=64,
+        )
+
+        @event.listens_for(engine, "connect")
+        def _set_sqlite_pragmas(dbapi_connection, _):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA busy_timeout=30000")
+            cursor.close()
+
+    else:
+        engine = create_engine(database_url, pool_size=64, max_overflow=0)
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+def seed_users(session: Session, count: int) -> list[int]:
+    """
+    Insert visitors for benchmark bookings.
+
+    Args:
+        session (Session): The database session.
+        count (int): Number of visitors to create.
+
+    Returns:
+        list[int]: The ids of the created visitors.
+    """
+    users = [
+        User(
+            username=f"visitor{i}",
+            email=f"visitor{i}@example.com",
+            hashed_password="not-a-real-hash",
+            role=UserRole.VISITOR,
+        )
+        for i in range(count)
+    ]
+    session.add_all(users)
+    session.commit()
+    return [user.id for user in users]
+
+
+def seed_events(session: Session, count: int, capacity: int) -> list[int]:
+    """
+    Insert an organizer, a location and events with the given capacity.
+
+    Args:
+        session (Session): The database session.
+        count (int): Number of events to create.
+        capacity (int): Ticket capacity of every event.
+
+    Returns:
+        list[int]: The ids of the created events.
+    """
+    organizer = User(
+        username="organizer",
+        email="organizer@example.com",
+        hashed_password="not-a-real-hash",
+        role=UserRole.ORGANIZER,
+    )
+    location = Location(name="Bench Arena", address="1 Benchmark Road")
+    session.add_all([organizer, location])
+    session.flush()
+
+    events = [
+        Event(
+            title=f"Bench Event {i}",
+            event_date=date(2030, 1, 1),
+            start_time=time(20, 0),
+            location_id=location.id,
+            organizer_id=organizer.id,
+            ticket_capacity=capacity,
+        )
+        for i in range(count)
+    ]
+    session.add_all(events)
+    session.commit()
+    return [db_event.id for db_event in events]
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    """
+    Return the nearest-rank percentile of the samples.
+    """
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def report(name: str, samples: list[float]) -> None:
+    """
+    Print mean, p50 and p99 of latency samples given in seconds.
+    """
+    print(
+        f"{name:<28} n={len(samples):<6} "
+        f"mean={statistics.fmean(samples) * 1000:8.3f} ms  "
+        f"p50={percentile(samples, 0.50) * 1000:8.3f} ms  "
+        f"p99={percentile(samples, 0.99) * 1000:8.3f} ms"
+    )
@@ -0,0 +1,62 @@
+"""
+Throughput and latency of concurrent single-ticket bookings on one event,
+per-request transactions vs group commit, at several concurrency levels.
+
+    python -m benchmarks.group_commit --concurrency 1 8 32 64 --window-ms 3
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy.orm import Session
+
+from app.core.group_commit import BookingBatcher
+from app.crud.booking import book_ticket
+from benchmarks.common import make_engine, make_parser, report, seed_events, seed_users
+
+
+def run(engine, book, event_id: int, user_ids: list[int], per_worker: int):
+    def worker(user_id: int) -> list[float]:
+        samples = []
+        with Session(engine) as session:
+            for _ in range(per_worker):
+                started = time.perf_counter()
+                book(db=session, event_id=event_id, user_id=user_id)
+                samples.append(time.perf_counter() - started)
+        return samples
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(user_ids)) as pool:
+        samples = [s for batch in pool.map(worker, user_ids) for s in batch]
+    return samples, time.perf_counter() - started
+
+
+def main() -> None:
+    parser = make_parser(__doc__)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--per-worker", type=int, default=20)
+    parser.add_argument("--window-ms", type=float, default=3)
+    parser.add_argument("--max-batch", type=int, default=32)
+    args = parser.parse_args()
+
+    engine = make_engine(args.database_url)
+    capacity = max(args.concurrency) * args.per_worker
+    with Session(engine) as session:
+        user_ids = seed_users(session, max(args.concurrency))
+        event_ids = iter(seed_events(session, 2 * len(args.concurrency), capacity))
+
+    batcher = BookingBatcher(window=args.window_ms / 1000, max_batch=args.max_batch)
+    for concurrency in args.concurrency:
+        for name, book in (
+            ("per-request", book_ticket),
+            ("group commit", batcher.book),
+        ):
+            samples, elapsed = run(
+                engine, book, next(event_ids), user_ids[:concurrency], args.per_worker
+            )
+            report(f"{name} c={concurrency}", samples)
+            print(f"{'':<28} {len(samples) / elapsed:.1f} bookings/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+A login storm against the app: bcrypt in request threads vs in the password
+hashing process pool. Prints logins/s, how many were refused, and the
+latency of an unrelated sync endpoint (GET /locations/) during the storm.
+
+Requests go through the ASGI app in this process, with FastAPI's default
+threadpool of 40 threads for sync routes.
+
+    python -m benchmarks.login_storm --logins 400 --concurrency 100 --workers 4
+"""
+
+import asyncio
+import time
+
+import httpx
+from sqlalchemy.orm import Session
+
+import app.crud.user as crud_user
+from app.api.deps import get_db
+from app.core.hashing import PasswordHasher
+from app.core.security import get_password_hash
+from app.core.user_cache import user_cache
+from app.main import app
+from app.models.enums import UserRole
+from app.models.user import User
+from benchmarks.common import make_engine, make_parser, report
+
+PASSWORD = "Kennwort1"
+
+
+async def storm(
+    client: httpx.AsyncClient, *, users: int, logins: int, concurrency: int
+) -> tuple[dict[int, int], float]:
+    statuses: dict[int, int] = {}
+    queue: asyncio.Queue[int] = asyncio.Queue()
+    for index in range(logins):
+        queue.put_nowait(index % users)
+
+    async def worker() -> None:
+        while not queue.empty():
+            index = queue.get_nowait()
+            response = await client.post(
+                "/api/login",
+                data={"username": f"user{index}@example.com", "password": PASSWORD},
+            )
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return statuses, time.perf_counter() - started
+
+
+async def probe(client: httpx.AsyncClient, done: asyncio.Event) -> list[float]:
+    samples = []
+    while not done.is_set():
+        started = time.perf_counter()
+        await client.get("/api/locations/")
+        samples.append(time.perf_counter() - started)
+        await asyncio.sleep(0.005)
+    return samples
+
+
+async def run(args, hasher: PasswordHasher) -> None:
+    crud_user.password_hasher = hasher
+    hasher.start()
+    user_cache.reset()
+    transport = httpx.ASGITransport(app=app)
+    client = httpx.AsyncClient(transport=transport, base_url="http://bench")
+    async with client:
+        done = asyncio.Event()
+        probing = asyncio.create_task(probe(client, done))
+        statuses, elapsed = await storm(
+            client, users=args.users, logins=args.logins, concurrency=args.concurrency
+        )
+        done.set()
+        samples = await probing
+    hasher.stop()
+
+    name = f"{'pool' if hasher.workers else 'threads'} c={args.concurrency}"
+    report(f"{name} /locations", samples)
+    print(
+        f"{'':<28} {statuses.get(200, 0) / elapsed:.1f} logins/s  "
+        f"refused={statuses.get(503, 0)}  other={statuses}"
+    )
+
+
+def main() -> None:
+    parser = make_parser(__doc__)
+    parser.add_argument("--logins", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--max-pending", type=int, default=16)
+    args = parser.parse_args()
+
+    engine = make_engine(args.database_url)
+    hashed_password = get_password_hash(PASSWORD)
+    with Session(engine) as session:
+        session.add_all(
+            User(
+                username=f"user{i}",
+                email=f"user{i}@example.com",
+                hashed_password=hashed_password,
+                role=UserRole.VISITOR,
+            )
+            for i in range(args.users)
+        )
+        session.commit()
+
+    def bench_db():
+        with Session(engine) as session:
+            yield session
+
+    app.dependency_overrides[get_db] = bench_db
+    # The old behaviour: every login hashes in its request thread
+    asyncio.run(run(args, PasswordHasher(workers=0, max_pending=args.logins)))
+    asyncio.run(
+        run(args, PasswordHasher(workers=args.workers, max_pending=args.max_pending))
+    )
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
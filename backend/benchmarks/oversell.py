@@ -0,0 +1,252 @@
+"""
+Oversell stress test: thousands of concurrent bookings on small events.
+
+Every attempt books a random event through one of the booking paths. When
+all attempts are done, the live bookings of every event are counted and
+compared with its capacity and with its sold counter. Prints throughput,
+p50/p99 latency and the rejection rate, and exits non-zero on any oversell.
+
+    python -m benchmarks.oversell --attempts 5000 --concurrency 64 --capacity 5
+    python -m benchmarks.oversell --mode group --shards 4 --preallocate
+"""
+
+import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from sqlalchemy import Engine, func, select
+from sqlalchemy.orm import Session
+
+from app.core.group_commit import BookingBatcher
+from app.crud.booking import book_ticket, book_tickets
+from app.crud.hold import confirm_hold, create_hold
+from app.crud.inventory import get_tickets_sold, rebalance_shards, sync_seats
+from app.exceptions.ticket import NoTicketsAvailableException
+from app.models.booking import Booking
+from app.models.event import Event
+from app.models.ticket import Ticket
+from benchmarks.common import (
+    make_engine,
+    make_parser,
+    report,
+    seed_events,
+    seed_users,
+)
+
+MODES = ("single", "batch", "group", "hold")
+
+
+@dataclass
+class StressResult:
+    attempts: int = 0
+    booked: int = 0
+    rejected: int = 0
+    errors: Counter = field(default_factory=Counter)
+    samples: list[float] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def rejection_rate(self) -> float:
+        return self.rejected / self.attempts if self.attempts else 0.0
+
+
+def make_booker(mode: str, quantity: int = 2):
+    """
+    Return a `book(db, event_id, user_id) -> int` for a booking path.
+
+    The callable returns the number of tickets booked and raises
+    NoTicketsAvailableException when the event has too few left.
+    """
+    if mode == "single":
+
+        def book(db: Session, event_id: int, user_id: int) -> int:
+            book_ticket(db=db, event_id=event_id, user_id=user_id)
+            return 1
+
+    elif mode == "batch":
+
+        def book(db: Session, event_id: int, user_id: int) -> int:
+            return len(
+                book_tickets(
+                    db=db, event_id=event_id, user_id=user_id, quantity=quantity
+                )
+            )
+
+    elif mode == "group":
+        batcher = BookingBatcher(window=0.002, max_batch=32)
+
+        def book(db: Session, event_id: int, user_id: int) -> int:
+            batcher.book(db=db, event_id=event_id, user_id=user_id)
+            return 1
+
+    elif mode == "hold":
+
+        def book(db: Session, event_id: int, user_id: int) -> int:
+            db_hold = create_hold(
+                db=db, event_id=event_id, user_id=user_id, quantity=1, ttl_seconds=60
+            )
+            return len(confirm_hold(db=db, hold_id=db_hold.id, user_id=user_id))
+
+    else:
+        raise ValueError(f"Unknown mode {mode!r}, expected one of {MODES}")
+    return book
+
+
+def seed(
+    engine: Engine,
+    *,
+    events: int,
+    capacity: int,
+    users: int,
+    shards: int = 1,
+    preallocate: bool = False,
+) -> tuple[list[int], list[int]]:
+    """
+    Insert visitors and small events laid out like the given options.
+
+    Returns:
+        tuple[list[int], list[int]]: The event ids and the user ids.
+    """
+    with Session(engine) as session:
+        user_ids = seed_users(session, users)
+        event_ids = seed_events(session, events, capacity)
+        for db_event in session.scalars(select(Event)):
+            db_event.inventory_shards = shards
+            db_event.seats_preallocated = preallocate
+            if shards > 1:
+                rebalance_shards(db=session, db_event=db_event, sold=0)
+            if preallocate:
+                sync_seats(db=session, db_event=db_event)
+        session.commit()
+    return event_ids, user_ids
+
+
+def run(
+    engine: Engine,
+    book,
+    *,
+    event_ids: list[int],
+    user_ids: list[int],
+    attempts: int,
+) -> StressResult:
+    """
+    Fire `attempts` bookings from one thread per user, on random events.
+    """
+    per_worker, extra = divmod(attempts, len(user_ids))
+
+    def worker(index: int) -> StressResult:
+        result = StressResult()
+        rng = random.Random(index)
+        with Session(engine) as session:
+            for _ in range(per_worker + (index < extra)):
+                event_id = rng.choice(event_ids)
+                started = time.perf_counter()
+                try:
+                    result.booked += book(
+                        db=session, event_id=event_id, user_id=user_ids[index]
+                    )
+                except NoTicketsAvailableException:
+                    result.rejected += 1
+                except Exception as e:
+                    session.rollback()
+                    result.errors[type(e).__name__] += 1
+                result.samples.append(time.perf_counter() - started)
+                result.attempts += 1
+        return result
+
+    total = StressResult()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(user_ids)) as pool:
+        for result in pool.map(worker, range(len(user_ids))):
+            total.attempts += result.attempts
+            total.booked += result.booked
+            total.rejected += result.rejected
+            total.errors.update(result.errors)
+            total.samples.extend(result.samples)
+    total.elapsed = time.perf_counter() - started
+    return total
+
+
+def check_capacity(engine: Engine) -> list[str]:
+    """
+    Compare every event's live bookings with its capacity and sold counter.
+
+    Returns:
+        list[str]: One message per oversold event or drifted counter.
+    """
+    with Session(engine) as session:
+        booked = dict(
+            session.execute(
+                select(Ticket.event_id, func.count(Booking.booking_number))
+                .join(Booking, Booking.ticket_id == Ticket.id)
+                .where(Booking.cancelled_at.is_(None), Ticket.cancelled_at.is_(None))
+                .group_by(Ticket.event_id)
+            ).all()
+        )
+        problems = []
+        for db_event in session.scalars(select(Event).order_by(Event.id)):
+            count = booked.get(db_event.id, 0)
+            sold = get_tickets_sold(db=session, db_event=db_event)
+            if count > db_event.ticket_capacity:
+                problems.append(
+                    f"event {db_event.id}: {count} bookings for "
+                    f"{db_event.ticket_capacity} tickets"
+                )
+            if sold != count:
+                problems.append(
+                    f"event {db_event.id}: counter says {sold} sold, {count} booked"
+                )
+    return problems
+
+
+def main() -> None:
+    parser = make_parser(__doc__)
+    parser.add_argument("--mode", choices=MODES, nargs="+", default=list(MODES))
+    parser.add_argument("--attempts", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--events", type=int, default=20)
+    parser.add_argument("--capacity", type=int, default=5)
+    parser.add_argument("--shards", type=int, default=1)
+    parser.add_argument("--preallocate", action="store_true")
+    args = parser.parse_args()
+
+    failed = False
+    for mode in args.mode:
+        engine = make_engine(args.database_url)
+        event_ids, user_ids = seed(
+            engine,
+            events=args.events,
+            capacity=args.capacity,
+            users=args.concurrency,
+            shards=args.shards,
+            preallocate=args.preallocate,
+        )
+        result = run(
+            engine,
+            make_booker(mode),
+            event_ids=event_ids,
+            user_ids=user_ids,
+            attempts=args.attempts,
+        )
+        problems = check_capacity(engine)
+        engine.dispose()
+
+        report(f"{mode} c={args.concurrency}", result.samples)
+        print(
+            f"{'':<28} {result.attempts / result.elapsed:.1f} attempts/s  "
+            f"booked={result.booked}/{args.events * args.capacity}  "
+            f"rejected={result.rejection_rate:.1%}  "
+            f"errors={dict(result.errors) or 0}"
+        )
+        for problem in problems:
+            print(f"{'':<28} FAILED {problem}")
+        failed = failed or bool(problems)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
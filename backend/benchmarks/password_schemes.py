@@ -0,0 +1,74 @@
+"""
+Hash and verify latency of every password hashing scheme at the costs in the
+settings, or at the costs given. Schemes without an installed backend
+(argon2 needs argon2-cffi) are skipped.
+
+    python -m benchmarks.password_schemes --samples 10
+    python -m benchmarks.password_schemes --bcrypt-rounds 10 --scrypt-rounds 14
+"""
+
+import argparse
+import time
+
+from passlib.exc import MissingBackendError
+
+from app.core.config import settings
+from app.core.security import (
+    PASSWORD_HASH_COSTS,
+    PASSWORD_HASH_SCHEMES,
+    make_pwd_context,
+)
+from benchmarks.common import report
+
+
+def measure(scheme: str, cost: int, samples: int) -> tuple[list[float], list[float]]:
+    pwd_context = make_pwd_context(
+        scheme,
+        **{f"{scheme}__{PASSWORD_HASH_COSTS[scheme]}": cost},
+        argon2__memory_cost=settings.PASSWORD_HASH_ARGON2_MEMORY_COST_KIB,
+    )
+    hashes, verifies = [], []
+    for _ in range(samples):
+        started = time.perf_counter()
+        hashed = pwd_context.hash("Kennwort1")
+        hashes.append(time.perf_counter() - started)
+        started = time.perf_counter()
+        pwd_context.verify("Kennwort1", hashed)
+        verifies.append(time.perf_counter() - started)
+    return hashes, verifies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--samples", type=int, default=10)
+    parser.add_argument(
+        "--bcrypt-rounds", type=int, default=settings.PASSWORD_HASH_BCRYPT_ROUNDS
+    )
+    parser.add_argument(
+        "--argon2-time-cost",
+        type=int,
+        default=settings.PASSWORD_HASH_ARGON2_TIME_COST,
+    )
+    parser.add_argument(
+        "--scrypt-rounds", type=int, default=settings.PASSWORD_HASH_SCRYPT_ROUNDS
+    )
+    args = parser.parse_args()
+
+    costs = {
+        "bcrypt": args.bcrypt_rounds,
+        "argon2": args.argon2_time_cost,
+        "scrypt": args.scrypt_rounds,
+    }
+    for scheme in PASSWORD_HASH_SCHEMES:
+        name = f"{scheme} {PASSWORD_HASH_COSTS[scheme]}={costs[scheme]}"
+        try:
+            hashes, verifies = measure(scheme, costs[scheme], args.samples)
+        except MissingBackendError:
+            print(f"{name:<28} skipped, no backend installed")
+            continue
+        report(f"{name} hash", hashes)
+        report(f"{name} verify", verifies)
+
+
+if __name__ == "__main__":
+    main()
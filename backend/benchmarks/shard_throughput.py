@@ -0,0 +1,85 @@
+"""
+Booking throughput on one hot event against its inventory shard count.
+
+Every worker thread books tickets for the same event through `book_ticket`
+until the event sells out. With --preallocate the event's seats are created
+up front and claimed with SKIP LOCKED instead of inserted per booking.
+Row-lock contention only shows on a server database; SQLite serializes all
+writers, so its numbers stay flat.
+
+    python -m benchmarks.shard_throughput --database-url postgresql+psycopg://...
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy.orm import Session
+
+from app.crud.booking import book_ticket
+from app.crud.inventory import rebalance_shards, sync_seats
+from app.exceptions.ticket import NoTicketsAvailableException
+from app.models.event import Event
+from benchmarks.common import make_engine, make_parser, seed_events, seed_users
+
+
+def run(engine, event_id: int, user_ids: list[int], workers: int) -> tuple[int, int]:
+    booked = 0
+    errors = 0
+    lock = threading.Lock()
+
+    def worker(user_id: int) -> None:
+        nonlocal booked, errors
+        with Session(engine) as session:
+            while True:
+                try:
+                    book_ticket(db=session, event_id=event_id, user_id=user_id)
+                except NoTicketsAvailableException:
+                    session.rollback()
+                    return
+                except Exception:
+                    session.rollback()
+                    with lock:
+                        errors += 1
+                    continue
+                with lock:
+                    booked += 1
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(worker, user_ids[:workers]))
+    return booked, errors
+
+
+def main() -> None:
+    parser = make_parser(__doc__)
+    parser.add_argument("--capacity", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--preallocate", action="store_true")
+    args = parser.parse_args()
+
+    engine = make_engine(args.database_url)
+    with Session(engine) as session:
+        user_ids = seed_users(session, args.workers)
+        event_ids = seed_events(session, len(args.shards), args.capacity)
+        for event_id, shard_count in zip(event_ids, args.shards):
+            db_event = session.get(Event, event_id)
+            db_event.inventory_shards = shard_count
+            rebalance_shards(db=session, db_event=db_event, sold=0)
+            if args.preallocate:
+                db_event.seats_preallocated = True
+                sync_seats(db=session, db_event=db_event)
+        session.commit()
+
+    for event_id, shard_count in zip(event_ids, args.shards):
+        started = time.perf_counter()
+        booked, errors = run(engine, event_id, user_ids, args.workers)
+        elapsed = time.perf_counter() - started
+        print(
+            f"shards={shard_count:<3} workers={args.workers:<4} booked={booked:<6} "
+            f"errors={errors:<4} {booked / elapsed:9.1f} bookings/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Cost of `get_token_data` per request: cold, verifying the JWT's signature
+and parsing its claims every time, vs warm, finding the verified claims of a
+token seen before. Token versions are cached in both, as in steady state.
+Also the cost of its denylist check alone, with `--revoked` tokens revoked.
+
+    python -m benchmarks.token_verification --requests 20000 --revoked 100000
+"""
+
+import secrets
+import time
+from datetime import timedelta
+
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_token_data
+from app.core.clock import utcnow
+from app.core.config import settings
+from app.core.denylist import TokenDenylist
+from app.core.security import create_access_token
+from app.core.token_cache import verified_tokens
+from app.core.token_versions import token_versions
+from benchmarks.common import make_engine, make_parser, report, seed_users
+
+
+def measure(session: Session, token: str, requests: int, *, warm: bool) -> list[float]:
+    samples = []
+    for _ in range(requests):
+        if not warm:
+            verified_tokens.reset()
+        started = time.perf_counter()
+        get_token_data(session, token)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def measure_denylist(revoked: int, requests: int) -> None:
+    denylist = TokenDenylist(
+        bind=None, interval=0, bloom_bits=settings.TOKEN_DENYLIST_BLOOM_BITS
+    )
+    expires_at = utcnow() + timedelta(hours=1)
+    jtis = [secrets.token_hex(16) for _ in range(revoked)]
+    for jti in jtis:
+        denylist.add(jti, expires_at)
+
+    for name, candidates in (
+        ("denylist miss", [secrets.token_hex(16) for _ in range(requests)]),
+        ("denylist hit", [jtis[i % revoked] for i in range(requests)]),
+    ):
+        samples = []
+        for jti in candidates:
+            started = time.perf_counter()
+            denylist.is_revoked(jti)
+            samples.append(time.perf_counter() - started)
+        report(f"{name} n={revoked}", samples)
+
+
+def main() -> None:
+    parser = make_parser(__doc__)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--revoked", type=int, default=100_000)
+    args = parser.parse_args()
+
+    engine = make_engine(args.database_url)
+    with Session(engine) as session:
+        user_id = seed_users(session, 1)[0]
+        token = create_access_token(
+            "visitor0@example.com",
+            role="visitor",
+            expires_delta=timedelta(hours=1),
+            user_id=user_id,
+            token_version=0,
+        )
+        token_versions.get(db=session, user_id=user_id)
+
+        for name, warm in (("cold (verify)", False), ("warm (memoized)", True)):
+            report(name, measure(session, token, args.requests, warm=warm))
+    engine.dispose()
+    measure_denylist(args.revoked, args.requests)
+
+
+if __name__ == "__main__":
+    main()
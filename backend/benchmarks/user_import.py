@@ -0,0 +1,76 @@
+"""
+Importing users: one `create_user` per user, hashing in this process, vs
+`import_users` with chunked inserts and passwords hashed on the password
+hashing workers. Hashing costs follow the settings, e.g.
+PASSWORD_HASH_BCRYPT_ROUNDS=10 in the environment.
+
+    python -m benchmarks.user_import --users 200 --workers 4 --chunk-size 1000
+"""
+
+import time
+
+from sqlalchemy.orm import Session
+
+import app.crud.user as crud_user
+from app.core.hashing import PasswordHasher
+from app.models.enums import UserRole
+from app.schemas.user import UserCreate
+from benchmarks.common import make_engine, make_parser
+
+
+def make_users(count: int) -> list[tuple[int, UserCreate]]:
+    return [
+        (
+            line,
+            UserCreate(
+                username=f"import{line}",
+                email=f"import{line}@example.com",
+                password=f"Kennwort{line}",
+                role=UserRole.VISITOR,
+            ),
+        )
+        for line in range(2, count + 2)
+    ]
+
+
+def create_one_by_one(*, db: Session, users, chunk_size: int) -> int:
+    for _, user in users:
+        crud_user.create_user(db=db, user=user)
+    return len(users)
+
+
+def import_at_once(*, db: Session, users, chunk_size: int) -> int:
+    return crud_user.import_users(db=db, users=users, chunk_size=chunk_size).created
+
+
+def main() -> None:
+    parser = make_parser(__doc__)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    users = make_users(args.users)
+    for name, load, workers in (
+        ("one by one", create_one_by_one, 0),
+        (f"import w={args.workers}", import_at_once, args.workers),
+    ):
+        engine = make_engine(args.database_url)
+        hasher = PasswordHasher(workers=workers, max_pending=1)
+        crud_user.password_hasher = hasher
+        hasher.start()
+        # Spawn the workers before timing, as the app does at startup
+        hasher.hash_many(["warm-up"] * workers)
+        try:
+            with Session(engine) as session:
+                started = time.perf_counter()
+                created = load(db=session, users=users, chunk_size=args.chunk_size)
+                elapsed = time.perf_counter() - started
+        finally:
+            hasher.stop()
+            engine.dispose()
+        print(f"{name:<28} {created / elapsed:.1f} users/s  created={created}")
+
+
+if __name__ == "__main__":
+    main()
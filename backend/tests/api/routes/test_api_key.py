@@ -0,0 +1,103 @@
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.api_keys import api_keys
+from app.crud.api_key import create_api_key
+from app.models.enums import ApiKeyScope
+from app.schemas.api_key import ApiKeyCreate
+
+
+def _key(db: Session, user, *scopes: ApiKeyScope) -> dict[str, str]:
+    _, key = create_api_key(
+        db=db, api_key=ApiKeyCreate(name="scanner", user_id=user.id, scopes=scopes)
+    )
+    api_keys.reload(db=db)
+    return {"X-API-Key": key}
+
+
+def test_api_key_reads_bookings(client: TestClient, db, test_visitor, test_booking):
+    headers = _key(db, test_visitor, ApiKeyScope.BOOKINGS_READ)
+
+    response = client.get("/api/bookings/me", headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert [b["booking_number"] for b in response.json()] == [
+        test_booking.booking_number
+    ]
+
+
+def test_api_key_books_event(client: TestClient, db, test_visitor, test_event):
+    headers = _key(db, test_visitor, ApiKeyScope.BOOKINGS_WRITE)
+
+    response = client.post(f"/api/bookings/event/{test_event.id}", headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["user_id"] == test_visitor.id
+
+
+def test_api_key_without_scope_forbidden(
+    client: TestClient, db, test_visitor, test_event
+):
+    headers = _key(db, test_visitor, ApiKeyScope.BOOKINGS_READ)
+
+    response = client.post(f"/api/bookings/event/{test_event.id}", headers=headers)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    # Routes that don't name a scope refuse API keys altogether
+    response = client.get("/api/users/me", headers=headers)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_api_key_keeps_account_role(client: TestClient, db, test_visitor, test_booking):
+    headers = _key(db, test_visitor, ApiKeyScope.BOOKINGS_READ)
+
+    number = test_booking.booking_number
+    response = client.get(f"/api/bookings/{number}", headers=headers)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_unknown_api_key_unauthorized(client: TestClient):
+    response = client.get("/api/bookings/me", headers={"X-API-Key": "rdp_nope"})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_create_list_revoke_api_key(
+    client_with_superuser: TestClient, test_organizer
+):
+    response = client_with_superuser.post(
+        "/api/api-keys/",
+        json={
+            "name": "door",
+            "user_id": test_organizer.id,
+            "scopes": ["bookings:read"],
+        },
+    )
+    assert response.status_code == status.HTTP_200_OK
+    created = response.json()
+    assert created["key"].startswith(f"rdp_{created['key_id']}_")
+    assert api_keys.get(created["key"]).principal.id == test_organizer.id
+
+    response = client_with_superuser.get("/api/api-keys/")
+    assert [k["key_id"] for k in response.json()] == [created["key_id"]]
+    assert "key" not in response.json()[0]
+
+    response = client_with_superuser.delete(f"/api/api-keys/{created['key_id']}")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["revoked_at"] is not None
+    assert api_keys.get(created["key"]) is None
+    response = client_with_superuser.delete(f"/api/api-keys/{created['key_id']}")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_create_api_key_missing_user(client_with_superuser: TestClient):
+    response = client_with_superuser.post(
+        "/api/api-keys/",
+        json={"name": "door", "user_id": 999, "scopes": ["bookings:read"]},
+    )
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_create_api_key_unauthorized_visitor(client_with_visitor: TestClient):
+    response = client_with_visitor.post(
+        "/api/api-keys/",
+        json={"name": "door", "user_id": 1, "scopes": ["bookings:read"]},
+    )
+    assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -1,7 +1,18 @@
+from datetime import timedelta
+
 from fastapi import status
 from fastapi.testclient import TestClient
 
+from app.api.deps import get_token_data
+from app.core.admission import admission
+from app.core.clock import utcnow
+from app.core.idempotency import idempotency
+from app.core.on_sale import on_sale
+from app.exceptions.db import TransientDatabaseException
+from app.main import app
 from app.models.booking import Booking
+from app.models.enums import UserRole
+from app.schemas.token import TokenData
 
 
 def test_get_bookings_admin(client_with_superuser: TestClient, test_booking):
@@ -57,6 +68,176 @@ def test_book_event_success(client_with_visitor: TestClient, db, test_event):
     assert response.json()["user_id"] is not None
 
 
+def test_book_event_forgets_warmed_availability(
+    client_with_visitor: TestClient, test_event
+):
+    on_sale.availability.set(test_event.id, 50, ttl=60)
+    response = client_with_visitor.post(f"/api/bookings/event/{test_event.id}")
+    assert response.status_code == status.HTTP_200_OK
+
+    response = client_with_visitor.get(
+        f"/api/tickets/event/{test_event.id}/available/count"
+    )
+    assert response.json() == 49
+
+
+def test_book_event_sold_out(
+    client_with_visitor: TestClient, db, test_event, test_ticket
+):
+    _ = test_ticket
+    test_event.ticket_capacity = 1
+    db.commit()
+    response = client_with_visitor.post(f"/api/bookings/event/{test_event.id}")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()["detail"] == "No tickets available"
+
+
+def test_book_event_sold_out_rejected_from_memory(
+    client_with_visitor: TestClient, db, test_event
+):
+    test_event.ticket_capacity = 0
+    db.commit()
+    response = client_with_visitor.post(f"/api/bookings/event/{test_event.id}")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    # Capacity added behind the API's back is not seen until the mark expires
+    test_event.ticket_capacity = 10
+    db.commit()
+    response = client_with_visitor.post(f"/api/bookings/event/{test_event.id}")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert db.query(Booking).count() == 0
+
+
+def test_book_event_not_on_sale_yet(client_with_visitor: TestClient, db, test_event):
+    test_event.on_sale_at = utcnow() + timedelta(minutes=5)
+    db.commit()
+
+    # The first attempt is refused by the database, later ones from memory
+    for _ in range(2):
+        response = client_with_visitor.post(f"/api/bookings/event/{test_event.id}")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert 0 < int(response.headers["Retry-After"]) <= 300
+    assert db.query(Booking).count() == 0
+
+
+def test_book_event_transient_error(
+    client_with_visitor: TestClient, test_event, monkeypatch
+):
+    def book_ticket(**_):
+        raise TransientDatabaseException("deadlock detected")
+
+    monkeypatch.setattr("app.api.routes.booking.crud.book_ticket", book_ticket)
+    response = client_with_visitor.post(f"/api/bookings/event/{test_event.id}")
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_book_event_waiting_room(
+    client_with_visitor: TestClient, test_event, monkeypatch
+):
+    monkeypatch.setattr(admission, "max_active", 0)
+    response = client_with_visitor.post(f"/api/bookings/event/{test_event.id}")
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    token = response.json()["detail"]["token"]
+
+    response = client_with_visitor.get(f"/api/bookings/queue/{token}")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["position"] == 0
+    assert response.json()["ready"] is False
+
+    monkeypatch.setattr(admission, "max_active", 1)
+    response = client_with_visitor.get(f"/api/bookings/queue/{token}?wait=1")
+    assert response.json()["ready"] is True
+
+    response = client_with_visitor.post(
+        f"/api/bookings/event/{test_event.id}", headers={"X-Queue-Token": token}
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+
+def test_book_event_waiting_room_requires_authentication(
+    client: TestClient, test_event, monkeypatch
+):
+    monkeypatch.setattr(admission, "max_active", 0)
+    response = client.post(f"/api/bookings/event/{test_event.id}")
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert admission.try_admit(test_event.id, owner=1).position == 0
+
+
+def test_get_queue_status_of_other_user(
+    client_with_visitor: TestClient, test_event, test_organizer, monkeypatch
+):
+    monkeypatch.setattr(admission, "max_active", 0)
+    response = client_with_visitor.post(f"/api/bookings/event/{test_event.id}")
+    token = response.json()["detail"]["token"]
+
+    app.dependency_overrides[get_token_data] = lambda: TokenData(
+        username=test_organizer.email,
+        role=UserRole.ORGANIZER.value,
+        user_id=test_organizer.id,
+        version=test_organizer.token_version,
+    )
+    response = client_with_visitor.get(f"/api/bookings/queue/{token}")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_get_queue_status_unknown_token(client_with_visitor: TestClient):
+    response = client_with_visitor.get("/api/bookings/queue/unknown")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_book_event_batch_success(client_with_visitor: TestClient, test_event):
+    response = client_with_visitor.post(
+        f"/api/bookings/event/{test_event.id}/batch", json={"quantity": 4}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()) == 4
+    assert len({booking["ticket_id"] for booking in response.json()}) == 4
+
+
+def test_book_event_batch_sold_out(client_with_visitor: TestClient, db, test_event):
+    response = client_with_visitor.post(
+        f"/api/bookings/event/{test_event.id}/batch", json={"quantity": 51}
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert db.query(Booking).count() == 0
+
+
+def test_checkout_cart_success(client_with_visitor: TestClient, test_event):
+    cart = {"items": [{"event_id": test_event.id, "quantity": 2}]}
+    response = client_with_visitor.post("/api/bookings/cart", json=cart)
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()) == 2
+
+
+def test_checkout_cart_sold_out(client_with_visitor: TestClient, db, test_event):
+    test_event.ticket_capacity = 1
+    db.commit()
+    response = client_with_visitor.post(
+        "/api/bookings/cart",
+        json={"items": [{"event_id": test_event.id}, {"event_id": test_event.id}]},
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert str(test_event.id) in response.json()["detail"]
+    assert db.query(Booking).count() == 0
+
+
+def test_checkout_cart_idempotency_key_replays_after_sell_out(
+    client_with_visitor: TestClient, db, test_event
+):
+    test_event.ticket_capacity = 2
+    db.commit()
+    cart = {"items": [{"event_id": test_event.id, "quantity": 2}]}
+    headers = {"Idempotency-Key": "cart-1"}
+    first = client_with_visitor.post("/api/bookings/cart", json=cart, headers=headers)
+    assert first.status_code == status.HTTP_200_OK
+
+    admission.mark_sold_out(test_event.id)
+    retry = client_with_visitor.post("/api/bookings/cart", json=cart, headers=headers)
+    assert retry.status_code == status.HTTP_200_OK
+    assert retry.json() == first.json()
+
+
 def test_book_event_not_found(client_with_visitor: TestClient):
     response = client_with_visitor.post("/api/bookings/event/9999")
     assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -97,10 +278,10 @@ def test_delete_own_booking_success(client_with_visitor: TestClient, db, test_bo
     response = client_with_visitor.delete(f"/api/bookings/me/{booking_number}")
     assert response.status_code == status.HTTP_200_OK
     assert response.json()["booking_number"] == booking_number
-    assert (
+    db_booking = (
         db.query(Booking).filter(Booking.booking_number == booking_number).first()
-        is None
     )
+    assert db_booking.cancelled_at is not None
 
 
 def test_delete_own_booking_not_own(client_with_organizer: TestClient, test_booking):
@@ -149,10 +330,10 @@ def test_delete_booking_admin(client_with_superuser: TestClient, db, test_bookin
     response = client_with_superuser.delete(f"/api/bookings/{booking_number}")
     assert response.status_code == status.HTTP_200_OK
     assert response.json()["booking_number"] == booking_number
-    assert (
+    db_booking = (
         db.query(Booking).filter(Booking.booking_number == booking_number).first()
-        is None
     )
+    assert db_booking.cancelled_at is not None
 
 
 def test_delete_booking_unauthorized_visitor(
@@ -205,3 +386,106 @@ def test_get_bookings_by_ticket_unauthorized_visitor(
     _ = test_booking
     response = client_with_visitor.get(f"/api/bookings/ticket/{test_ticket.id}")
     assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_book_event_idempotency_key_replays(
+    client_with_visitor: TestClient, db, test_event
+):
+    headers = {"Idempotency-Key": "retry-1"}
+    first = client_with_visitor.post(
+        f"/api/bookings/event/{test_event.id}", headers=headers
+    )
+    retry = client_with_visitor.post(
+        f"/api/bookings/event/{test_event.id}", headers=headers
+    )
+    assert first.status_code == retry.status_code == status.HTTP_200_OK
+    assert first.json() == retry.json()
+    assert db.query(Booking).count() == 1
+
+    other = client_with_visitor.post(
+        f"/api/bookings/event/{test_event.id}", headers={"Idempotency-Key": "retry-2"}
+    )
+    assert other.json()["booking_number"] != first.json()["booking_number"]
+
+
+def test_book_event_idempotency_key_replays_after_sell_out(
+    client_with_visitor: TestClient, db, test_event
+):
+    test_event.ticket_capacity = 1
+    db.commit()
+    url = f"/api/bookings/event/{test_event.id}"
+    headers = {"Idempotency-Key": "last-ticket"}
+    first = client_with_visitor.post(url, headers=headers)
+    assert first.status_code == status.HTTP_200_OK
+
+    response = client_with_visitor.post(url)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert admission.is_sold_out(test_event.id)
+
+    # Replayed from the database, as by another worker
+    idempotency.reset()
+    retry = client_with_visitor.post(url, headers=headers)
+    assert retry.status_code == status.HTTP_200_OK
+    assert retry.json() == first.json()
+
+
+def test_book_event_batch_idempotency_key_reused_with_other_body(
+    client_with_visitor: TestClient, test_event
+):
+    url = f"/api/bookings/event/{test_event.id}/batch"
+    headers = {"Idempotency-Key": "batch-1"}
+    response = client_with_visitor.post(url, json={"quantity": 2}, headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+
+    response = client_with_visitor.post(url, json={"quantity": 3}, headers=headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "Idempotency-Key" in response.json()["detail"]
+
+
+def test_book_event_failed_request_is_not_stored(
+    client_with_visitor: TestClient, db, test_event
+):
+    test_event.ticket_capacity = 0
+    db.commit()
+    headers = {"Idempotency-Key": "sold-out"}
+    url = f"/api/bookings/event/{test_event.id}"
+    response = client_with_visitor.post(url, headers=headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    test_event.ticket_capacity = 1
+    db.commit()
+    admission.reopen(test_event.id)
+    response = client_with_visitor.post(url, headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+
+
+def test_hold_and_confirm(client_with_visitor: TestClient, db, test_event):
+    response = client_with_visitor.post(
+        f"/api/bookings/event/{test_event.id}/hold", json={"quantity": 2}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    hold_id = response.json()["id"]
+
+    response = client_with_visitor.post(f"/api/bookings/holds/{hold_id}/confirm")
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()) == 2
+    assert db.query(Booking).count() == 2
+
+    response = client_with_visitor.post(f"/api/bookings/holds/{hold_id}/confirm")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_release_hold(client_with_visitor: TestClient, db, test_event):
+    test_event.ticket_capacity = 1
+    db.commit()
+    url = f"/api/bookings/event/{test_event.id}/hold"
+    response = client_with_visitor.post(url, json={"quantity": 1})
+    hold_id = response.json()["id"]
+
+    response = client_with_visitor.post(url, json={"quantity": 1})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    response = client_with_visitor.delete(f"/api/bookings/holds/{hold_id}")
+    assert response.status_code == status.HTTP_200_OK
+    response = client_with_visitor.post(url, json={"quantity": 1})
+    assert response.status_code == status.HTTP_200_OK
@@ -1,4 +1,4 @@
-from datetime import date, time
+from datetime import date, datetime, time
 
 from fastapi import status
 from fastapi.testclient import TestClient
@@ -27,6 +27,29 @@ def test_create_event_success_admin(
     assert event.organizer_id == test_organizer.id
 
 
+def test_create_event_on_sale_at(
+    client_with_organizer: TestClient, db, test_location, test_organizer
+):
+    data = {
+        "title": "Scheduled Sale Event",
+        "event_date": str(date(2030, 12, 30)),
+        "start_time": str(time(19, 0)),
+        "location_id": test_location.id,
+        "organizer_id": test_organizer.id,
+        "ticket_capacity": 80,
+        "on_sale_at": "2030-06-01T10:00:00+02:00",
+    }
+    response = client_with_organizer.post("/api/events/", json=data)
+    assert response.status_code == status.HTTP_200_OK
+
+    # Stored as UTC, and bookings are refused from memory right away
+    event = db.query(Event).filter(Event.title == data["title"]).first()
+    assert event.on_sale_at == datetime(2030, 6, 1, 8, 0)
+    response = client_with_organizer.post(f"/api/bookings/event/{event.id}")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "Retry-After" in response.headers
+
+
 def test_create_event_success_organizer(
     client_with_organizer: TestClient, db, test_location, test_organizer
 ):
@@ -116,6 +139,7 @@ def test_delete_event_success_admin(client_with_superuser: TestClient, db, test_
     assert response.status_code == status.HTTP_200_OK
     assert response.json()["id"] == event_id
     assert response.json()["deleted_at"] is not None
+    assert response.json()["cancelled_bookings"] == 0
 
     event = db.query(Event).filter(Event.id == event_id).first()
     assert event.deleted_at is not None
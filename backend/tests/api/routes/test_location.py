@@ -89,6 +89,7 @@ def test_delete_location_success_admin(
     assert response.status_code == status.HTTP_200_OK
     assert response.json()["id"] == location_id
     assert response.json()["deleted_at"] is not None
+    assert response.json()["deleted_events"] == 0
 
     location = db.query(Location).filter(Location.id == location_id).first()
     assert location.deleted_at is not None
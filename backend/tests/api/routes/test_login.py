@@ -0,0 +1,115 @@
+import jwt
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.denylist import TokenDenylist
+from app.core.hashing import password_hasher
+from app.core.security import ALGORITHM
+from app.core.token_cache import verified_tokens
+from app.core.token_versions import token_versions
+from app.crud.user import update_user
+from app.schemas.user import UserUpdate
+from tests.conftest import engine
+
+
+def _login(client: TestClient, email: str) -> dict[str, str]:
+    response = client.post(
+        "/api/login", data={"username": email, "password": "Kennwort1"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def test_login_token_authenticates(client: TestClient, test_visitor):
+    headers = _login(client, test_visitor.email)
+
+    response = client.get("/api/bookings/me", headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    response = client.get("/api/users/me", headers=headers)
+    assert response.json()["id"] == test_visitor.id
+    assert verified_tokens.cache.stats()["hits"] == 1
+
+
+def test_password_change_revokes_token(client: TestClient, db, test_visitor):
+    headers = _login(client, test_visitor.email)
+    client.get("/api/bookings/me", headers=headers)
+
+    update_user(db=db, user=UserUpdate(password="Kennwort2"), user_id=test_visitor.id)
+    # Changed by another worker: refused once the cached version expires
+    token_versions.forget(test_visitor.id)
+    response = client.get("/api/bookings/me", headers=headers)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_role_change_revokes_token(client: TestClient, test_superuser, test_visitor):
+    visitor = _login(client, test_visitor.email)
+    admin = _login(client, test_superuser.email)
+
+    response = client.put(
+        f"/api/users/update/{test_visitor.id}", json={"role": "admin"}, headers=admin
+    )
+    assert response.status_code == status.HTTP_200_OK
+    response = client.get("/api/bookings/me", headers=visitor)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert verified_tokens.get(visitor["Authorization"].split()[1]) is None
+
+
+def test_logout_revokes_token(client: TestClient, test_visitor):
+    headers = _login(client, test_visitor.email)
+    other = _login(client, test_visitor.email)
+
+    response = client.post("/api/logout", headers=headers)
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    response = client.get("/api/bookings/me", headers=headers)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    response = client.get("/api/bookings/me", headers=other)
+    assert response.status_code == status.HTTP_200_OK
+
+    # Other workers pick the revocation up from the database
+    denylist = TokenDenylist(bind=engine, interval=1, bloom_bits=1 << 12)
+    denylist.tick()
+    assert len(denylist) == 1
+
+
+def test_token_without_version_rejected(client: TestClient, test_visitor):
+    token = jwt.encode(
+        {"sub": test_visitor.email, "role": "visitor"},
+        settings.SECRET_KEY,
+        algorithm=ALGORITHM,
+    )
+    headers = {"Authorization": f"Bearer {token}"}
+    response = client.get("/api/bookings/me", headers=headers)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_login_rejected_when_hashing_overloaded(
+    client: TestClient, test_visitor, monkeypatch
+):
+    monkeypatch.setattr(password_hasher, "max_pending", 0)
+
+    response = client.post(
+        "/api/login", data={"username": test_visitor.email, "password": "Kennwort1"}
+    )
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_login_throttled_before_authentication(
+    client: TestClient, test_visitor, monkeypatch
+):
+    def authenticate_user(**_):
+        raise AssertionError("throttled logins must not reach the database")
+
+    attempt = {"username": test_visitor.email, "password": "x"}
+    for _ in range(settings.LOGIN_THROTTLE_PER_EMAIL):
+        client.post("/api/login", data=attempt)
+    monkeypatch.setattr(
+        "app.api.routes.login.crud.authenticate_user", authenticate_user
+    )
+
+    response = client.post(
+        "/api/login", data={"username": test_visitor.email, "password": "Kennwort1"}
+    )
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert int(response.headers["Retry-After"]) > 0
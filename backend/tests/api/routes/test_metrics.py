@@ -0,0 +1,17 @@
+from fastapi import status
+from fastapi.testclient import TestClient
+
+
+def test_get_metrics_admin(client_with_superuser: TestClient, test_event):
+    client_with_superuser.put(
+        f"/api/events/{test_event.id}", json={"ticket_capacity": 60}
+    )
+    response = client_with_superuser.get("/api/metrics/")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["db_retries"]["event.update_event"]["calls"] >= 1
+    assert "idempotency" in response.json()["caches"]
+
+
+def test_get_metrics_unauthorized_visitor(client_with_visitor: TestClient):
+    response = client_with_visitor.get("/api/metrics/")
+    assert response.status_code == status.HTTP_403_FORBIDDEN
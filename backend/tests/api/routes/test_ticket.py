@@ -104,7 +104,7 @@ def test_delete_ticket_success_admin(
     response = client_with_superuser.delete(f"/api/tickets/{ticket_id}")
     assert response.status_code == status.HTTP_200_OK
     assert response.json()["id"] == ticket_id
-    assert db.query(Ticket).filter(Ticket.id == ticket_id).first() is None
+    assert db.query(Ticket).filter(Ticket.id == ticket_id).first().cancelled_at
 
 
 def test_delete_ticket_unauthorized_visitor(
@@ -132,3 +132,14 @@ def test_get_available_ticket_count_by_event(client: TestClient, test_event):
     assert response.status_code == status.HTTP_200_OK
     assert isinstance(response.json(), int)
     assert response.json() >= 0
+
+
+def test_create_ticket_idempotency_key_replays(
+    client_with_organizer: TestClient, db, test_event
+):
+    data = {"event_id": test_event.id, "seat_num": "B11", "price": 75.00}
+    headers = {"Idempotency-Key": "ticket-1"}
+    first = client_with_organizer.post("/api/tickets/", json=data, headers=headers)
+    retry = client_with_organizer.post("/api/tickets/", json=data, headers=headers)
+    assert first.json() == retry.json()
+    assert db.query(Ticket).filter(Ticket.seat_num == "B11").count() == 1
@@ -1,6 +1,8 @@
 from fastapi import status
 from fastapi.testclient import TestClient
 
+from app.core.config import settings
+from app.models.enums import UserRole
 from app.models.user import User
 
 
@@ -128,3 +130,59 @@ def test_update_user_missing(client_with_superuser: TestClient):
     response = client_with_superuser.put("/api/users/update/9999", json=data)
     assert response.status_code == status.HTTP_404_NOT_FOUND
     assert "User not found" in response.json()["detail"]
+
+
+def test_import_users_csv(client_with_superuser: TestClient, db, test_visitor):
+    csv = (
+        "username,email,password,role\n"
+        "AnnaA,anna@test.com,Kennwort1,organizer\n"
+        f"Taken,{test_visitor.email},Kennwort1,\n"
+        "Shrt,short@test.com,Kennwort1,\n"
+        "BennoB,ben@test.com,Kennwort1,\n"
+    )
+    response = client_with_superuser.post(
+        "/api/users/import", files={"file": ("users.csv", csv, "text/csv")}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    result = response.json()
+    assert result["created"] == 2
+    assert [error["line"] for error in result["errors"]] == [3, 4]
+    assert "already exists" in result["errors"][0]["error"]
+
+    user = db.query(User).filter(User.email == "ben@test.com").first()
+    assert user.role == UserRole.VISITOR
+
+
+def test_import_users_ndjson(client_with_superuser: TestClient):
+    ndjson = (
+        '{"username": "AnnaA", "email": "anna@test.com", "password": "Kennwort1"}\n'
+        "not json\n"
+    )
+    response = client_with_superuser.post(
+        "/api/users/import", files={"file": ("users.ndjson", ndjson)}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    result = response.json()
+    assert result["created"] == 1
+    assert result["errors"][0]["line"] == 2
+
+
+def test_import_users_too_many_rows(client_with_superuser: TestClient, monkeypatch):
+    monkeypatch.setattr(settings, "USER_IMPORT_MAX_ROWS", 1)
+    csv = (
+        "username,email,password\n"
+        "AnnaA,anna@test.com,Kennwort1\n"
+        "BennoB,ben@test.com,Kennwort1\n"
+    )
+    response = client_with_superuser.post(
+        "/api/users/import", files={"file": ("users.csv", csv)}
+    )
+    assert response.status_code == status.HTTP_413_CONTENT_TOO_LARGE
+    assert "app.import_users" in response.json()["detail"]
+
+
+def test_import_users_unauthorized_visitor(client_with_visitor: TestClient):
+    response = client_with_visitor.post(
+        "/api/users/import", files={"file": ("users.csv", "username,email\n")}
+    )
+    assert response.status_code == status.HTTP_403_FORBIDDEN
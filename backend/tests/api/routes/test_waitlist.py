@@ -0,0 +1,73 @@
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.core.admission import admission
+from app.models.booking import Booking
+from app.models.waitlist import WaitlistEntry
+
+
+def test_join_and_leave_waitlist(client_with_visitor: TestClient, db, test_event):
+    test_event.ticket_capacity = 0
+    db.commit()
+    url = f"/api/waitlist/event/{test_event.id}"
+
+    response = client_with_visitor.post(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["position"] == 0
+
+    response = client_with_visitor.get(url)
+    assert response.status_code == status.HTTP_200_OK
+
+    response = client_with_visitor.delete(url)
+    assert response.status_code == status.HTTP_200_OK
+    response = client_with_visitor.get(url)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_join_waitlist_not_sold_out(client_with_visitor: TestClient, test_event):
+    response = client_with_visitor.post(f"/api/waitlist/event/{test_event.id}")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_cancellation_promotes_waitlist(
+    client_with_visitor: TestClient, db, test_event, test_booking, test_organizer
+):
+    test_event.ticket_capacity = 1
+    db.add(WaitlistEntry(event_id=test_event.id, user_id=test_organizer.id, seq=1))
+    db.commit()
+
+    response = client_with_visitor.delete(
+        f"/api/bookings/me/{test_booking.booking_number}"
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    db.expire_all()
+    assert db.query(WaitlistEntry).count() == 0
+    booking = db.query(Booking).filter(Booking.cancelled_at.is_(None)).one()
+    assert booking.user_id == test_organizer.id
+
+
+def test_cancellation_keeps_event_closed_while_waitlisted(
+    client_with_visitor: TestClient,
+    db,
+    test_event,
+    test_booking,
+    test_organizer,
+    test_superuser,
+):
+    test_event.ticket_capacity = 1
+    for seq, user in enumerate((test_organizer, test_superuser), start=1):
+        db.add(WaitlistEntry(event_id=test_event.id, user_id=user.id, seq=seq))
+    db.commit()
+    admission.mark_sold_out(test_event.id)
+
+    response = client_with_visitor.delete(
+        f"/api/bookings/me/{test_booking.booking_number}"
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    # The freed ticket went to the head of the line, the rest still waits
+    db.expire_all()
+    booking = db.query(Booking).filter(Booking.cancelled_at.is_(None)).one()
+    assert booking.user_id == test_organizer.id
+    assert admission.is_sold_out(test_event.id)
@@ -7,6 +7,15 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.api.deps import get_current_user, get_db, get_token_data
+from app.core.admission import admission
+from app.core.api_keys import api_keys
+from app.core.denylist import token_denylist
+from app.core.idempotency import idempotency
+from app.core.login_throttle import login_throttle
+from app.core.on_sale import on_sale
+from app.core.token_cache import verified_tokens
+from app.core.token_versions import token_versions
+from app.core.user_cache import user_cache
 from app.database.session import Base
 from app.main import app
 from app.models.booking import Booking
@@ -28,6 +37,27 @@ TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engin
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
+def pytest_addoption(parser):
+    parser.addoption(
+        "--stress",
+        action="store_true",
+        help="Also run the concurrency stress tests (STRESS_DATABASE_URL).",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "stress: slow concurrency stress test")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--stress"):
+        return
+    skip = pytest.mark.skip(reason="needs --stress")
+    for item in items:
+        if "stress" in item.keywords:
+            item.add_marker(skip)
+
+
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
@@ -36,6 +66,8 @@ def hash_password(password: str) -> str:
 def db():
     """Creates a new database session and ensures tables exist."""
     Base.metadata.create_all(bind=engine)
+    # Ids are reused by the next test's fresh tables
+    user_cache.reset()
     session = TestingSessionLocal()
     try:
         yield session
@@ -53,7 +85,16 @@ def client(db):
         Base.metadata.create_all(bind=engine)
         yield db
 
+    app.dependency_overrides.clear()
     app.dependency_overrides[get_db] = override_get_db
+    admission.reset()
+    api_keys.reset()
+    idempotency.reset()
+    login_throttle.reset()
+    token_denylist.reset()
+    on_sale.reset()
+    token_versions.reset()
+    verified_tokens.reset()
     return TestClient(app)
 
 
@@ -141,6 +182,7 @@ def test_ticket(db, test_event):
         seat_num="A1",
         price=50,
     )
+    test_event.tickets_sold += 1
     db.add(ticket)
     db.commit()
     db.refresh(ticket)
@@ -168,7 +210,12 @@ def client_with_superuser(client, test_superuser):
         return test_superuser
 
     def override_get_token_data():
-        return TokenData(username=test_superuser.email, role=UserRole.ADMIN.value)
+        return TokenData(
+            username=test_superuser.email,
+            role=UserRole.ADMIN.value,
+            user_id=test_superuser.id,
+            version=test_superuser.token_version,
+        )
 
     app.dependency_overrides[get_current_user] = override_get_current_user
     app.dependency_overrides[get_token_data] = override_get_token_data
@@ -183,7 +230,12 @@ def client_with_organizer(client, test_organizer):
         return test_organizer
 
     def override_get_token_data():
-        return TokenData(username=test_organizer.email, role=UserRole.ORGANIZER.value)
+        return TokenData(
+            username=test_organizer.email,
+            role=UserRole.ORGANIZER.value,
+            user_id=test_organizer.id,
+            version=test_organizer.token_version,
+        )
 
     app.dependency_overrides[get_current_user] = override_get_current_user
     app.dependency_overrides[get_token_data] = override_get_token_data
@@ -198,7 +250,12 @@ def client_with_visitor(client, test_visitor):
         return test_visitor
 
     def override_get_token_data():
-        return TokenData(username=test_visitor.email, role=UserRole.VISITOR.value)
+        return TokenData(
+            username=test_visitor.email,
+            role=UserRole.VISITOR.value,
+            user_id=test_visitor.id,
+            version=test_visitor.token_version,
+        )
 
     app.dependency_overrides[get_current_user] = override_get_current_user
     app.dependency_overrides[get_token_data] = override_get_token_data
@@ -0,0 +1,80 @@
+import asyncio
+import time
+
+from app.core.admission import AdmissionQueue
+
+
+def test_admits_up_to_max_active():
+    queue = AdmissionQueue(max_active=2, token_ttl=30, sold_out_ttl=5)
+    assert queue.try_admit(1, owner=7).admitted
+    assert queue.try_admit(1, owner=7).admitted
+
+    result = queue.try_admit(1, owner=7)
+    assert not result.admitted
+    assert result.position == 0
+    # Other events have their own limit
+    assert queue.try_admit(2, owner=7).admitted
+
+
+def test_waiting_line_is_fifo():
+    queue = AdmissionQueue(max_active=1, token_ttl=30, sold_out_ttl=5)
+    assert queue.try_admit(1, owner=7).admitted
+    first = queue.try_admit(1, owner=7).ticket
+    second = queue.try_admit(1, owner=7).ticket
+    assert queue.status(second) == (1, False)
+
+    queue.release(1)
+    # A newcomer without a token cannot jump the line
+    assert not queue.try_admit(1, owner=7).admitted
+    assert queue.status(first) == (0, True)
+    assert not queue.try_admit(1, owner=7, token=second.token).admitted
+    assert queue.try_admit(1, owner=7, token=first.token).admitted
+    assert queue.get_ticket(first.token, owner=7) is None
+
+
+def test_tokens_only_count_for_their_owner():
+    queue = AdmissionQueue(max_active=1, token_ttl=30, sold_out_ttl=5)
+    assert queue.try_admit(1, owner=7).admitted
+    ticket = queue.try_admit(1, owner=8).ticket
+    queue.release(1)
+
+    assert queue.get_ticket(ticket.token, owner=9) is None
+    assert not queue.try_admit(1, owner=9, token=ticket.token).admitted
+    assert queue.try_admit(1, owner=8, token=ticket.token).admitted
+
+
+def test_reading_a_dropped_line_does_not_recreate_it():
+    queue = AdmissionQueue(max_active=1, token_ttl=30, sold_out_ttl=5)
+    assert queue.try_admit(1, owner=7).admitted
+    ticket = queue.try_admit(1, owner=7).ticket
+    queue.release(1)
+    assert queue.try_admit(1, owner=7, token=ticket.token).admitted
+    queue.release(1)
+
+    assert queue.status(ticket) is None
+    assert asyncio.run(queue.wait(ticket, 0.1)) is None
+    assert queue.get_ticket(ticket.token, owner=7) is None
+    assert 1 not in queue._lines
+
+
+def test_abandoned_tokens_expire():
+    queue = AdmissionQueue(max_active=1, token_ttl=0.01, sold_out_ttl=5)
+    assert queue.try_admit(1, owner=7).admitted
+    abandoned = queue.try_admit(1, owner=7).ticket
+    queue.release(1)
+    time.sleep(0.02)
+
+    assert queue.try_admit(1, owner=7).admitted
+    assert queue.get_ticket(abandoned.token, owner=7) is None
+
+
+def test_sold_out_marks_expire():
+    queue = AdmissionQueue(max_active=1, token_ttl=30, sold_out_ttl=0.01)
+    queue.mark_sold_out(1)
+    assert queue.is_sold_out(1)
+    time.sleep(0.02)
+    assert not queue.is_sold_out(1)
+
+    queue.mark_sold_out(1)
+    queue.reopen(1)
+    assert not queue.is_sold_out(1)
@@ -0,0 +1,27 @@
+import time
+
+from app.core.cache import TTLCache
+
+
+def test_evicts_least_recently_used():
+    cache = TTLCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats() == {"size": 2, "hits": 3, "misses": 1, "evictions": 1}
+
+
+def test_entries_expire():
+    cache = TTLCache(max_size=10, ttl=60)
+    cache.set("a", 1, ttl=0.01)
+    cache.set("b", 2)
+    time.sleep(0.02)
+
+    assert cache.get("a", "gone") == "gone"
+    assert cache.get("b") == 2
+    assert len(cache) == 1
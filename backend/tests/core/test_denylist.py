@@ -0,0 +1,58 @@
+import secrets
+from datetime import timedelta
+
+from sqlalchemy.orm import Session
+
+from app.core.clock import utcnow
+from app.core.denylist import BloomFilter, TokenDenylist
+from app.crud.revoked_token import revoke_token
+from app.models.revoked_token import RevokedToken
+from tests.conftest import engine
+
+
+def _denylist() -> TokenDenylist:
+    return TokenDenylist(bind=engine, interval=1, bloom_bits=1 << 12)
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(bits=1 << 12, hashes=7)
+    members = [int(secrets.token_hex(16), 16) for _ in range(100)]
+    for member in members:
+        bloom.add(member)
+
+    assert all(member in bloom for member in members)
+    others = [int(secrets.token_hex(16), 16) for _ in range(1000)]
+    assert sum(other in bloom for other in others) < 50
+
+
+def test_is_revoked():
+    denylist = _denylist()
+    jti = secrets.token_hex(16)
+    denylist.add(jti, utcnow() + timedelta(hours=1))
+
+    assert denylist.is_revoked(jti)
+    assert not denylist.is_revoked(secrets.token_hex(16))
+    assert denylist.is_revoked("not-hex")
+
+
+def test_tick_syncs_revocations_from_other_workers(db: Session):
+    denylist = _denylist()
+    denylist.tick()
+    revoked, expired = secrets.token_hex(16), secrets.token_hex(16)
+    revoke_token(db=db, jti=revoked, expires_at=utcnow() + timedelta(hours=1))
+    revoke_token(db=db, jti=expired, expires_at=utcnow() - timedelta(seconds=1))
+
+    assert denylist.tick() == 1
+    assert denylist.is_revoked(revoked)
+    assert not denylist.is_revoked(expired)
+    assert db.query(RevokedToken).count() == 1
+
+
+def test_tick_drops_expired_entries(db: Session):
+    denylist = _denylist()
+    jti = secrets.token_hex(16)
+    denylist.add(jti, utcnow() - timedelta(seconds=1))
+
+    denylist.tick()
+    assert len(denylist) == 0
+    assert not denylist.is_revoked(jti)
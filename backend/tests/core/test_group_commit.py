@@ -0,0 +1,33 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy.orm import Session
+
+from app.core.group_commit import BookingBatcher
+from app.exceptions.ticket import NoTicketsAvailableException
+from app.models.booking import Booking
+from tests.conftest import TestingSessionLocal
+
+
+def test_concurrent_bookings_share_one_batch(db: Session, test_visitor, test_event):
+    test_event.ticket_capacity = 2
+    db.commit()
+    batcher = BookingBatcher(window=1.0, max_batch=3)
+
+    def book():
+        with TestingSessionLocal() as session:
+            try:
+                return batcher.book(
+                    db=session, event_id=test_event.id, user_id=test_visitor.id
+                )
+            except NoTicketsAvailableException as e:
+                return e
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        results = list(pool.map(lambda _: book(), range(3)))
+
+    bookings = [r for r in results if not isinstance(r, Exception)]
+    assert len(bookings) == 2
+    assert sum(isinstance(r, NoTicketsAvailableException) for r in results) == 1
+    assert {b.ticket_id for b in bookings} == {
+        b.ticket_id for b in db.query(Booking).all()
+    }
@@ -0,0 +1,59 @@
+import pytest
+
+from app.calibrate_password_hash import calibrate
+from app.core.hashing import PasswordHasher
+from app.core.security import make_pwd_context
+from app.exceptions.security import PasswordHashingOverloadedException
+
+
+def test_hashes_in_worker_processes():
+    hasher = PasswordHasher(workers=1, max_pending=4)
+    hasher.start()
+    try:
+        hashed = hasher.hash("Kennwort1")
+        assert hasher.verify("Kennwort1", hashed)
+        assert not hasher.verify("Kennwort2", hashed)
+        assert hasher.stats() == {"workers": 1, "pending": 0, "rejected": 0}
+    finally:
+        hasher.stop()
+
+
+def test_hash_many_in_worker_processes():
+    hasher = PasswordHasher(workers=2, max_pending=4)
+    hasher.start()
+    try:
+        passwords = [f"Kennwort{i}" for i in range(5)]
+        hashes = hasher.hash_many(passwords)
+        assert all(map(hasher.verify, passwords, hashes))
+        assert hasher.stats()["pending"] == 0
+    finally:
+        hasher.stop()
+
+
+def test_hashes_inline_until_started():
+    hasher = PasswordHasher(workers=1, max_pending=4)
+
+    assert hasher.verify("Kennwort1", hasher.hash("Kennwort1"))
+    assert hasher.stats()["workers"] == 0
+
+
+def test_rejects_beyond_max_pending():
+    hasher = PasswordHasher(workers=0, max_pending=0)
+
+    with pytest.raises(PasswordHashingOverloadedException):
+        hasher.hash("Kennwort1")
+    assert hasher.stats()["rejected"] == 1
+
+
+def test_policy_migrates_other_schemes_and_costs():
+    old = make_pwd_context("scrypt", scrypt__rounds=10).hash("Kennwort1")
+    pwd_context = make_pwd_context("bcrypt", bcrypt__rounds=4)
+
+    verified, new_hash = pwd_context.verify_and_update("Kennwort1", old)
+    assert verified
+    assert new_hash.startswith("$2b$04$")
+    assert pwd_context.verify_and_update("Kennwort1", new_hash) == (True, None)
+
+
+def test_calibrate_picks_lowest_cost_for_tiny_budget():
+    assert calibrate("bcrypt", target=0) == 4
@@ -0,0 +1,48 @@
+from sqlalchemy.orm import Session
+
+from app.core.admission import admission
+from app.core.hold_sweeper import HoldSweeper
+from app.crud.hold import create_hold
+from app.crud.inventory import get_available_count
+from app.models.booking import Booking
+from app.models.waitlist import WaitlistEntry
+from tests.conftest import engine
+
+
+def test_tick_releases_expired_holds(db: Session, test_event, test_visitor):
+    create_hold(
+        db=db,
+        event_id=test_event.id,
+        user_id=test_visitor.id,
+        quantity=2,
+        ttl_seconds=-1,
+    )
+    admission.mark_sold_out(test_event.id)
+
+    assert HoldSweeper(bind=engine, interval=1).tick() == {test_event.id: 2}
+    db.expire_all()
+    assert get_available_count(db=db, event_id=test_event.id) == 50
+    assert not admission.is_sold_out(test_event.id)
+
+
+def test_tick_promotes_waitlist(db: Session, test_event, test_visitor, test_organizer):
+    test_event.ticket_capacity = 2
+    db.commit()
+    create_hold(
+        db=db,
+        event_id=test_event.id,
+        user_id=test_visitor.id,
+        quantity=2,
+        ttl_seconds=-1,
+    )
+    db.add(WaitlistEntry(event_id=test_event.id, user_id=test_organizer.id, seq=1))
+    db.commit()
+    admission.mark_sold_out(test_event.id)
+
+    HoldSweeper(bind=engine, interval=1).tick()
+    db.expire_all()
+    booking = db.query(Booking).one()
+    assert booking.user_id == test_organizer.id
+    assert db.query(WaitlistEntry).count() == 0
+    assert get_available_count(db=db, event_id=test_event.id) == 1
+    assert not admission.is_sold_out(test_event.id)
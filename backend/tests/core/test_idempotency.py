@@ -0,0 +1,119 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.core.clock import utcnow
+from app.core.idempotency import IdempotencyStore
+from app.exceptions.idempotency import IdempotencyKeyReuseException
+from app.models.idempotency import IdempotencyKey
+from app.schemas.booking import BookingBatchCreate
+from tests.conftest import TestingSessionLocal
+
+
+def test_concurrent_duplicates_wait_for_first_request(db: Session):
+    store = IdempotencyStore(ttl=60, cache_size=10, wait=5, pending_timeout=30)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def handler():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return [1, 2]
+
+    def run():
+        with TestingSessionLocal() as session:
+            return store.run(
+                db=session,
+                key="k",
+                scope="1:POST /x",
+                handler=handler,
+                response_model=list[int],
+            )
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        first = pool.submit(run)
+        started.wait(5)
+        duplicates = [pool.submit(run) for _ in range(2)]
+        release.set()
+        results = [first.result()] + [f.result() for f in duplicates]
+
+    assert len(calls) == 1
+    assert results == [[1, 2]] * 3
+    assert db.query(IdempotencyKey).one().response == [1, 2]
+
+
+def test_replay_from_db_and_body_mismatch(db: Session):
+    store = IdempotencyStore(ttl=60, cache_size=10, wait=5, pending_timeout=30)
+    body = BookingBatchCreate(quantity=2)
+
+    def run(request):
+        return store.run(
+            db=db,
+            key="k",
+            scope="1:POST /x",
+            handler=lambda: request.quantity,
+            response_model=int,
+            request=request,
+        )
+
+    assert run(body) == 2
+    store.reset()
+    assert run(BookingBatchCreate(quantity=2)) == 2
+    assert store.cache.stats()["misses"] == 1
+
+    with pytest.raises(IdempotencyKeyReuseException):
+        run(BookingBatchCreate(quantity=3))
+
+
+def test_stale_pending_key_is_claimed_again(db: Session):
+    store = IdempotencyStore(ttl=60, cache_size=10, wait=0.1, pending_timeout=30)
+    cache_key = store._cache_key("k", "1:POST /x")
+    # The first request's worker died before it stored a response
+    db.add(
+        IdempotencyKey(
+            key=cache_key,
+            request_hash="",
+            created_at=utcnow() - timedelta(seconds=31),
+        )
+    )
+    db.commit()
+    assert store.lookup(db=db, key="k", scope="1:POST /x") is None
+
+    result = store.run(
+        db=db, key="k", scope="1:POST /x", handler=lambda: 1, response_model=int
+    )
+    assert result == 1
+    store.reset()
+    assert store.lookup(db=db, key="k", scope="1:POST /x").body == 1
+
+
+def test_purge_deletes_expired_and_stale_pending_keys(db: Session):
+    store = IdempotencyStore(ttl=60, cache_size=10, wait=5, pending_timeout=30)
+    now = utcnow()
+    db.add_all(
+        [
+            IdempotencyKey(key="done", request_hash="", response=1, created_at=now),
+            IdempotencyKey(key="running", request_hash="", created_at=now),
+            IdempotencyKey(
+                key="stale",
+                request_hash="",
+                created_at=now - timedelta(seconds=31),
+            ),
+            IdempotencyKey(
+                key="expired",
+                request_hash="",
+                response=1,
+                created_at=now - timedelta(seconds=61),
+            ),
+        ]
+    )
+    db.commit()
+
+    assert store.purge(db=db) == 2
+    keys = {db_key.key for db_key in db.query(IdempotencyKey)}
+    assert keys == {"done", "running"}
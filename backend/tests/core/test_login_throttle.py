@@ -0,0 +1,92 @@
+import time
+import uuid
+
+import pytest
+
+from app.core.login_throttle import LoginThrottle
+from app.exceptions.security import LoginThrottledException
+
+
+def _throttle(**kwargs) -> LoginThrottle:
+    options = {"window": 60, "per_email": 2, "per_address": 3, "slots": 64}
+    return LoginThrottle(**(options | kwargs))
+
+
+def test_limits_attempts_per_email():
+    throttle = _throttle()
+    throttle.hit(email="a@example.com", address=None)
+    throttle.hit(email="A@example.com", address=None)
+
+    with pytest.raises(LoginThrottledException) as e:
+        throttle.hit(email="a@example.com", address=None)
+    assert 0 < e.value.retry_after <= 60
+    throttle.hit(email="b@example.com", address=None)
+    assert throttle.stats()["rejected"] == 1
+
+
+def test_limits_attempts_per_address():
+    throttle = _throttle()
+    for i in range(3):
+        throttle.hit(email=f"{i}@example.com", address="10.0.0.1")
+
+    with pytest.raises(LoginThrottledException):
+        throttle.hit(email="3@example.com", address="10.0.0.1")
+    throttle.hit(email="3@example.com", address="10.0.0.2")
+
+
+def test_refused_attempt_is_not_counted():
+    throttle = _throttle(per_email=1, per_address=1)
+    throttle.hit(email="a@example.com", address="10.0.0.1")
+
+    # Refused for the address, which must not count against b's email
+    with pytest.raises(LoginThrottledException):
+        throttle.hit(email="b@example.com", address="10.0.0.1")
+    throttle.hit(email="b@example.com", address="10.0.0.2")
+
+
+def test_window_slides():
+    throttle = _throttle(window=0.1)
+    throttle.hit(email="a@example.com", address=None)
+    throttle.hit(email="a@example.com", address=None)
+    time.sleep(0.21)
+
+    throttle.hit(email="a@example.com", address=None)
+
+
+def test_stalest_slot_reused_when_full():
+    throttle = _throttle(slots=1)
+    throttle.hit(email="a@example.com", address=None)
+    throttle.hit(email="a@example.com", address=None)
+
+    # The only slot now counts b, so a starts over
+    throttle.hit(email="b@example.com", address=None)
+    throttle.hit(email="a@example.com", address=None)
+
+
+def test_workers_share_counts():
+    name = f"test-login-throttle-{uuid.uuid4().hex[:8]}"
+    first, second = _throttle(name=name), _throttle(name=name)
+    try:
+        first.hit(email="a@example.com", address=None)
+        second.hit(email="a@example.com", address=None)
+        with pytest.raises(LoginThrottledException):
+            first.hit(email="a@example.com", address=None)
+    finally:
+        shm = first._shm
+        first.close()
+        second.close()
+        shm.unlink()
+
+
+def test_segment_with_other_slot_count_is_replaced():
+    name = f"test-login-throttle-{uuid.uuid4().hex[:8]}"
+    old = _throttle(name=name, slots=4)
+    new = _throttle(name=name, slots=64)
+    try:
+        new.hit(email="a@example.com", address="10.0.0.1")
+        assert new._shm.size == 64 * 24
+    finally:
+        old.close()
+        shm = new._shm
+        new.close()
+        shm.unlink()
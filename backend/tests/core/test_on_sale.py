@@ -0,0 +1,47 @@
+from datetime import timedelta
+
+from sqlalchemy.orm import Session
+
+from app.core.clock import utcnow
+from app.core.on_sale import OnSaleScheduler
+from tests.conftest import engine
+
+
+def _scheduler() -> OnSaleScheduler:
+    return OnSaleScheduler(
+        bind=engine, interval=1, lead=30, warm_connections=2, cache_ttl=1
+    )
+
+
+def test_tick_warms_events_going_on_sale(db: Session, test_event):
+    test_event.on_sale_at = utcnow() + timedelta(seconds=10)
+    db.commit()
+    scheduler = _scheduler()
+
+    assert scheduler.tick() == [test_event.id]
+    assert scheduler.pending(test_event.id) is not None
+    assert scheduler.events.get(test_event.id)["title"] == test_event.title
+    assert scheduler.availability.get(test_event.id) == 50
+    # Warmed once per on-sale time
+    assert scheduler.tick() == []
+
+
+def test_tick_skips_events_outside_lead(db: Session, test_event):
+    test_event.on_sale_at = utcnow() + timedelta(hours=1)
+    db.commit()
+    scheduler = _scheduler()
+
+    assert scheduler.tick() == []
+    assert scheduler.pending(test_event.id) is not None
+    assert scheduler.events.get(test_event.id) is None
+
+
+def test_schedule_and_forget():
+    scheduler = _scheduler()
+    scheduler.schedule(1, utcnow() + timedelta(minutes=1))
+    scheduler.schedule(2, utcnow() - timedelta(seconds=1))
+    assert scheduler.pending(1) is not None
+    assert scheduler.pending(2) is None
+
+    scheduler.forget(1)
+    assert scheduler.pending(1) is None
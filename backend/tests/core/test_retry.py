@@ -0,0 +1,118 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.core.retry import Retrier, RetryBudget, is_transient
+from app.exceptions.db import (
+    TransientDatabaseException,
+    UncommittedChangesException,
+)
+from app.models.location import Location
+
+
+class FakeDBError(Exception):
+    def __init__(self, sqlstate: str):
+        super().__init__(f"sqlstate {sqlstate}")
+        self.sqlstate = sqlstate
+
+
+def _error(sqlstate: str) -> OperationalError:
+    return OperationalError("UPDATE events ...", {}, FakeDBError(sqlstate))
+
+
+def _retrier(attempts: int = 3, budget: float = 10) -> Retrier:
+    return Retrier(
+        attempts=attempts,
+        base_delay=0,
+        max_delay=0,
+        budget=RetryBudget(ratio=0.1, min_per_second=budget),
+    )
+
+
+def _failing(errors: list):
+    def operation(*, db: Session):
+        if errors:
+            raise errors.pop(0)
+        return "done"
+
+    return operation
+
+
+def test_is_transient():
+    assert is_transient(_error("40001"))
+    assert is_transient(_error("40P01"))
+    assert is_transient(_error("55P03"))
+    assert not is_transient(_error("23505"))
+
+
+def test_retries_transient_errors(db: Session):
+    retrier = _retrier()
+    operation = _failing([_error("40001"), _error("40P01")])
+
+    assert retrier.run("booking.book_tickets", operation, db=db) == "done"
+    assert retrier.stats() == {
+        "booking.book_tickets": {"calls": 1, "retries": 2, "recovered": 1}
+    }
+
+
+def test_does_not_retry_other_errors(db: Session):
+    retrier = _retrier()
+    with pytest.raises(OperationalError):
+        retrier.run("booking.book_tickets", _failing([_error("23505")]), db=db)
+    assert "retries" not in retrier.stats()["booking.book_tickets"]
+
+
+def test_gives_up_after_attempts(db: Session):
+    retrier = _retrier(attempts=1)
+    operation = _failing([_error("40001"), _error("40001")])
+
+    with pytest.raises(TransientDatabaseException):
+        retrier.run("booking.book_tickets", operation, db=db)
+    assert retrier.stats()["booking.book_tickets"]["exhausted"] == 1
+
+
+def test_retry_budget(db: Session):
+    retrier = _retrier(budget=1)
+    retrier.run("booking.book_tickets", _failing([_error("40001")]), db=db)
+
+    # The only token is spent; the next transient failure is not retried
+    with pytest.raises(TransientDatabaseException):
+        retrier.run("booking.book_tickets", _failing([_error("40001")]), db=db)
+    assert retrier.stats()["booking.book_tickets"]["budget_exhausted"] == 1
+
+
+def test_nested_operations_retry_once(db: Session):
+    retrier = _retrier()
+    inner = _failing([_error("40001")])
+
+    def outer(*, db: Session):
+        return retrier.run("booking.book_ticket", inner, db=db)
+
+    assert retrier.run("booking.book_tickets", outer, db=db) == "done"
+    assert "booking.book_ticket" not in retrier.stats()
+    assert retrier.stats()["booking.book_tickets"]["retries"] == 1
+
+
+def test_isolation_level(db: Session):
+    retrier = _retrier()
+    retrier.isolation_levels = {"booking.book_tickets": "READ UNCOMMITTED"}
+
+    def operation(*, db: Session):
+        return db.connection().get_isolation_level()
+
+    assert retrier.run("booking.book_tickets", operation, db=db) == "READ UNCOMMITTED"
+
+
+def test_refuses_sessions_with_uncommitted_changes(db: Session):
+    retrier = _retrier()
+    operation = _failing([])
+    db.add(Location(name="Hall", address="Main Street 1"))
+    with pytest.raises(UncommittedChangesException):
+        retrier.run("booking.book_tickets", operation, db=db)
+
+    db.flush()
+    with pytest.raises(UncommittedChangesException):
+        retrier.run("booking.book_tickets", operation, db=db)
+
+    db.commit()
+    assert retrier.run("booking.book_tickets", operation, db=db) == "done"
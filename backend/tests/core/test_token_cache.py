@@ -0,0 +1,33 @@
+import time
+
+from app.core.token_cache import VerifiedTokenCache
+from app.schemas.token import TokenData
+
+CLAIMS = TokenData(username="visitor@example.com", role="visitor", user_id=1, version=0)
+
+
+def test_memoizes_until_exp():
+    cache = VerifiedTokenCache(max_size=10)
+    cache.put("token", CLAIMS, exp=time.time() + 0.05)
+
+    assert cache.get("token") is CLAIMS
+    assert cache.get("other") is None
+    time.sleep(0.06)
+    assert cache.get("token") is None
+
+
+def test_skips_expired_and_unbounded_tokens():
+    cache = VerifiedTokenCache(max_size=10)
+    cache.put("expired", CLAIMS, exp=time.time() - 1)
+    cache.put("forever", CLAIMS, exp=None)
+
+    assert cache.get("expired") is None
+    assert cache.get("forever") is None
+
+
+def test_forget():
+    cache = VerifiedTokenCache(max_size=10)
+    cache.put("token", CLAIMS, exp=time.time() + 60)
+    cache.forget("token")
+
+    assert cache.get("token") is None
@@ -0,0 +1,46 @@
+from sqlalchemy.orm import Session
+
+from app.core.user_cache import UserCache, user_cache
+from app.crud.user import authenticate_user, update_user
+from app.schemas.user import UserUpdate
+
+
+def test_get_caches_snapshot(db: Session, test_visitor):
+    cache = UserCache(max_size=10, ttl=60)
+
+    first = cache.get(db=db, user_id=test_visitor.id)
+    assert first.email == test_visitor.email
+    assert cache.get(db=db, user_id=test_visitor.id) is first
+    assert cache.get_by_email(db=db, email=test_visitor.email) is first
+    assert cache.stats()["hits"] == 2
+
+
+def test_unknown_users_not_cached(db: Session):
+    cache = UserCache(max_size=10, ttl=60)
+
+    assert cache.get(db=db, user_id=999) is None
+    assert cache.get_by_email(db=db, email="nobody@example.com") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_evicts_beyond_max_size(db: Session, test_visitor, test_organizer):
+    cache = UserCache(max_size=1, ttl=60)
+
+    cache.get(db=db, user_id=test_visitor.id)
+    cache.get(db=db, user_id=test_organizer.id)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_update_user_invalidates(db: Session, test_visitor):
+    authenticate_user(db=db, email=test_visitor.email, password="Kennwort1")
+    update_user(
+        db=db,
+        user=UserUpdate(email="renamed@example.com", password="Kennwort2"),
+        user_id=test_visitor.id,
+    )
+
+    assert authenticate_user(db=db, email="renamed@example.com", password="Kennwort2")
+    assert not authenticate_user(
+        db=db, email=test_visitor.email, password="Kennwort1"
+    )
+    assert user_cache.get(db=db, user_id=test_visitor.id).token_version == 1
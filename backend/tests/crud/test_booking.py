@@ -1,7 +1,12 @@
 import pytest
 from sqlalchemy.orm import Session
 
+from app.core.clock import utcnow
 from app.crud.booking import (
+    book_ticket,
+    book_tickets,
+    book_tickets_for_users,
+    checkout_cart,
     create_booking,
     delete_booking,
     get_all_bookings,
@@ -11,9 +16,18 @@ from app.crud.booking import (
     get_bookings_by_user,
     update_booking,
 )
-from app.crud.ticket import create_ticket
-from app.exceptions.booking import MissingBookingException
+from app.crud.inventory import sync_seats
+from app.crud.ticket import (
+    create_ticket,
+    get_available_ticket_count_by_event,
+    get_available_tickets_by_event,
+)
+from app.exceptions.booking import CartItemSoldOutException, MissingBookingException
+from app.exceptions.event import MissingEventException
+from app.exceptions.ticket import NoTicketsAvailableException
 from app.models.booking import Booking
+from app.models.event import Event
+from app.models.ticket import Ticket
 from app.schemas.booking import BookingCreate, BookingUpdate
 from app.schemas.ticket import TicketCreate
 
@@ -63,6 +77,172 @@ def test_create_booking_success(db: Session, test_visitor, test_event):
     assert result.ticket_id == new_ticket.id
 
 
+def test_book_ticket_success(db: Session, test_visitor, test_event):
+    result = book_ticket(db=db, event_id=test_event.id, user_id=test_visitor.id)
+    assert result.user_id == test_visitor.id
+    ticket = db.query(Ticket).filter(Ticket.id == result.ticket_id).first()
+    assert ticket.event_id == test_event.id
+    assert ticket.seat_num == f"{test_event.title}-{ticket.id}"
+
+
+def test_book_ticket_preallocated(db: Session, test_visitor, test_event):
+    test_event.ticket_capacity = 2
+    test_event.seats_preallocated = True
+    sync_seats(db=db, db_event=test_event)
+    db.commit()
+
+    first = book_ticket(db=db, event_id=test_event.id, user_id=test_visitor.id)
+    second = book_ticket(db=db, event_id=test_event.id, user_id=test_visitor.id)
+    assert {first.ticket.seat_num, second.ticket.seat_num} == {"1", "2"}
+    assert get_available_tickets_by_event(db=db, event_id=test_event.id) == []
+    with pytest.raises(NoTicketsAvailableException):
+        book_ticket(db=db, event_id=test_event.id, user_id=test_visitor.id)
+
+    delete_booking(db=db, booking_number=first.booking_number)
+    seats = get_available_tickets_by_event(db=db, event_id=test_event.id)
+    assert [seat.id for seat in seats] == [first.ticket_id]
+    assert get_available_ticket_count_by_event(db=db, event_id=test_event.id) == 1
+
+    # The cancelled booking keeps its row but no longer blocks the seat
+    third = book_ticket(db=db, event_id=test_event.id, user_id=test_visitor.id)
+    assert third.ticket_id == first.ticket_id
+
+
+def test_sync_seats_numbers_after_highest_seat(db: Session, test_event):
+    test_event.ticket_capacity = 3
+    test_event.seats_preallocated = True
+    sync_seats(db=db, db_event=test_event)
+    db.query(Ticket).filter(Ticket.seat_num == "3").update({"sold_at": utcnow()})
+
+    # Shrinking deletes the unsold seats below the sold one
+    test_event.ticket_capacity = 1
+    sync_seats(db=db, db_event=test_event)
+    test_event.ticket_capacity = 3
+    sync_seats(db=db, db_event=test_event)
+    db.commit()
+
+    seat_nums = [ticket.seat_num for ticket in db.query(Ticket).order_by(Ticket.id)]
+    assert seat_nums == ["3", "4", "5"]
+
+
+def test_sync_seats_compares_seat_numbers_as_numbers(db: Session, test_event):
+    test_event.ticket_capacity = 10
+    test_event.seats_preallocated = True
+    sync_seats(db=db, db_event=test_event)
+    db.query(Ticket).filter(Ticket.seat_num.in_(["9", "10"])).update(
+        {"sold_at": utcnow()}
+    )
+
+    test_event.ticket_capacity = 2
+    sync_seats(db=db, db_event=test_event)
+    test_event.ticket_capacity = 3
+    sync_seats(db=db, db_event=test_event)
+    db.commit()
+
+    seat_nums = [ticket.seat_num for ticket in db.query(Ticket).order_by(Ticket.id)]
+    assert seat_nums == ["9", "10", "11"]
+
+
+def test_book_ticket_keeps_event_updated_at(db: Session, test_visitor, test_event):
+    updated_at = test_event.updated_at
+    book_ticket(db=db, event_id=test_event.id, user_id=test_visitor.id)
+    book_tickets(db=db, event_id=test_event.id, user_id=test_visitor.id, quantity=2)
+    db.refresh(test_event)
+    assert test_event.tickets_sold == 3
+    assert test_event.updated_at == updated_at
+
+
+def test_book_tickets_batch(db: Session, test_visitor, test_event):
+    result = book_tickets(
+        db=db, event_id=test_event.id, user_id=test_visitor.id, quantity=5
+    )
+    assert len(result) == 5
+    assert len({booking.ticket_id for booking in result}) == 5
+    assert all(booking.user_id == test_visitor.id for booking in result)
+    assert all(
+        booking.ticket.seat_num == f"{test_event.title}-{booking.ticket_id}"
+        for booking in result
+    )
+    assert get_available_ticket_count_by_event(db=db, event_id=test_event.id) == 45
+
+
+def test_book_tickets_batch_all_or_nothing(db: Session, test_visitor, test_event):
+    test_event.ticket_capacity = 3
+    db.commit()
+    with pytest.raises(NoTicketsAvailableException):
+        book_tickets(db=db, event_id=test_event.id, user_id=test_visitor.id, quantity=4)
+    assert db.query(Booking).count() == 0
+    assert get_available_ticket_count_by_event(db=db, event_id=test_event.id) == 3
+
+
+def test_book_tickets_for_users(
+    db: Session, test_visitor, test_organizer, test_superuser, test_event
+):
+    test_event.ticket_capacity = 2
+    db.commit()
+    user_ids = [test_visitor.id, test_organizer.id, test_superuser.id]
+    result = book_tickets_for_users(db=db, event_id=test_event.id, user_ids=user_ids)
+    assert [booking.user_id for booking in result[:2]] == user_ids[:2]
+    assert result[2] is None
+    assert get_available_ticket_count_by_event(db=db, event_id=test_event.id) == 0
+
+
+def _second_event(db: Session, test_event, **values):
+    db_event = Event(
+        title="Second Event",
+        event_date=test_event.event_date,
+        start_time=test_event.start_time,
+        location_id=test_event.location_id,
+        organizer_id=test_event.organizer_id,
+        **values,
+    )
+    db.add(db_event)
+    db.flush()
+    if db_event.seats_preallocated:
+        sync_seats(db=db, db_event=db_event)
+    db.commit()
+    return db_event
+
+
+def test_checkout_cart(db: Session, test_visitor, test_event):
+    second = _second_event(db, test_event, ticket_capacity=3, seats_preallocated=True)
+    result = checkout_cart(
+        db=db, user_id=test_visitor.id, items={second.id: 2, test_event.id: 1}
+    )
+    assert [booking.ticket.event_id for booking in result] == [
+        test_event.id,
+        second.id,
+        second.id,
+    ]
+    assert get_available_ticket_count_by_event(db=db, event_id=test_event.id) == 49
+    assert get_available_ticket_count_by_event(db=db, event_id=second.id) == 1
+
+
+def test_checkout_cart_all_or_nothing(db: Session, test_visitor, test_event):
+    second = _second_event(db, test_event, ticket_capacity=1)
+    with pytest.raises(CartItemSoldOutException) as error:
+        checkout_cart(
+            db=db, user_id=test_visitor.id, items={test_event.id: 2, second.id: 2}
+        )
+    assert error.value.event_id == second.id
+    assert db.query(Booking).count() == 0
+    assert get_available_ticket_count_by_event(db=db, event_id=test_event.id) == 50
+
+
+def test_book_ticket_sold_out(db: Session, test_visitor, test_event, test_ticket):
+    _ = test_ticket
+    test_event.ticket_capacity = 1
+    db.commit()
+    with pytest.raises(NoTicketsAvailableException):
+        book_ticket(db=db, event_id=test_event.id, user_id=test_visitor.id)
+    assert db.query(Ticket).filter(Ticket.event_id == test_event.id).count() == 1
+
+
+def test_book_ticket_event_not_found(db: Session, test_visitor):
+    with pytest.raises(MissingEventException):
+        book_ticket(db=db, event_id=999, user_id=test_visitor.id)
+
+
 def test_update_booking_success(db: Session, test_booking, test_visitor, test_event):
     _ = test_visitor
     ticket_data = TicketCreate(event_id=test_event.id, seat_num="D4", price=30)
@@ -81,17 +261,26 @@ def test_update_booking_not_found(db: Session):
         update_booking(db=db, booking_number=999, booking_data=update_data)
 
 
-def test_delete_booking_success(db: Session, test_booking):
+def test_delete_booking_success(db: Session, test_booking, test_event):
     booking_number = test_booking.booking_number
     result = delete_booking(db=db, booking_number=booking_number)
+    assert get_available_ticket_count_by_event(db=db, event_id=test_event.id) == 50
     assert result is not None
     assert result.booking_number == booking_number
-    assert (
+    db_booking = (
         db.query(Booking).filter(Booking.booking_number == booking_number).first()
-        is None
     )
+    assert db_booking.cancelled_at is not None
 
 
 def test_delete_booking_not_found(db: Session):
     with pytest.raises(MissingBookingException):
         delete_booking(db=db, booking_number=999)
+
+
+def test_delete_booking_twice(db: Session, test_booking):
+    booking_number = test_booking.booking_number
+    delete_booking(db=db, booking_number=booking_number)
+    with pytest.raises(MissingBookingException):
+        delete_booking(db=db, booking_number=booking_number)
+    assert get_bookings_by_user(db=db, user_id=test_booking.user_id) == []
@@ -0,0 +1,38 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.orm import Session
+
+from app.crud.booking import book_tickets, delete_booking
+from app.crud.cancellation import archive_cancelled
+from app.models.archive import BookingArchive, TicketArchive
+from app.models.booking import Booking
+from app.models.ticket import Ticket
+
+
+def test_archive_cancelled(db: Session, test_event, test_visitor):
+    bookings = book_tickets(
+        db=db, event_id=test_event.id, user_id=test_visitor.id, quantity=5
+    )
+    booking_numbers = [booking.booking_number for booking in bookings]
+    for booking_number in booking_numbers[:3]:
+        delete_booking(db=db, booking_number=booking_number)
+
+    archived = archive_cancelled(
+        db=db,
+        cancelled_before=datetime.now(timezone.utc) - timedelta(days=1),
+        batch_size=2,
+    )
+    assert archived == {"bookings": 0, "tickets": 0}
+
+    archived = archive_cancelled(
+        db=db,
+        cancelled_before=datetime.now(timezone.utc) + timedelta(seconds=1),
+        batch_size=2,
+    )
+    assert archived == {"bookings": 3, "tickets": 3}
+    assert db.query(Booking).count() == 2
+    assert db.query(Ticket).count() == 2
+    assert {row.booking_number for row in db.query(BookingArchive)} == set(
+        booking_numbers[:3]
+    )
+    assert db.query(TicketArchive).count() == 3
@@ -3,6 +3,7 @@ from datetime import date, time
 import pytest
 from sqlalchemy.orm import Session
 
+from app.crud.booking import book_tickets
 from app.crud.event import (
     create_event,
     delete_event,
@@ -12,8 +13,13 @@ from app.crud.event import (
     get_events_by_location,
     update_event,
 )
+from app.crud.inventory import get_available_count, sync_seats
+from app.crud.ticket import get_available_tickets_by_event
 from app.exceptions.event import MissingEventException, WrongRoleException
 from app.exceptions.location import MissingLocationException
+from app.models.booking import Booking
+from app.models.inventory import EventInventoryShard
+from app.models.ticket import Ticket
 from app.schemas.event import EventCreate, EventUpdate
 
 
@@ -62,6 +68,45 @@ def test_create_event_success(db: Session, test_location, test_organizer):
     assert result.title == "New Event"
 
 
+def test_create_event_sharded(db: Session, test_location, test_organizer):
+    event_data = EventCreate(
+        title="Sharded Event",
+        event_date=date(2026, 1, 1),
+        start_time=time(20, 0),
+        location_id=test_location.id,
+        organizer_id=test_organizer.id,
+        ticket_capacity=100,
+        inventory_shards=8,
+    )
+    result = create_event(db=db, event=event_data)
+    shards = db.query(EventInventoryShard).filter_by(event_id=result.id).all()
+    assert len(shards) == 8
+    assert sum(s.capacity for s in shards) == 100
+
+    update_event(db=db, event=EventUpdate(ticket_capacity=40), event_id=result.id)
+    assert get_available_count(db=db, event_id=result.id) == 40
+
+
+def test_create_event_preallocated(db: Session, test_location, test_organizer):
+    event_data = EventCreate(
+        title="Seated Event",
+        event_date=date(2026, 1, 1),
+        start_time=time(20, 0),
+        location_id=test_location.id,
+        organizer_id=test_organizer.id,
+        ticket_capacity=30,
+        ticket_price=40,
+        preallocate_seats=True,
+    )
+    result = create_event(db=db, event=event_data)
+    seats = get_available_tickets_by_event(db=db, event_id=result.id)
+    assert len(seats) == 30
+    assert all(seat.price == 40 and seat.sold_at is None for seat in seats)
+
+    update_event(db=db, event=EventUpdate(ticket_capacity=20), event_id=result.id)
+    assert len(get_available_tickets_by_event(db=db, event_id=result.id)) == 20
+
+
 def test_create_event_wrong_role(db: Session, test_location, test_visitor):
     event_data = EventCreate(
         title="New Event",
@@ -114,3 +159,21 @@ def test_delete_event_success(db: Session, test_event):
 def test_delete_event_not_found(db: Session):
     with pytest.raises(MissingEventException):
         delete_event(db=db, event_id=999)
+
+
+def test_delete_event_cancels_bookings(db: Session, test_event, test_visitor):
+    book_tickets(db=db, event_id=test_event.id, user_id=test_visitor.id, quantity=3)
+    result = delete_event(db=db, event_id=test_event.id)
+    assert result.cancelled_bookings == 3
+    assert result.cancelled_tickets == 3
+    assert db.query(Booking).filter(Booking.cancelled_at.is_(None)).count() == 0
+
+
+def test_delete_event_counts_only_sold_tickets(db: Session, test_event, test_visitor):
+    test_event.seats_preallocated = True
+    sync_seats(db=db, db_event=test_event)
+    db.commit()
+    book_tickets(db=db, event_id=test_event.id, user_id=test_visitor.id, quantity=2)
+    result = delete_event(db=db, event_id=test_event.id)
+    assert result.cancelled_tickets == 2
+    assert db.query(Ticket).filter(Ticket.cancelled_at.is_(None)).count() == 0
@@ -0,0 +1,127 @@
+from datetime import timedelta
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.core.clock import utcnow
+from app.crud.hold import (
+    confirm_hold,
+    create_hold,
+    release_expired_holds,
+    release_hold,
+)
+from app.crud.inventory import get_available_count, reconcile_tickets_sold
+from app.exceptions.event import MissingEventException
+from app.exceptions.hold import ExpiredSeatHoldException, MissingSeatHoldException
+from app.exceptions.ticket import NoTicketsAvailableException
+from app.models.booking import Booking
+from app.models.hold import SeatHold
+
+
+def test_create_hold_claims_inventory(db: Session, test_event, test_visitor):
+    hold = create_hold(
+        db=db,
+        event_id=test_event.id,
+        user_id=test_visitor.id,
+        quantity=3,
+        ttl_seconds=60,
+    )
+    assert hold.quantity == 3
+    assert get_available_count(db=db, event_id=test_event.id) == 47
+    assert db.query(Booking).count() == 0
+
+    # Active holds count as sold when the counters are rebuilt
+    assert reconcile_tickets_sold(db=db) == 0
+
+
+def test_create_hold_sold_out(db: Session, test_event, test_visitor):
+    with pytest.raises(NoTicketsAvailableException):
+        create_hold(
+            db=db,
+            event_id=test_event.id,
+            user_id=test_visitor.id,
+            quantity=51,
+            ttl_seconds=60,
+        )
+
+
+def test_confirm_hold(db: Session, test_event, test_visitor):
+    hold = create_hold(
+        db=db,
+        event_id=test_event.id,
+        user_id=test_visitor.id,
+        quantity=2,
+        ttl_seconds=60,
+    )
+    hold_id = hold.id
+    bookings = confirm_hold(db=db, hold_id=hold_id, user_id=test_visitor.id)
+    assert len(bookings) == 2
+    assert db.query(SeatHold).count() == 0
+    assert get_available_count(db=db, event_id=test_event.id) == 48
+
+    with pytest.raises(MissingSeatHoldException):
+        confirm_hold(db=db, hold_id=hold_id, user_id=test_visitor.id)
+
+
+def test_confirm_expired_hold(db: Session, test_event, test_visitor):
+    hold = create_hold(
+        db=db,
+        event_id=test_event.id,
+        user_id=test_visitor.id,
+        quantity=1,
+        ttl_seconds=-1,
+    )
+    hold_id = hold.id
+    with pytest.raises(ExpiredSeatHoldException):
+        confirm_hold(db=db, hold_id=hold_id, user_id=test_visitor.id)
+    with pytest.raises(ExpiredSeatHoldException):
+        release_hold(db=db, hold_id=hold_id, user_id=test_visitor.id)
+
+
+def test_confirm_hold_on_deleted_event(db: Session, test_event, test_visitor):
+    hold = create_hold(
+        db=db,
+        event_id=test_event.id,
+        user_id=test_visitor.id,
+        quantity=1,
+        ttl_seconds=60,
+    )
+    hold_id = hold.id
+    test_event.deleted_at = utcnow()
+    db.commit()
+
+    with pytest.raises(MissingEventException):
+        confirm_hold(db=db, hold_id=hold_id, user_id=test_visitor.id)
+    assert db.query(Booking).count() == 0
+    assert db.query(SeatHold).filter(SeatHold.id == hold_id).count() == 1
+
+
+def test_release_hold(db: Session, test_event, test_visitor):
+    hold = create_hold(
+        db=db,
+        event_id=test_event.id,
+        user_id=test_visitor.id,
+        quantity=4,
+        ttl_seconds=60,
+    )
+    released = release_hold(db=db, hold_id=hold.id, user_id=test_visitor.id)
+    assert released.quantity == 4
+    assert get_available_count(db=db, event_id=test_event.id) == 50
+
+
+def test_release_expired_holds(db: Session, test_event, test_visitor):
+    for quantity, ttl in ((1, -1), (2, -1), (3, 60)):
+        create_hold(
+            db=db,
+            event_id=test_event.id,
+            user_id=test_visitor.id,
+            quantity=quantity,
+            ttl_seconds=ttl,
+        )
+
+    assert release_expired_holds(db=db) == {test_event.id: 3}
+    assert get_available_count(db=db, event_id=test_event.id) == 47
+
+    later = utcnow() + timedelta(minutes=2)
+    assert release_expired_holds(db=db, now=later) == {test_event.id: 3}
+    assert get_available_count(db=db, event_id=test_event.id) == 50
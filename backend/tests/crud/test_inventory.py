@@ -0,0 +1,146 @@
+from datetime import timedelta
+
+import pytest
+from sqlalchemy.orm import Session
+
+import app.crud.inventory as inventory
+from app.core.clock import utcnow
+from app.crud.inventory import (
+    adjust_tickets_sold,
+    claim_available_tickets,
+    claim_tickets,
+    get_available_count,
+    rebalance_shards,
+    reconcile_tickets_sold,
+)
+from app.exceptions.db import TransientDatabaseException
+from app.exceptions.event import MissingEventException, NotOnSaleYetException
+from app.exceptions.ticket import NoTicketsAvailableException
+from app.models.inventory import EventInventoryShard
+
+
+def test_claim_tickets_success(db: Session, test_event):
+    result = claim_tickets(db=db, event_id=test_event.id, quantity=3)
+    db.commit()
+    assert result.id == test_event.id
+    assert get_available_count(db=db, event_id=test_event.id) == 47
+
+
+def test_claim_tickets_sold_out(db: Session, test_event):
+    with pytest.raises(NoTicketsAvailableException):
+        claim_tickets(db=db, event_id=test_event.id, quantity=51)
+    assert get_available_count(db=db, event_id=test_event.id) == 50
+
+
+def test_claim_tickets_event_not_found(db: Session):
+    with pytest.raises(MissingEventException):
+        claim_tickets(db=db, event_id=999)
+
+
+def test_claim_tickets_not_on_sale_yet(db: Session, test_event):
+    test_event.on_sale_at = utcnow() + timedelta(hours=1)
+    db.commit()
+    with pytest.raises(NotOnSaleYetException):
+        claim_tickets(db=db, event_id=test_event.id)
+
+    test_event.on_sale_at = utcnow() - timedelta(seconds=1)
+    db.commit()
+    claim_tickets(db=db, event_id=test_event.id)
+    db.commit()
+    assert get_available_count(db=db, event_id=test_event.id) == 49
+
+
+def test_claim_available_tickets_takes_what_is_left(db: Session, test_event):
+    claim_tickets(db=db, event_id=test_event.id, quantity=48)
+    _, claimed = claim_available_tickets(db=db, event_id=test_event.id, quantity=5)
+    assert claimed == 2
+    assert get_available_count(db=db, event_id=test_event.id) == 0
+
+
+def test_claim_available_tickets_gives_up_on_lost_races(
+    db: Session, test_event, monkeypatch
+):
+    # Every conditional increment loses, as if the row changed each time
+    real_update = inventory.update
+    monkeypatch.setattr(
+        inventory, "update", lambda table: real_update(table).where(False)
+    )
+    with pytest.raises(TransientDatabaseException):
+        claim_available_tickets(db=db, event_id=test_event.id, quantity=1)
+
+
+def test_adjust_tickets_sold(db: Session, test_event):
+    adjust_tickets_sold(db=db, event_id=test_event.id, delta=5)
+    adjust_tickets_sold(db=db, event_id=test_event.id, delta=-2)
+    db.commit()
+    assert get_available_count(db=db, event_id=test_event.id) == 47
+
+
+def test_reconcile_tickets_sold(db: Session, test_event, test_ticket):
+    _ = test_ticket
+    test_event.tickets_sold = 20
+    db.commit()
+
+    assert reconcile_tickets_sold(db=db) == 1
+    assert get_available_count(db=db, event_id=test_event.id) == 49
+    assert reconcile_tickets_sold(db=db) == 0
+
+
+def test_sharded_claim_tickets(db: Session, test_event):
+    test_event.inventory_shards = 4
+    rebalance_shards(db=db, db_event=test_event)
+    db.commit()
+
+    for _ in range(10):
+        claim_tickets(db=db, event_id=test_event.id)
+    db.commit()
+    assert get_available_count(db=db, event_id=test_event.id) == 40
+
+
+def test_sharded_claim_tickets_spans_shards(db: Session, test_event):
+    test_event.ticket_capacity = 8
+    test_event.inventory_shards = 4
+    rebalance_shards(db=db, db_event=test_event)
+    db.commit()
+
+    claim_tickets(db=db, event_id=test_event.id, quantity=5)
+    claim_tickets(db=db, event_id=test_event.id, quantity=3)
+    db.commit()
+    assert get_available_count(db=db, event_id=test_event.id) == 0
+    with pytest.raises(NoTicketsAvailableException):
+        claim_tickets(db=db, event_id=test_event.id)
+
+
+def test_sharded_adjust_tickets_sold(db: Session, test_event):
+    test_event.inventory_shards = 3
+    rebalance_shards(db=db, db_event=test_event)
+    claim_tickets(db=db, event_id=test_event.id, quantity=4)
+    adjust_tickets_sold(db=db, event_id=test_event.id, delta=-3)
+    db.commit()
+    assert get_available_count(db=db, event_id=test_event.id) == 49
+
+
+def test_rebalance_shards_keeps_sold(db: Session, test_event, test_ticket):
+    _ = test_ticket
+    test_event.inventory_shards = 4
+    rebalance_shards(db=db, db_event=test_event)
+    db.commit()
+    shards = db.query(EventInventoryShard).filter_by(event_id=test_event.id).all()
+    assert sorted(s.capacity for s in shards) == [12, 12, 13, 13]
+    assert sum(s.sold for s in shards) == 1
+
+    test_event.inventory_shards = 1
+    rebalance_shards(db=db, db_event=test_event)
+    db.commit()
+    assert db.query(EventInventoryShard).count() == 0
+    assert test_event.tickets_sold == 1
+
+
+def test_reconcile_tickets_sold_sharded(db: Session, test_event, test_ticket):
+    _ = test_ticket
+    test_event.inventory_shards = 2
+    rebalance_shards(db=db, db_event=test_event, sold=7)
+    db.commit()
+
+    assert reconcile_tickets_sold(db=db) == 1
+    assert get_available_count(db=db, event_id=test_event.id) == 49
@@ -1,6 +1,8 @@
 import pytest
 from sqlalchemy.orm import Session
 
+from app.crud.booking import book_tickets
+from app.crud.hold import create_hold
 from app.crud.location import (
     create_location,
     delete_location,
@@ -13,6 +15,8 @@ from app.exceptions.location import (
     DuplicateLocationNameException,
     MissingLocationException,
 )
+from app.models.event import Event
+from app.models.ticket import Ticket
 from app.schemas.location import LocationCreate, LocationUpdate
 
 
@@ -84,3 +88,21 @@ def test_delete_location_success(db: Session, test_location):
 def test_delete_location_not_found(db: Session):
     with pytest.raises(MissingLocationException):
         delete_location(db=db, location_id=999)
+
+
+def test_delete_location_cascades(db: Session, test_event, test_visitor):
+    book_tickets(db=db, event_id=test_event.id, user_id=test_visitor.id, quantity=2)
+    create_hold(
+        db=db,
+        event_id=test_event.id,
+        user_id=test_visitor.id,
+        quantity=1,
+        ttl_seconds=60,
+    )
+    result = delete_location(db=db, location_id=test_event.location_id)
+    assert result.deleted_events == 1
+    assert result.cancelled_bookings == 2
+    assert result.cancelled_tickets == 2
+    assert result.released_holds == 1
+    assert db.query(Event).filter(Event.deleted_at.is_(None)).count() == 0
+    assert db.query(Ticket).filter(Ticket.cancelled_at.is_(None)).count() == 0
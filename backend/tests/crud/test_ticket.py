@@ -1,6 +1,10 @@
+from datetime import date, time
+
 import pytest
 from sqlalchemy.orm import Session
 
+from app.crud.booking import book_ticket
+from app.crud.inventory import get_available_count, sync_seats
 from app.crud.ticket import (
     create_ticket,
     delete_ticket,
@@ -11,7 +15,12 @@ from app.crud.ticket import (
     get_tickets_by_event,
     update_ticket,
 )
-from app.exceptions.ticket import MissingTicketException
+from app.exceptions.ticket import (
+    MissingTicketException,
+    NoTicketsAvailableException,
+    PreallocatedSeatMoveException,
+)
+from app.models.event import Event
 from app.models.ticket import Ticket
 from app.schemas.ticket import TicketCreate, TicketUpdate
 
@@ -41,9 +50,18 @@ def test_get_tickets_by_event(db: Session, test_ticket, test_event):
 
 
 def test_get_available_tickets_by_event(db: Session, test_ticket, test_event):
+    # Sold tickets are not available
+    _ = test_ticket
     result = get_available_tickets_by_event(db=db, event_id=test_event.id)
-    assert len(result) == 1
-    assert result[0].id == test_ticket.id
+    assert result == []
+
+    seat = Ticket(event_id=test_event.id, seat_num="B1", price=50)
+    db.add(seat)
+    db.flush()
+    seat.sold_at = None
+    db.commit()
+    result = get_available_tickets_by_event(db=db, event_id=test_event.id)
+    assert [ticket.id for ticket in result] == [seat.id]
 
 
 def test_get_available_ticket_count_by_event(db: Session, test_ticket, test_event):
@@ -62,6 +80,7 @@ def test_create_ticket_success(db: Session, test_event):
     result = create_ticket(db=db, ticket=ticket_data)
     assert result is not None
     assert result.seat_num == "B2"
+    assert get_available_ticket_count_by_event(db=db, event_id=test_event.id) == 49
 
 
 def test_update_ticket_success(db: Session, test_ticket):
@@ -83,7 +102,46 @@ def test_delete_ticket_success(db: Session, test_ticket):
     db.commit()
     assert result is not None
     assert result.id == ticket_id
-    assert db.query(Ticket).filter(Ticket.id == ticket_id).first() is None
+    assert db.query(Ticket).filter(Ticket.id == ticket_id).first().cancelled_at
+
+
+def test_update_preallocated_ticket_refuses_move(db: Session, test_event):
+    test_event.ticket_capacity = 2
+    test_event.seats_preallocated = True
+    sync_seats(db=db, db_event=test_event)
+    other = Event(
+        title="Other Event",
+        event_date=date(2025, 12, 26),
+        start_time=time(18, 0),
+        location_id=test_event.location_id,
+        organizer_id=test_event.organizer_id,
+        ticket_capacity=50,
+    )
+    db.add(other)
+    db.commit()
+    seat = db.query(Ticket).filter(Ticket.event_id == test_event.id).first()
+
+    with pytest.raises(PreallocatedSeatMoveException):
+        update_ticket(db=db, ticket=TicketUpdate(event_id=other.id), ticket_id=seat.id)
+    assert db.query(Ticket).filter(Ticket.event_id == test_event.id).count() == 2
+
+
+def test_delete_preallocated_ticket_returns_seat(
+    db: Session, test_visitor, test_event
+):
+    test_event.ticket_capacity = 2
+    test_event.seats_preallocated = True
+    sync_seats(db=db, db_event=test_event)
+    db.commit()
+
+    first = book_ticket(db=db, event_id=test_event.id, user_id=test_visitor.id)
+    delete_ticket(db=db, ticket_id=first.ticket_id)
+    book_ticket(db=db, event_id=test_event.id, user_id=test_visitor.id)
+    book_ticket(db=db, event_id=test_event.id, user_id=test_visitor.id)
+
+    assert get_available_count(db=db, event_id=test_event.id) == 0
+    with pytest.raises(NoTicketsAvailableException):
+        book_ticket(db=db, event_id=test_event.id, user_id=test_visitor.id)
 
 
 def test_delete_ticket_not_found(db: Session):
@@ -1,4 +1,5 @@
 import pytest
+from passlib.hash import bcrypt
 from sqlalchemy.orm import Session
 
 from app.crud.user import (
@@ -7,6 +8,7 @@ from app.crud.user import (
     get_user,
     get_user_by_email,
     get_users,
+    import_users,
     update_user,
 )
 from app.exceptions.user import (
@@ -78,6 +80,14 @@ def test_update_user_success(db: Session, test_visitor):
     assert result is not None
     assert result.username == "updateduser"
     assert result.role == UserRole.ORGANIZER.value
+    assert result.token_version == 1
+
+
+def test_update_user_keeps_token_version(db: Session, test_visitor):
+    result = update_user(
+        db=db, user=UserUpdate(username="renamed"), user_id=test_visitor.id
+    )
+    assert result.token_version == 0
 
 
 def test_update_user_not_found(db: Session):
@@ -100,6 +110,19 @@ def test_authenticate_user_success(db: Session, test_superuser):
     assert authenticated_user.email == test_superuser.email
 
 
+def test_authenticate_user_rehashes_outdated_hash(db: Session, test_visitor):
+    test_visitor.hashed_password = bcrypt.using(rounds=4).hash("Kennwort1")
+    db.commit()
+    updated_at = test_visitor.updated_at
+
+    assert authenticate_user(db=db, email=test_visitor.email, password="Kennwort1")
+    db.refresh(test_visitor)
+    assert test_visitor.hashed_password.startswith("$2b$12$")
+    assert test_visitor.updated_at == updated_at
+    assert test_visitor.token_version == 0
+    assert authenticate_user(db=db, email=test_visitor.email, password="Kennwort1")
+
+
 def test_authenticate_user_wrong_password(db: Session, test_superuser):
     authenticated_user = authenticate_user(
         db=db, email=test_superuser.email, password="wrongpassword"
@@ -112,3 +135,29 @@ def test_authenticate_user_not_found(db: Session):
         db=db, email="nonexistent@example.com", password="password"
     )
     assert authenticated_user is None
+
+
+def test_import_users_skips_taken_emails(db: Session, test_visitor):
+    emails = ["a@test.com", test_visitor.email, "a@test.com", "d@test.com"]
+    users = [
+        (
+            line,
+            UserCreate(
+                username=f"User{line}",
+                email=email,
+                password="Kennwort1",
+                role=UserRole.VISITOR,
+            ),
+        )
+        for line, email in enumerate(emails, start=2)
+    ]
+    result = import_users(db=db, users=users, chunk_size=1)
+
+    assert result.created == 2
+    assert [(error.line, error.email) for error in result.errors] == [
+        (3, test_visitor.email),
+        (4, "a@test.com"),
+    ]
+    db_user = get_user_by_email(db=db, email="d@test.com")
+    assert db_user.role == UserRole.VISITOR
+    assert bcrypt.verify("Kennwort1", db_user.hashed_password)
@@ -0,0 +1,75 @@
+import pytest
+from sqlalchemy.orm import Session
+
+from app.crud.booking import book_tickets
+from app.crud.inventory import get_available_count
+from app.crud.waitlist import (
+    get_waitlist_position,
+    join_waitlist,
+    leave_waitlist,
+    promote_waitlist,
+)
+from app.exceptions.waitlist import (
+    AlreadyWaitlistedException,
+    MissingWaitlistEntryException,
+    TicketsStillAvailableException,
+)
+from app.models.booking import Booking
+from app.models.waitlist import WaitlistEntry
+
+
+@pytest.fixture
+def sold_out_event(db: Session, test_event, test_visitor):
+    book_tickets(
+        db=db,
+        event_id=test_event.id,
+        user_id=test_visitor.id,
+        quantity=test_event.ticket_capacity,
+    )
+    return test_event
+
+
+def test_join_waitlist_positions(
+    db: Session, sold_out_event, test_visitor, test_organizer, test_superuser
+):
+    for user in (test_visitor, test_organizer, test_superuser):
+        join_waitlist(db=db, event_id=sold_out_event.id, user_id=user.id)
+
+    position = get_waitlist_position(
+        db=db, event_id=sold_out_event.id, user_id=test_superuser.id
+    )
+    assert position == 2
+
+    # Users who leave from the middle of the line no longer count
+    leave_waitlist(db=db, event_id=sold_out_event.id, user_id=test_organizer.id)
+    position = get_waitlist_position(
+        db=db, event_id=sold_out_event.id, user_id=test_superuser.id
+    )
+    assert position == 1
+
+    with pytest.raises(AlreadyWaitlistedException):
+        join_waitlist(db=db, event_id=sold_out_event.id, user_id=test_visitor.id)
+    with pytest.raises(MissingWaitlistEntryException):
+        leave_waitlist(db=db, event_id=sold_out_event.id, user_id=test_organizer.id)
+
+
+def test_join_waitlist_tickets_available(db: Session, test_event, test_visitor):
+    with pytest.raises(TicketsStillAvailableException):
+        join_waitlist(db=db, event_id=test_event.id, user_id=test_visitor.id)
+
+
+def test_promote_waitlist(
+    db: Session, sold_out_event, test_visitor, test_organizer, test_superuser
+):
+    for user in (test_organizer, test_superuser):
+        join_waitlist(db=db, event_id=sold_out_event.id, user_id=user.id)
+    assert promote_waitlist(db=db, event_id=sold_out_event.id, limit=10) == []
+
+    sold_out_event.ticket_capacity += 3
+    db.commit()
+    promoted = promote_waitlist(db=db, event_id=sold_out_event.id, limit=10)
+
+    assert [b.user_id for b in promoted] == [test_organizer.id, test_superuser.id]
+    assert db.query(WaitlistEntry).count() == 0
+    assert db.query(Booking).count() == sold_out_event.ticket_capacity - 1
+    assert get_available_count(db=db, event_id=sold_out_event.id) == 1
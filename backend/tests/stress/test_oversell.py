@@ -0,0 +1,50 @@
+import os
+
+import pytest
+
+from benchmarks.common import make_engine
+from benchmarks.oversell import MODES, check_capacity, make_booker, run, seed
+
+pytestmark = pytest.mark.stress
+
+STRESS_DATABASE_URL = os.environ.get("STRESS_DATABASE_URL")
+EVENTS = 20
+CAPACITY = 5
+
+
+@pytest.fixture
+def engine(tmp_path_factory):
+    database_url = STRESS_DATABASE_URL or (
+        f"sqlite:///{tmp_path_factory.mktemp('stress') / 'stress.db'}"
+    )
+    engine = make_engine(database_url)
+    yield engine
+    engine.dispose()
+
+
+@pytest.mark.parametrize("shards", [1, 4])
+@pytest.mark.parametrize("mode", MODES)
+def test_concurrent_bookings_never_oversell(engine, mode, shards):
+    event_ids, user_ids = seed(
+        engine,
+        events=EVENTS,
+        capacity=CAPACITY,
+        users=32,
+        shards=shards,
+        preallocate=shards > 1,
+    )
+
+    result = run(
+        engine,
+        make_booker(mode),
+        event_ids=event_ids,
+        user_ids=user_ids,
+        attempts=2000,
+    )
+
+    assert check_capacity(engine) == []
+    assert not result.errors
+    # Every event sells out; pairs leave one ticket of an odd capacity unsold
+    quantity = 2 if mode == "batch" else 1
+    assert result.booked == EVENTS * (CAPACITY - CAPACITY % quantity)
+    assert result.booked // quantity + result.rejected == result.attempts